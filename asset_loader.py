@@ -0,0 +1,149 @@
+"""asset_loader.py - Loads images and sounds in the background so the window shows up right away"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from config import *
+
+# Posted to the event queue whenever an asset finishes loading
+ASSET_LOADED_EVENT = pygame.USEREVENT + 1
+
+
+class AssetLoader:
+    def __init__(self, max_workers=ASSET_LOADER_WORKERS):
+        """Initialization"""
+        # Startup clock, used for the time-to-first-frame metric
+        self.start_time = time.perf_counter()
+        self.first_frame_time = None
+        self.finished_time = None
+
+        # Worker threads that decode the files
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='asset-loader')
+
+        # Loaded assets (placeholders until the real asset arrives)
+        self.images = {}
+        self.sounds = {}
+
+        # Track how many assets are still loading
+        self.lock = threading.Lock()
+        self.pending = 0
+
+    def load_image(self, name, path, size=None, fallback=None):
+        """Decode an image on a worker thread, using a placeholder until it is ready"""
+        # Show a placeholder right away so drawing never has to wait
+        self.images[name] = self.create_placeholder(size)
+        self._submit(self._decode_image, self.images, name, path, size, fallback)
+
+    def load_sound(self, name, path, volume=None):
+        """Decode a sound on a worker thread, sound is None until it is ready"""
+        self.sounds[name] = None
+        self._submit(self._decode_sound, self.sounds, name, path, volume)
+
+    def get_image(self, name):
+        """Return the image (or its placeholder)"""
+        return self.images.get(name)
+
+    def get_sound(self, name):
+        """Return the sound, or None if it is still loading or failed to load"""
+        return self.sounds.get(name)
+
+    def is_done(self):
+        """returns True once every asset has finished loading"""
+        return self.pending == 0
+
+    def report_first_frame(self):
+        """Record and print the time it took to show the first frame"""
+        if self.first_frame_time is None:
+            self.first_frame_time = time.perf_counter() - self.start_time
+            print(f"Time to first frame: {self.first_frame_time * 1000:.1f} ms")
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def create_placeholder(size):
+        """Create a plain placeholder surface"""
+        if size is None:
+            size = (CARD_WIDTH, CARD_HEIGHT)
+        placeholder = pygame.Surface(size)
+        placeholder.fill(PLACEHOLDER_COLOR)
+        return placeholder
+
+    @staticmethod
+    def create_default_card(value, suit):
+        """Create a default card image if the image file is missing"""
+        img = pygame.Surface((CARD_WIDTH, CARD_HEIGHT))
+        img.fill((255, 255, 255))  # White background
+
+        # Add a border
+        pygame.draw.rect(img, (0, 0, 0), (0, 0, CARD_WIDTH, CARD_HEIGHT), 2)
+
+        # Add text for value and suit
+        font = pygame.font.SysFont(None, 24)
+        text = font.render(f"{value.upper()} of {suit.capitalize()}", True, (0, 0, 0))
+        text_rect = text.get_rect(center=(CARD_WIDTH // 2, CARD_HEIGHT // 2))
+        img.blit(text, text_rect)
+
+        return img
+
+    def _submit(self, decode, target, name, *args):
+        """Queue a decode job and store the result in target when it finishes"""
+        with self.lock:
+            self.pending += 1
+
+        future = self.executor.submit(decode, *args)
+        future.add_done_callback(lambda f: self._finish(f, target, name))
+
+    def _finish(self, future, target, name):
+        """Store a finished asset (runs on the worker thread)"""
+        try:
+            asset = future.result()
+            if asset is not None:
+                # Single dict assignment, so the main thread never sees half an asset
+                target[name] = asset
+        except Exception as e:
+            print(f"Error loading {name}: {e}")
+
+        with self.lock:
+            self.pending -= 1
+            done = self.pending == 0
+
+        if done:
+            self.finished_time = time.perf_counter() - self.start_time
+            print(f"All assets loaded in {self.finished_time * 1000:.1f} ms")
+
+        # Wake up the main loop so it can redraw with the new asset
+        if pygame.display.get_init():
+            pygame.event.post(pygame.event.Event(ASSET_LOADED_EVENT, name=name))
+
+    @staticmethod
+    def _decode_image(path, size, fallback):
+        """Load and scale an image (runs on a worker thread)"""
+        if not os.path.exists(path):
+            print(f"Warning: Image not found: {path}")
+            return fallback() if fallback else None
+
+        try:
+            img = pygame.image.load(path)
+        except pygame.error as e:
+            print(f"Error loading {path}: {e}")
+            return fallback() if fallback else None
+
+        if size is not None:
+            img = pygame.transform.scale(img, size)
+        return img
+
+    @staticmethod
+    def _decode_sound(path, volume):
+        """Load a sound (runs on a worker thread)"""
+        sound = pygame.mixer.Sound(path)
+        if volume is not None:
+            sound.set_volume(volume)
+        return sound
@@ -0,0 +1,348 @@
+"""async_network_manager.py - asyncio version of NetworkManager for servers with many connections"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import time
+import socket
+import asyncio
+import pickle
+import threading
+
+from config import *
+from framing import FrameBuffer, FrameError
+from network_manager import NetworkManager
+from send_queue import SendQueue
+
+
+class AsyncConnection:
+    """One connected peer: its streams and the queue its writer task sends from"""
+    def __init__(self, reader, writer):
+        """Initialization"""
+        self.reader = reader
+        self.writer = writer
+        self.address = writer.get_extra_info('peername')
+        self.send_queue = SendQueue()
+        self.ready = asyncio.Event()  # Set when send_queue has something for the writer task
+        self.writer_task = None
+        self.closed = False
+        self.reading = asyncio.Event()  # Cleared while we have stopped reading from this peer (see _pause_reading)
+        self.reading.set()
+
+        # Unix socket peers are on this machine
+        sock = writer.get_extra_info('socket')
+        self.local = sock is not None and sock.family == getattr(socket, 'AF_UNIX', None)
+
+    def __repr__(self):
+        return f"AsyncConnection({self.address})"
+
+
+class AsyncNetworkManager(NetworkManager):
+    """Same send_message/_process_message contract as NetworkManager, but one event loop serves every socket"""
+    def __init__(self, is_server=False, server_ip='127.0.0.1', port=5555, max_connections=MAX_CONNECTIONS):
+        super().__init__(is_server, server_ip, port)
+        self.max_connections = max_connections
+
+        # The event loop runs on its own thread so the pygame loop never blocks on it
+        self.loop = None
+        self.loop_thread = None
+        self.server = None
+        self.unix_server = None
+        self.connection = None  # Client mode: the connection to the server
+        self.tasks = set()  # Tasks we started, cancelled on shutdown (connection handlers end when their socket closes)
+
+    def start(self):
+        """Start the event loop thread, then the server or the client connection"""
+        self.running = True
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self._run_loop, daemon=True)
+        self.loop_thread.start()
+
+        # Wait until the server is listening (or the client is connected) before returning
+        if self.is_server:
+            setup = self._start_server_async()
+        else:
+            setup = self._connect_to_server_async()
+        try:
+            asyncio.run_coroutine_threadsafe(setup, self.loop).result(timeout=CONNECT_TIMEOUT)
+        except Exception as e:
+            print(f"Failed to start network: {e}")
+            self.stop()
+            return
+
+        self.loop.call_soon_threadsafe(self._create_task, self._heartbeat_async())
+        self._start_stats_server()
+
+    def _run_loop(self):
+        """Run the event loop until _shutdown stops it, then close it (event loop thread)"""
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    async def _start_server_async(self):
+        """Listen for connections"""
+        self.server = await asyncio.start_server(
+            self._handle_connection, '0.0.0.0', self.port, backlog=self.max_connections)
+        print(f"Server started, waiting for connections on port {self.port}...")
+
+        if self.unix_path:
+            self._remove_unix_path()  # Left behind by a server that crashed
+            self.unix_server = await asyncio.start_unix_server(
+                self._handle_connection, self.unix_path, backlog=self.max_connections)
+            print(f"Also listening on {self.unix_path}")
+
+    async def _connect_to_server_async(self):
+        """Connect to the server as a client"""
+        await self._open_server_connection_async()
+        self._create_task(self._client_loop())
+
+    async def _open_server_connection_async(self, dropped_at=None):
+        """Connect (or reconnect) to the server and start sending"""
+        unix_path = self._server_unix_path()
+        if unix_path:
+            opening = asyncio.open_unix_connection(unix_path)
+        else:
+            opening = asyncio.open_connection(self.server_ip, self.port)
+        reader, writer = await asyncio.wait_for(opening, CONNECT_TIMEOUT)
+        print(f"Connected to server at {unix_path or f'{self.server_ip}:{self.port}'}")
+
+        self.connection = self._open_connection(reader, writer)
+        self._on_connected(dropped_at)
+
+    async def _client_loop(self):
+        """Read from the server, reconnecting if the connection drops (client mode)"""
+        while True:
+            await self._read_loop(self.connection, None)
+            if not (self.running and self.reconnect and await self._reconnect_async()):
+                break
+        self.running = False
+
+    async def _reconnect_async(self):
+        """Keep trying to get back to the server for RECONNECT_TIMEOUT seconds, returns True once connected"""
+        dropped_at = time.perf_counter()
+        print("Connection lost, reconnecting...")
+        while self.running and time.perf_counter() - dropped_at < RECONNECT_TIMEOUT:
+            try:
+                await self._open_server_connection_async(dropped_at)
+                self.reconnects += 1
+                return True
+            except (OSError, asyncio.TimeoutError):
+                await asyncio.sleep(RECONNECT_DELAY)
+        return False
+
+    async def _heartbeat_async(self):
+        """Send heartbeats every HEARTBEAT_INTERVAL seconds"""
+        while self.running:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            self._heartbeat()
+
+    def _create_task(self, coroutine):
+        """Start a task that is cancelled on shutdown (runs on the event loop)"""
+        task = self.loop.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def _open_connection(self, reader, writer):
+        """Wrap new streams in a connection and start its writer task"""
+        connection = AsyncConnection(reader, writer)
+        connection.writer_task = self._create_task(self._write_loop(connection))
+        self.last_seen[connection] = time.monotonic()
+        self.metrics.opened(connection)
+        return connection
+
+    async def _handle_connection(self, reader, writer):
+        """Serve one client connection (server mode)"""
+        # Refuse connections past the limit
+        if len(self.client_sockets) >= self.max_connections:
+            writer.close()
+            return
+
+        connection = self._open_connection(reader, writer)
+        self.client_sockets.append(connection)
+        self._on_connect(connection)
+
+        await self._read_loop(connection, connection)
+
+    async def _read_loop(self, connection, sender):
+        """Read frames until the connection closes, passing each message on"""
+        frame_buffer = FrameBuffer()
+        reason = 'shutdown'
+        try:
+            while self.running:
+                await connection.reading.wait()
+                data = await connection.reader.read(FRAME_BUFFER_SIZE)
+                if not data:
+                    reason = 'closed'
+                    break
+
+                # A single read can hold part of a message, or several messages
+                frame_buffer.feed(data)
+                for payload in frame_buffer.frames():
+                    message = self._decode_timed(payload, connection)
+                    self._deliver(message, sender, connection)
+        except FrameError as e:
+            print(f"Dropping connection: {e}")
+            reason = 'frame_error'
+        except (pickle.UnpicklingError, EOFError, ValueError) as e:
+            print(f"Dropping connection, bad message: {e}")
+            reason = 'bad_message'
+        except OSError:
+            reason = 'socket_error'
+
+        self._close_connection(connection, reason)
+
+    async def _write_loop(self, connection):
+        """Send queued frames, waiting for the socket to drain so a slow peer can't flood memory"""
+        try:
+            while True:
+                await connection.ready.wait()
+                connection.ready.clear()
+
+                while True:
+                    data = connection.send_queue.pop()
+                    if data is None:
+                        break
+                    connection.writer.write(data)
+                    await connection.writer.drain()
+                    connection.send_queue.sent(len(data))
+                    self.metrics.sent(connection, len(data))
+        except (OSError, asyncio.CancelledError):
+            pass
+
+    def _close_connection(self, connection, reason='closed'):
+        """Close a connection and forget it"""
+        if connection.closed:
+            return
+        connection.closed = True
+        self.metrics.closed(connection, reason)
+        if connection.writer_task:
+            connection.writer_task.cancel()
+        connection.send_queue.close()
+        connection.writer.close()
+        connection.reading.set()  # A paused read loop sees the socket close and ends
+        self.last_seen.pop(connection, None)
+        self.rtt.pop(connection, None)
+
+        if connection in self.client_sockets:
+            self.client_sockets.remove(connection)
+            self._on_disconnect(connection)
+
+    def _pause_reading(self, connection):
+        """Stop reading from a peer, TCP then slows it down once the socket buffers fill (runs on the event loop)"""
+        if connection is not None and not connection.closed:
+            connection.reading.clear()
+
+    def _resume_reading(self, connections):
+        """Start reading from peers again (runs on the event loop)"""
+        for connection in connections:
+            connection.reading.set()
+
+    def _is_local(self, connection):
+        """returns True if a peer is connected over the Unix socket (so it is on this machine)"""
+        return connection.local
+
+    def _drop_peer(self, connection, reason):
+        """Close a connection from our side (runs on the event loop)"""
+        self._close_connection(connection, reason)
+
+    def send_frame(self, frame, targets, key=None):
+        """Queue the same encoded frame for every target (safe to call from any thread)"""
+        if not targets:
+            return False
+        self._call_in_loop(self._queue_frames, targets, frame, key)
+        return True
+
+    def _targets(self, client_socket=None):
+        """Who send_message sends to"""
+        if self.is_server and client_socket:
+            # Server sending to a specific client
+            return [client_socket]
+        elif self.is_server:
+            # Server broadcasting to all clients
+            return list(self.client_sockets)
+        elif self.connection:
+            # Client sending to server
+            return [self.connection]
+        return []
+
+    def _queue_frames(self, targets, data, key=None):
+        """Queue a frame on each target's writer (runs on the event loop)"""
+        for connection in targets:
+            connection.send_queue.push(data, key)
+            if connection.send_queue.stalled():
+                print("Dropping connection: peer is not reading its messages")
+                self.slow_disconnects += 1
+                self._drop_peer(connection, 'slow_peer')
+            else:
+                connection.ready.set()
+
+    def send_queue_stats(self):
+        """Queue depth and counters for every connection"""
+        connections = list(self.client_sockets)
+        if self.connection:
+            connections.append(self.connection)
+        return {connection: connection.send_queue.stats() for connection in connections}
+
+    def _call_in_loop(self, callback, *args):
+        """Run callback on the event loop thread"""
+        if threading.current_thread() is self.loop_thread:
+            callback(*args)
+        elif self.loop and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self):
+        """Stop the network manager and close all connections"""
+        self.running = False
+        if not self.loop or self.loop.is_closed():
+            return
+
+        # From a handler on the loop we can't wait for ourselves, the loop thread closes the loop when it is done
+        if threading.current_thread() is self.loop_thread:
+            self.loop.create_task(self._shutdown())
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self.loop).result(timeout=CONNECT_TIMEOUT)
+        except Exception as e:
+            print(f"Network didn't shut down cleanly: {e}")
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join(timeout=CONNECT_TIMEOUT)
+
+    async def _shutdown(self):
+        """Close everything, wait for every task to finish, then stop the event loop (runs on the event loop)"""
+        if self.server:
+            self.server.close()
+        if self.unix_server:
+            self.unix_server.close()
+            self._remove_unix_path()
+        if self.stats_server:
+            self.stats_server.stop()
+
+        connections = list(self.client_sockets)
+        if self.connection:
+            connections.append(self.connection)
+        for connection in connections:
+            self._close_connection(connection, 'shutdown')
+
+        # Cancel our tasks and let every task unwind, so none is destroyed while pending. Connection
+        # handlers see their socket close and return on their own (cancelling a stream server's handler
+        # makes asyncio log an error on Python 3.11), anything still running after that is cancelled too
+        for task in self.tasks:
+            task.cancel()
+        tasks = [task for task in asyncio.all_tasks(self.loop) if task is not asyncio.current_task()]
+        handlers = [task for task in tasks if task not in self.tasks]
+        if handlers:
+            _, stuck = await asyncio.wait(handlers, timeout=CONNECT_TIMEOUT)
+            for task in stuck:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Wait for the sockets to close (a peer that stopped reading can't hold us up for long)
+        closing = [connection.writer.wait_closed() for connection in connections]
+        try:
+            await asyncio.wait_for(asyncio.gather(*closing, return_exceptions=True), CONNECT_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        self.loop.stop()
@@ -0,0 +1,91 @@
+"""bench_async_server.py - Concurrent connections and messages/sec for the asyncio server on loopback
+
+Run from the project folder: python benchmarks/bench_async_server.py [connections] [messages per connection]
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import sys
+import time
+import asyncio
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_network_manager import AsyncNetworkManager
+from framing import encode_frame
+from message_codec import encode_message, decode_message
+
+PORT = 5599
+
+
+class CountingServer(AsyncNetworkManager):
+    """Server that decodes and counts every action it receives"""
+    def __init__(self, port, max_connections):
+        super().__init__(is_server=True, port=port, max_connections=max_connections)
+        self.received = 0
+        self.all_received = threading.Event()
+        self.expected = 0
+
+    def _encode_message(self, message):
+        return encode_message(message)
+
+    def _decode_message(self, payload):
+        return decode_message(payload)
+
+    def _process_message(self, message, sender=None):
+        self.received += 1
+        if self.received == self.expected:
+            self.all_received.set()
+
+
+async def run_clients(connections, messages):
+    """Open every connection, then have each one send its actions as fast as it can"""
+    frame = encode_frame(encode_message({'type': 'action', 'action': 'raise', 'amount': 100, 'player_id': 1}))
+
+    start = time.perf_counter()
+    streams = await asyncio.gather(*[asyncio.open_connection('127.0.0.1', PORT) for _ in range(connections)])
+    connect_time = time.perf_counter() - start
+
+    async def send_all(writer):
+        for _ in range(messages):
+            writer.write(frame)
+            await writer.drain()
+
+    send_start = time.perf_counter()
+    await asyncio.gather(*[send_all(writer) for _, writer in streams])
+    return streams, connect_time, send_start
+
+
+async def close_clients(streams):
+    """Close every client connection and wait for the sockets to close"""
+    for _, writer in streams:
+        writer.close()
+    await asyncio.gather(*[writer.wait_closed() for _, writer in streams], return_exceptions=True)
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    server = CountingServer(PORT, max_connections=connections)
+    server.expected = connections * messages
+    server.start()
+
+    loop = asyncio.new_event_loop()
+    streams, connect_time, send_start = loop.run_until_complete(run_clients(connections, messages))
+    server.all_received.wait(timeout=60)
+    elapsed = time.perf_counter() - send_start
+
+    print(f"connections: {connections} (all open after {connect_time * 1000:.0f} ms)")
+    print(f"messages:    {server.received} / {server.expected} in {elapsed:.2f} s")
+    print(f"throughput:  {server.received / elapsed:,.0f} messages/sec")
+
+    loop.run_until_complete(close_clients(streams))
+    loop.close()
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""bench_broadcast.py - Cost of one game state broadcast as the audience grows, encoding per client vs once
+
+Run from the project folder: python benchmarks/bench_broadcast.py
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from framing import encode_frame
+from message_codec import encode_message
+from send_queue import SendQueue
+from state_sync import StateSyncServer
+
+AUDIENCES = [1, 10, 100, 1000, 10000]
+BROADCASTS = 50
+
+
+def encode_once(message):
+    """What the server queues: one read-only framed buffer"""
+    return memoryview(encode_frame(encode_message(message)))
+
+
+def make_state(turn):
+    """A public table state that changes a little every turn"""
+    return {
+        'pot': 100 + turn * 20,
+        'game_state': 1 + turn % 4,
+        'player1_balance': 5000 - turn * 10,
+        'player2_balance': 5000 - turn * 10,
+        'player1_bet': turn * 10,
+        'player2_bet': turn * 10,
+        'current_player_id': turn % 2,
+        'community_cards': [3, 17, 30, 41, 50][:3 + turn % 3],
+    }
+
+
+def run(audience, shared):
+    """Average seconds per broadcast to an audience that acks every version"""
+    state_sync = StateSyncServer()
+    queues = [SendQueue() for _ in range(audience)]
+    total = 0
+
+    for turn in range(BROADCASTS):
+        state_sync.publish(make_state(turn))
+
+        start = time.perf_counter()
+        for client, send_queue in enumerate(queues):
+            if shared:
+                frame = state_sync.frame_for(client, encode_once)
+            else:
+                frame = encode_frame(encode_message(state_sync.message_for(client)))
+            send_queue.push(frame, 'game_state')
+        total += time.perf_counter() - start
+
+        # Everyone receives and acks before the next action
+        for client, send_queue in enumerate(queues):
+            send_queue.pop()
+            state_sync.ack(client, state_sync.version)
+
+    return total / BROADCASTS
+
+
+def main():
+    print(f"{'audience':>8}  {'per client':>12}  {'encode once':>12}  {'per peer (once)':>16}")
+    for audience in AUDIENCES:
+        per_client = run(audience, shared=False)
+        once = run(audience, shared=True)
+        print(f"{audience:>8}  {per_client * 1e3:9.3f} ms  {once * 1e3:9.3f} ms  {once / audience * 1e6:13.2f} us")
+
+
+if __name__ == '__main__':
+    main()
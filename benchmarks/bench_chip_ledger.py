@@ -0,0 +1,98 @@
+"""bench_chip_ledger.py - Simulated hands with every chip recorded, then the whole ledger reconciled in one pass
+
+Run from the project folder: python benchmarks/bench_chip_ledger.py [hands]
+Two random players play heads-up hands on a PokerTable (any legal action, random
+raise sizes, a fresh 1000 chips when one goes broke). Each hand is checked as it
+ends; afterwards reconcile() replays every transfer and checks every hand again.
+Prints simulation and reconciliation speed, ledger size and any hands that leaked.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import io
+import os
+import sys
+import time
+import random
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import *
+from poker_table import PokerTable, BETTING_STATES
+from chip_ledger import ChipLedger, ACCOUNT_NAMES, reconcile
+
+HANDS = 100000
+START_BALANCE = 1000
+SMALL_BLIND = 5
+MAX_ACTIONS = 50  # Per hand, in case a hand never ends
+LEAKS_SHOWN = 3
+
+
+def random_action(table, rng):
+    """A legal action for the player to act, with a random raise size"""
+    seat = 0 if table.current_player == table.player1 else 1
+    player = table.current_player
+    other_player = table.player2 if player == table.player1 else table.player1
+    for action in rng.sample(['fold', 'check', 'call', 'raise', 'raise'], 5):
+        amount = 0
+        if action == 'fold' and rng.random() < 0.7:
+            continue  # Folding every time it comes up first ends most hands preflop
+        if action == 'raise':
+            amount = other_player.current_bet + rng.randint(1, max(1, player.balance))
+        if table.validate_action(seat, action, amount) is None:
+            return action, amount
+    return 'fold', 0
+
+
+def simulate(hands, seed=1):
+    """Play hands on one table, returns the table and the seconds it took"""
+    rng = random.Random(seed)
+    table = PokerTable()
+    table.ledger = table.game_over_handler.ledger = ChipLedger(max_hands=0)
+    table.set_small_blind(SMALL_BLIND)
+    table.player1.balance = table.player2.balance = START_BALANCE
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        for hand in range(hands):
+            if table.game_state == STATE_LOST:
+                table.player1.balance = table.player2.balance = START_BALANCE
+            table.reset_game(seed * 1000003 + hand)
+
+            for _ in range(MAX_ACTIONS):
+                if table.game_state not in BETTING_STATES:
+                    break
+                table.handle_remote_action(*random_action(table, rng))
+
+            # Don't let the rules' debug output pile up
+            output.seek(0)
+            output.truncate()
+    return table, time.perf_counter() - start
+
+
+def main():
+    hands = int(sys.argv[1]) if len(sys.argv) > 1 else HANDS
+    table, simulate_time = simulate(hands)
+    ledger = table.ledger
+
+    start = time.perf_counter()
+    problems = reconcile(ledger)
+    reconcile_time = time.perf_counter() - start
+
+    stats = ledger.stats()
+    print(f"{stats['hands']} hands, {stats['records']} transfers, {stats['bytes'] / stats['hands']:.1f} bytes/hand")
+    print(f"simulate   {simulate_time:7.2f} s  {stats['hands'] / simulate_time:10.0f} hands/s")
+    print(f"reconcile  {reconcile_time:7.2f} s  {stats['hands'] / reconcile_time:10.0f} hands/s")
+    print(f"leaks: {ledger.leaks} found as hands ended, {len(problems)} found reconciling")
+
+    for hand, problem in problems[:LEAKS_SHOWN]:
+        print(f"  hand {hand}: {problem}")
+        for source, destination, amount in ledger.hand_transfers(hand):
+            print(f"    {ACCOUNT_NAMES[source]:>8} -> {ACCOUNT_NAMES[destination]:<8} ${amount}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""bench_codec.py - Compares the binary message codec with pickle for size and speed
+
+Run from the project folder: python benchmarks/bench_codec.py
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import sys
+import pickle
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from message_codec import encode_message, decode_message
+
+ROUNDS = 20000
+REPEATS = 10  # The fastest of several runs, so a busy machine doesn't skew one codec
+
+# Typical messages: a raise, and the state after the turn card
+MESSAGES = {
+    'action': {'type': 'action', 'action': 'raise', 'amount': 250, 'player_id': 1},
+    'game_state': {'type': 'game_state', 'version': 12, 'base_version': 0, 'state': {
+        'pot': 1200,
+        'game_state': 3,
+        'player1_balance': 4400,
+        'player2_balance': 3900,
+        'player1_bet': 200,
+        'player2_bet': 200,
+        'current_player_id': 1,
+        'community_cards': [10, 23, 51, 4],
+    }},
+    # A typical delta after a bet: pot, one balance, one bet and the turn changed
+    'state_delta': {'type': 'game_state', 'version': 13, 'base_version': 12, 'state': {
+        'pot': 1400,
+        'player2_balance': 3700,
+        'player2_bet': 400,
+        'current_player_id': 0,
+    }},
+}
+
+# What the old pickle path sent for community cards
+PICKLE_CARDS = ['Queen of Hearts', '10 of Diamonds', 'Ace of Spades', '6 of Clubs']
+
+
+def bench(name, encode, decode, message):
+    """Print size, encode and decode speed for one codec"""
+    data = encode(message)
+    encode_time = min(timeit.repeat(lambda: encode(message), number=ROUNDS, repeat=REPEATS))
+    decode_time = min(timeit.repeat(lambda: decode(data), number=ROUNDS, repeat=REPEATS))
+    print(f"  {name:<8} {len(data):>5} bytes  "
+          f"encode {encode_time / ROUNDS * 1e6:6.2f} us  decode {decode_time / ROUNDS * 1e6:6.2f} us")
+
+
+def main():
+    for msg_type, message in MESSAGES.items():
+        print(f"{msg_type}:")
+
+        # The pickle path resent the whole state, with card names instead of ids
+        pickle_message = message
+        if msg_type != 'action':
+            pickle_message = {'type': 'game_state', 'state': dict(MESSAGES['game_state']['state'],
+                                                                  community_cards=PICKLE_CARDS)}
+
+        bench('pickle', pickle.dumps, pickle.loads, pickle_message)
+        bench('binary', encode_message, decode_message, message)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""bench_hand_history.py - Writing random hands to the columnar hand history and loading them back
+
+Run from the project folder: python benchmarks/bench_hand_history.py [hands] [directory]
+Plays random hands on a PokerTable with a HandHistoryWriter attached until the
+requested number are recorded (reporting the deals it had to skip), then loads
+every column back and reports how long it took and what that means for 10 million
+hands. A smaller traced run (tracemalloc) checks memory stays flat as hands are added. Uses numpy
+(memory-mapped) to load if it is installed, hand_history.read_column otherwise.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import io
+import os
+import sys
+import time
+import random
+import tempfile
+import contextlib
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import *
+from poker_table import PokerTable, BETTING_STATES
+from hand_history import HandHistoryWriter, COLUMNS, read_column
+from bench_chip_ledger import random_action, START_BALANCE, SMALL_BLIND, MAX_ACTIONS
+
+HANDS = 200000
+CHUNK = 16384
+TRACED_CHUNK = 1024  # Smaller chunks for the memory check, tracing makes hands much slower
+TRACED_HANDS = (2048, 8192)
+TARGET_HANDS = 10000000
+
+
+def write(hands, directory, chunk=CHUNK, seed=1, traced=False):
+    """Deal until `hands` hands are in the history, returns (writer, seconds, peak traced bytes or None, skipped)
+
+    skipped is (hands stopped at MAX_ACTIONS, deals where a player couldn't pay the blinds),
+    neither of which the history records.
+    """
+    rng = random.Random(seed)
+    table = PokerTable()
+    table.ledger = table.game_over_handler.ledger = None
+    table.player_stats = None
+    table.hand_history = HandHistoryWriter(directory, chunk=chunk)
+    table.set_small_blind(SMALL_BLIND)
+    table.player1.balance = table.player2.balance = START_BALANCE
+
+    if traced:
+        tracemalloc.start()
+    start = time.perf_counter()
+    recorded = dealt = unfinished = undealt = 0
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        while recorded < hands:
+            if table.game_state == STATE_LOST:
+                table.player1.balance = table.player2.balance = START_BALANCE
+            table.reset_game(seed * 1000003 + dealt)
+            dealt += 1
+            if table.game_state == STATE_LOST:
+                undealt += 1
+                continue
+
+            for _ in range(MAX_ACTIONS):
+                if table.game_state not in BETTING_STATES:
+                    break
+                table.handle_remote_action(*random_action(table, rng))
+
+            # A hand still open here never finished, the next deal drops it
+            if table.hand_history.hand_open:
+                unfinished += 1
+            else:
+                recorded += 1
+
+            # Don't let the rules' debug output pile up
+            output.seek(0)
+            output.truncate()
+    table.hand_history.close()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if traced:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return table.hand_history, elapsed, peak, (unfinished, undealt)
+
+
+def load(directory):
+    """Load every column, returns (seconds, bytes on disk, how)"""
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    size = sum(os.path.getsize(os.path.join(directory, name + '.npy')) for name in COLUMNS)
+    start = time.perf_counter()
+    for name in COLUMNS:
+        path = os.path.join(directory, name + '.npy')
+        if numpy:
+            column = numpy.load(path, mmap_mode='r')
+            column.sum()  # Touch every value so it is really read
+        else:
+            read_column(path)
+    how = 'numpy, memory-mapped' if numpy else "hand_history.read_column (pure Python fallback, numpy isn't installed)"
+    return time.perf_counter() - start, size, how
+
+
+def main():
+    hands = int(sys.argv[1]) if len(sys.argv) > 1 else HANDS
+    directory = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), 'heads_down_history')
+
+    for traced_hands in TRACED_HANDS:
+        _, _, peak, _ = write(traced_hands, directory, chunk=TRACED_CHUNK, traced=True)
+        print(f"{traced_hands:>6} hands: peak traced memory {peak / 1024:.0f} KiB")
+
+    writer, write_time, _, (unfinished, undealt) = write(hands, directory)
+    rows = writer.rows
+    print(f"wrote {rows} hands to {directory} in {write_time:.2f} s ({rows / write_time:.0f} hands/s), "
+          f"{writer.overflow} actions past the per-street limit")
+    print(f"skipped {unfinished + undealt} deals the history doesn't record: {unfinished} stopped after "
+          f"{MAX_ACTIONS} actions, {undealt} where a player couldn't pay the blinds")
+
+    load_time, size, how = load(directory)
+    print(f"loaded {size / 1e6:.1f} MB ({size / rows:.0f} bytes/hand) in {load_time * 1000:.1f} ms with {how}")
+    print(f"10 million hands: {size / rows * TARGET_HANDS / 1e9:.2f} GB, about "
+          f"{load_time / rows * TARGET_HANDS:.1f} s to load with {how}")
+
+    # Spot check the first hand against its seed
+    seeds, _ = read_column(os.path.join(directory, 'seed.npy'))
+    pots, _ = read_column(os.path.join(directory, 'pot.npy'))
+    print(f"first hand: seed {seeds[0]}, pot ${pots[0]}")
+
+
+if __name__ == '__main__':
+    main()
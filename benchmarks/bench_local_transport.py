@@ -0,0 +1,115 @@
+"""bench_local_transport.py - Action to new state latency for a same-host bot: TCP vs Unix socket vs shared memory
+
+Run from the project folder: python benchmarks/bench_local_transport.py [actions]
+The host runs in its own process, like a table host next to a bot. Each round the
+bot sends an action and waits until it has the state that action caused: over the
+socket for TCP and Unix, read out of the shared memory ring for shared memory (after the
+host's state_ready notice on the Unix socket).
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from poker_network_manager import PokerNetworkManager
+
+ACTIONS = 2000
+TRANSPORTS = [('tcp', 5761), ('unix', 5762), ('unix + shared memory', 5763)]
+
+
+class BenchTable:
+    """Just enough of a game for the host: every raise grows the pot"""
+    def __init__(self):
+        self.pot = 0
+
+    def handle_remote_action(self, action, amount=0, player_id=None):
+        self.pot += amount
+
+    def get_network_state(self):
+        return {'pot': self.pot, 'game_state': 1, 'current_player_id': 1}
+
+    def update_from_network(self, changes):
+        pass
+
+
+def run_host(port, unix_path, shared_name, ready, done):
+    """Host process: apply actions and send (or publish) the new state as fast as they come"""
+    host = PokerNetworkManager(BenchTable(), is_server=True, port=port)
+    host.unix_path = unix_path
+    if shared_name:
+        host.enable_shared_state(shared_name)
+
+    wake = threading.Event()
+    host.on_message = wake.set
+    host.start()
+    ready.set()
+
+    while not done.is_set():
+        wake.wait(0.1)
+        wake.clear()
+        host.process_messages()
+    host.stop()
+
+
+def measure(transport, port, actions):
+    """Latencies in seconds of `actions` action -> state round trips"""
+    unix_path = os.path.join(tempfile.gettempdir(), f'heads_down_bench_{port}.sock')
+    shared_name = f'heads_down_bench_{port}' if 'shared' in transport else None
+
+    ready, done = multiprocessing.Event(), multiprocessing.Event()
+    host = multiprocessing.Process(target=run_host, args=(port, unix_path, shared_name, ready, done))
+    host.start()
+    ready.wait(10)
+
+    server_ip = '127.0.0.1' if transport == 'tcp' else f'unix:{unix_path}'
+    client = PokerNetworkManager(BenchTable(), is_server=False, server_ip=server_ip, port=port)
+    if shared_name:
+        client.enable_shared_state(shared_name)
+    wake = threading.Event()
+    client.on_message = wake.set
+    client.start()
+
+    # Wait for the hello to be answered before timing anything
+    while client.session_token is None:
+        wake.wait(0.01)
+        wake.clear()
+        client.process_messages()
+
+    latencies = []
+    for _ in range(actions):
+        target = client.state_sync.version + 1
+        start = time.perf_counter()
+        client.send_action('raise', 10, 1)
+        while client.state_sync.version < target:
+            # Socket states wake us up, or the state_ready notice for shared memory
+            wake.wait(0.1)
+            wake.clear()
+            client.process_messages()
+        latencies.append(time.perf_counter() - start)
+
+    client.stop()
+    done.set()
+    host.join()
+    return sorted(latencies)
+
+
+def main():
+    actions = int(sys.argv[1]) if len(sys.argv) > 1 else ACTIONS
+    print(f"{'transport':>22}  {'mean':>9}  {'p50':>9}  {'p99':>9}")
+    for transport, port in TRANSPORTS:
+        latencies = measure(transport, port, actions)
+        mean = sum(latencies) / len(latencies)
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99)]
+        print(f"{transport:>22}  {mean * 1e6:6.0f} us  {p50 * 1e6:6.0f} us  {p99 * 1e6:6.0f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""bench_player_stats.py - Per-player stats over simulated hands played by several worker processes
+
+Run from the project folder: python benchmarks/bench_player_stats.py [hands] [workers]
+Each worker plays its share of random hands on its own PokerTable, the trackers are
+merged, and the result is printed like a HUD. Also times what recording one action
+and taking a snapshot cost.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import io
+import os
+import sys
+import time
+import random
+import contextlib
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import *
+from poker_table import PokerTable, BETTING_STATES
+from player_stats import PlayerStatsTracker
+from bench_chip_ledger import random_action, START_BALANCE, SMALL_BLIND, MAX_ACTIONS
+
+HANDS = 100000
+WORKERS = 4
+SNAPSHOTS = 10000
+ACTION_ROUNDS = 200000
+
+
+def play(hands, seed=1):
+    """Play hands on one table, returns its stats tracker"""
+    rng = random.Random(seed)
+    table = PokerTable()
+    table.ledger = table.game_over_handler.ledger = None
+    table.set_small_blind(SMALL_BLIND)
+    table.player1.balance = table.player2.balance = START_BALANCE
+
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        for hand in range(hands):
+            if table.game_state == STATE_LOST:
+                table.player1.balance = table.player2.balance = START_BALANCE
+            table.reset_game(seed * 1000003 + hand)
+
+            for _ in range(MAX_ACTIONS):
+                if table.game_state not in BETTING_STATES:
+                    break
+                table.handle_remote_action(*random_action(table, rng))
+
+            # Don't let the rules' debug output pile up
+            output.seek(0)
+            output.truncate()
+    return table.player_stats
+
+
+def play_share(args):
+    """Worker: a share of the hands with its own seed"""
+    hands, seed = args
+    return play(hands, seed)
+
+
+def percent(value):
+    """A rate for the table, - if there's nothing to work it out from"""
+    return '   -' if value is None else f"{value * 100:5.1f}%"
+
+
+def main():
+    hands = int(sys.argv[1]) if len(sys.argv) > 1 else HANDS
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else WORKERS
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        trackers = pool.map(play_share, [(hands // workers, seed + 1) for seed in range(workers)])
+    merged = PlayerStatsTracker()
+    for tracker in trackers:
+        merged.merge(tracker)
+    print(f"{hands} hands over {workers} workers in {time.perf_counter() - start:.2f} s")
+
+    print(f"{'':>20}  {'hands':>7}  {'VPIP':>6}  {'PFR':>6}  {'AF':>5}  {'WTSD':>6}  {'W$SD':>6}")
+    for player_id, positions in merged.snapshot().items():
+        for position, stats in positions.items():
+            aggression = '    -' if stats['aggression'] is None else f"{stats['aggression']:5.2f}"
+            print(f"{f'player {player_id} {position}':>20}  {stats['hands']:7}  {percent(stats['vpip'])}"
+                  f"  {percent(stats['pfr'])}  {aggression}  {percent(stats['went_to_showdown'])}"
+                  f"  {percent(stats['won_at_showdown'])}")
+
+    # Cost per action: the calls the table makes, timed on their own (a whole hand is too noisy to subtract)
+    tracker = PlayerStatsTracker()
+    tracker.new_hand(1, 2)
+    sequence = [(1, 'call', STATE_PREFLOP), (2, 'raise', STATE_PREFLOP), (1, 'call', STATE_PREFLOP),
+                (2, 'check', STATE_FLOP), (1, 'raise', STATE_FLOP), (2, 'fold', STATE_FLOP)]
+    start = time.perf_counter()
+    for _ in range(ACTION_ROUNDS):
+        for player_id, action, game_state in sequence:
+            tracker.action(player_id, action, game_state)
+    print(f"action {(time.perf_counter() - start) / (ACTION_ROUNDS * len(sequence)) * 1e9:.0f} ns")
+
+    start = time.perf_counter()
+    for _ in range(SNAPSHOTS):
+        merged.snapshot()
+    print(f"snapshot {(time.perf_counter() - start) / SNAPSHOTS * 1e6:.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+"""bench_reconnect.py - Time from a dropped connection until the client is back in sync with the host, over loopback
+
+Run from the project folder: python benchmarks/bench_reconnect.py [drops]
+The host runs in its own process and keeps changing its state, like a table that
+plays on while a player is away. Each round the client cuts its connection, reconnects
+with its session token and catches up on whatever changed meanwhile. Exits with an
+error if any recovery takes RECOVERY_LIMIT seconds or longer.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import sys
+import time
+import socket
+import threading
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import *
+from poker_network_manager import PokerNetworkManager
+
+DROPS = 20
+PORT = 5771
+STATE_INTERVAL = 0.005  # Seconds between the host's state changes
+SETTLE_TIME = 0.1  # Seconds of normal play between drops
+RECOVERY_LIMIT = 1.0
+
+
+class BenchTable:
+    """Just enough of a game for the host: the pot keeps growing"""
+    def __init__(self):
+        self.pot = 0
+
+    def handle_remote_action(self, action, amount=0, player_id=None):
+        self.pot += amount
+
+    def get_network_state(self):
+        return {'pot': self.pot, 'game_state': 1, 'current_player_id': 1}
+
+    def update_from_network(self, changes):
+        pass
+
+
+def run_host(port, ready, done):
+    """Host process: apply messages, and change the state every STATE_INTERVAL"""
+    table = BenchTable()
+    host = PokerNetworkManager(table, is_server=True, port=port)
+    wake = threading.Event()
+    host.on_message = wake.set
+    host.start()
+    ready.set()
+
+    next_change = time.perf_counter()
+    while not done.is_set():
+        wake.wait(max(0, next_change - time.perf_counter()))
+        wake.clear()
+        host.process_messages()
+        if time.perf_counter() >= next_change:
+            table.pot += 1
+            host.send_game_state()
+            next_change += STATE_INTERVAL
+    host.stop()
+
+
+def pump(client, wake, done, timeout):
+    """Apply the client's messages until done() or the timeout, returns done()"""
+    deadline = time.perf_counter() + timeout
+    while not done() and time.perf_counter() < deadline:
+        wake.wait(0.01)
+        wake.clear()
+        client.process_messages()
+    return done()
+
+
+def measure(drops, port=PORT):
+    """Seconds from each drop until the client is back in sync, and the client's own measurement of it"""
+    ready, done = multiprocessing.Event(), multiprocessing.Event()
+    host = multiprocessing.Process(target=run_host, args=(port, ready, done))
+    host.start()
+    ready.wait(10)
+
+    client = PokerNetworkManager(BenchTable(), is_server=False, server_ip='127.0.0.1', port=port)
+    wake = threading.Event()
+    client.on_message = wake.set
+    client.start()
+
+    recoveries = []
+    try:
+        if not pump(client, wake, lambda: client.session_token and client.state_sync.version, 10):
+            raise RuntimeError("The host never sent a session and a state")
+
+        for _ in range(drops):
+            pump(client, wake, lambda: False, SETTLE_TIME)
+            client.last_recovery_time = None
+
+            # Cut the connection under the client, its receive thread notices and reconnects
+            start = time.perf_counter()
+            client.socket.shutdown(socket.SHUT_RDWR)
+            if not pump(client, wake, lambda: client.last_recovery_time is not None, RECONNECT_TIMEOUT):
+                raise RuntimeError("The client never got back in sync")
+            recoveries.append((time.perf_counter() - start, client.last_recovery_time))
+    finally:
+        client.stop()
+        done.set()
+        host.join()
+    return recoveries
+
+
+def main():
+    drops = int(sys.argv[1]) if len(sys.argv) > 1 else DROPS
+    recoveries = measure(drops)
+
+    totals = sorted(total for total, _ in recoveries)
+    reported = sorted(seconds for _, seconds in recoveries)
+    print(f"{drops} drops, back in sync after (ms):")
+    print(f"  {'':>16}  {'mean':>7}  {'p50':>7}  {'max':>7}")
+    for name, values in (('from the drop', totals), ('client reported', reported)):
+        print(f"  {name:>16}  {sum(values) / len(values) * 1000:7.1f}  "
+              f"{values[len(values) // 2] * 1000:7.1f}  {values[-1] * 1000:7.1f}")
+
+    if totals[-1] >= RECOVERY_LIMIT:
+        print(f"FAIL: a recovery took {totals[-1]:.2f} s, the limit is {RECOVERY_LIMIT:.0f} s")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""bench_settlement.py - Showdown settlement: evaluate each hand once vs once per pot
+
+Run from the project folder: python benchmarks/bench_settlement.py [hands]
+Deals a random corpus of hands with random folds and side pots, settles each one with
+GameOverHandler.distribute_winnings and with a copy of the old version that evaluated
+both hands again for every pot, checks both give the same balances and messages, and
+times them. The evaluator's debug output is discarded while timing.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import io
+import os
+import sys
+import time
+import random
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card import Card
+from board import Board
+from player import Player
+from game_over_handler import GameOverHandler
+
+HANDS = 20000
+MAX_SIDE_POTS = 3
+
+
+def legacy_distribute_winnings(self, player1, player2, community_cards):
+    """GameOverHandler.distribute_winnings before it evaluated each hand once (self is the handler)"""
+    winnings = {player1: 0, player2: 0}
+    result_message = ""
+
+    # Process each side pot from smallest to largest
+    for pot_amount, eligible_players in self.pots:
+        # Skip if both players folded
+        if player1.is_folded and player2.is_folded:
+            continue
+
+        # If one player folded, give pot to the other
+        if player1.is_folded and player2 in eligible_players:
+            winnings[player2] += pot_amount
+            result_message += f"Side pot ${pot_amount}: Player 2 wins (Player 1 folded)\n"
+            continue
+
+        if player2.is_folded and player1 in eligible_players:
+            winnings[player1] += pot_amount
+            result_message += f"Side pot ${pot_amount}: Player 1 wins (Player 2 folded)\n"
+            continue
+
+        # Both players still in, determine winner
+        eligible_p1 = player1 in eligible_players and not player1.is_folded
+        eligible_p2 = player2 in eligible_players and not player2.is_folded
+
+        if eligible_p1 and eligible_p2:
+            # Evaluate both hands
+            hand1 = self.hand_evaluator.evaluate_hand(player1.hand.cards, community_cards.hand.cards)
+            hand2 = self.hand_evaluator.evaluate_hand(player2.hand.cards, community_cards.hand.cards)
+
+            # Get hand names
+            hand1_name = self.hand_evaluator.get_hand_name(hand1[0])
+            hand2_name = self.hand_evaluator.get_hand_name(hand2[0])
+
+            # Compare hands
+            result = self.hand_evaluator.compare_hands(hand1, hand2)
+
+            if result == 1:
+                winnings[player1] += pot_amount
+                result_message += f"Side pot ${pot_amount}: Player 1 wins with {hand1_name}\n"
+            elif result == 2:
+                winnings[player2] += pot_amount
+                result_message += f"Side pot ${pot_amount}: Player 2 wins with {hand2_name}\n"
+            else:
+                # Split pot for ties
+                split_amount = pot_amount // 2
+                remainder = pot_amount % 2
+
+                winnings[player1] += split_amount
+                winnings[player2] += split_amount
+
+                # Give the remainder to player1 (arbitrary)
+                if remainder > 0:
+                    winnings[player1] += remainder
+
+                result_message += f"Side pot ${pot_amount}: Tie with {hand1_name}. Split pot.\n"
+        elif eligible_p1:
+            winnings[player1] += pot_amount
+            result_message += f"Side pot ${pot_amount}: Player 1 wins (Player 2 not eligible)\n"
+        elif eligible_p2:
+            winnings[player2] += pot_amount
+            result_message += f"Side pot ${pot_amount}: Player 2 wins (Player 1 not eligible)\n"
+
+    # Process the main pot
+    if self.main_pot > 0:
+        # Skip if both players folded
+        if not (player1.is_folded and player2.is_folded):
+            # If one player folded, give pot to the other
+            if player1.is_folded:
+                winnings[player2] += self.main_pot
+                result_message += f"Main pot ${self.main_pot}: Player 2 wins (Player 1 folded)\n"
+            elif player2.is_folded:
+                winnings[player1] += self.main_pot
+                result_message += f"Main pot ${self.main_pot}: Player 1 wins (Player 2 folded)\n"
+            else:
+                # Both players still in, determine winner
+                hand1 = self.hand_evaluator.evaluate_hand(player1.hand.cards, community_cards.hand.cards)
+                hand2 = self.hand_evaluator.evaluate_hand(player2.hand.cards, community_cards.hand.cards)
+
+                # Get hand names
+                hand1_name = self.hand_evaluator.get_hand_name(hand1[0])
+                hand2_name = self.hand_evaluator.get_hand_name(hand2[0])
+
+                # Compare hands
+                result = self.hand_evaluator.compare_hands(hand1, hand2)
+
+                if result == 1:
+                    winnings[player1] += self.main_pot
+                    result_message += f"Main pot ${self.main_pot}: Player 1 wins with {hand1_name}\n"
+                elif result == 2:
+                    winnings[player2] += self.main_pot
+                    result_message += f"Main pot ${self.main_pot}: Player 2 wins with {hand2_name}\n"
+                else:
+                    # Split pot for ties
+                    split_amount = self.main_pot // 2
+                    remainder = self.main_pot % 2
+
+                    winnings[player1] += split_amount
+                    winnings[player2] += split_amount
+
+                    # Give the remainder to player1 (arbitrary)
+                    if remainder > 0:
+                        winnings[player1] += remainder
+
+                    result_message += f"Main pot ${self.main_pot}: Tie with {hand1_name}. Split pot.\n"
+
+    # Update player balances
+    player1.balance += winnings[player1]
+    player2.balance += winnings[player2]
+
+    # Reset bets
+    player1.current_bet = 0
+    player2.current_bet = 0
+
+    return result_message
+
+
+def deal_corpus(hands, seed=1):
+    """Random deals as (hole cards 1, hole cards 2, board, folded 1, folded 2, side pots, main pot)
+
+    Side pots name who may win them by player number, so every run settles the same hands.
+    """
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(hands):
+        cards = rng.sample(range(52), 9)
+        folded = rng.random()  # 10% player 1 folded, 10% player 2, 2% both (nobody is paid)
+        side_pots = [(rng.randint(1, 500), rng.choice([(1,), (2,), (1, 2)]))
+                     for _ in range(rng.randint(0, MAX_SIDE_POTS))]
+        corpus.append((cards[0:2], cards[2:4], cards[4:9],
+                       folded < 0.1, 0.1 <= folded < 0.2 or folded > 0.98,
+                       side_pots, rng.choice([0, rng.randint(1, 2001)])))
+    return corpus
+
+
+def settle(corpus, distribute):
+    """Settle every hand with distribute(handler, player1, player2, board), returns results and seconds"""
+    handler = GameOverHandler()
+    player1, player2, board = Player(1), Player(2), Board()
+    results = []
+    elapsed = 0.0
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        for hole1, hole2, community, folded1, folded2, side_pots, main_pot in corpus:
+            player1.hand.cards = [Card.from_id(card) for card in hole1]
+            player2.hand.cards = [Card.from_id(card) for card in hole2]
+            board.hand.cards = [Card.from_id(card) for card in community]
+            player1.balance = player2.balance = 0
+            player1.is_folded, player2.is_folded = folded1, folded2
+
+            players = {1: player1, 2: player2}
+            handler.pots = [(amount, [players[number] for number in eligible]) for amount, eligible in side_pots]
+            handler.main_pot = main_pot
+
+            start = time.perf_counter()
+            message = distribute(handler, player1, player2, board)
+            elapsed += time.perf_counter() - start
+            results.append((player1.balance, player2.balance, message))
+
+            # Don't let the discarded debug output pile up
+            output.seek(0)
+            output.truncate()
+    return results, elapsed, handler
+
+
+def main():
+    hands = int(sys.argv[1]) if len(sys.argv) > 1 else HANDS
+    corpus = deal_corpus(hands)
+
+    legacy, legacy_time, _ = settle(corpus, legacy_distribute_winnings)
+    current, current_time, handler = settle(corpus, GameOverHandler.distribute_winnings)
+
+    mismatches = sum(1 for old, new in zip(legacy, current) if old != new)
+    cost = handler.settlement_cost()
+    print(f"{hands} hands, {sum(len(hand[5]) for hand in corpus) + sum(1 for hand in corpus if hand[6])} pots")
+    print(f"{'once per pot':>14}  {legacy_time:7.3f} s  {legacy_time / hands * 1e6:7.1f} us/hand")
+    print(f"{'once per hand':>14}  {current_time:7.3f} s  {current_time / hands * 1e6:7.1f} us/hand"
+          f"  ({legacy_time / current_time:.1f}x)")
+    print(f"evaluations per settlement: {cost['evaluations_per_settlement']:.2f}")
+    print(f"mismatched results: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+"""bench_table_memory.py - Memory per table and per hand: slotted, reused cards and hands vs the old dict-backed ones
+
+Run from the project folder: python benchmarks/bench_table_memory.py [tables] [hands]
+Builds many tables' players, community cards and deck with the current classes and
+with copies of the old ones (a dict per object, 52 new cards per deck, a new Hand
+for every player each hand), and measures with tracemalloc:
+- bytes per table once a hand is dealt
+- bytes allocated on top of that while the next hand is set up and dealt, and how long it takes
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import sys
+import time
+import random
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from card import SUITS, VALUES
+from deck import Deck
+from board import Board
+from player import Player
+from poker_table import PokerTable
+
+TABLES = 1000
+HANDS = 20000
+
+
+class LegacyCard:
+    """Card before it had slots"""
+    def __init__(self, suit, val):
+        self.suit = suit
+        self.raw_value = val
+        self.name = str(val) + " of " + suit
+
+
+class LegacyHand:
+    """Hand before it had slots"""
+    def __init__(self):
+        self.cards = []
+
+    def add_card(self, card):
+        self.cards.append(card)
+
+
+class LegacyPlayer:
+    """Player before it had slots, with a new Hand every hand"""
+    def __init__(self, id):
+        self.hand = LegacyHand()
+        self.balance = 0
+        self.password = None
+        self.current_bet = 0
+        self.is_folded = False
+        self.cards_visible = False
+        self.is_all_in = False
+        self.id = id
+
+    def reset_for_new_hand(self):
+        self.hand = LegacyHand()
+        self.current_bet = 0
+        self.is_folded = False
+        self.cards_visible = False
+        self.is_all_in = False
+
+
+class LegacyDeck:
+    """Deck before it shared its cards, made again every hand"""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed) if seed is not None else random
+        self.cards = [LegacyCard(suit, val) for suit in SUITS for val in VALUES]
+
+    def shuffle(self):
+        self.rng.shuffle(self.cards)
+
+    def deal(self):
+        return self.cards.pop(0)
+
+
+class LegacySeats:
+    """What a table held before: two players, a Player for the community cards, a deck"""
+    def __init__(self):
+        self.player1 = LegacyPlayer(1)
+        self.player2 = LegacyPlayer(2)
+        self.community_cards = LegacyPlayer(3)
+        self.community_cards.cards_visible = True
+        self.deck = LegacyDeck()
+
+    def new_hand(self, seed):
+        self.deck = LegacyDeck(seed)
+        self.deck.shuffle()
+        self.player1.reset_for_new_hand()
+        self.player2.reset_for_new_hand()
+        self.community_cards.hand = LegacyHand()
+        deal(self)
+
+
+class Seats:
+    """The same with the current classes: slotted, one deck reused, hands emptied in place"""
+    def __init__(self):
+        self.player1 = Player(1)
+        self.player2 = Player(2)
+        self.community_cards = Board()
+        self.deck = Deck()
+
+    def new_hand(self, seed):
+        self.deck.reset(seed)
+        self.deck.shuffle()
+        self.player1.reset_for_new_hand()
+        self.player2.reset_for_new_hand()
+        self.community_cards.reset_for_new_hand()
+        deal(self)
+
+
+def deal(seats):
+    """Hole cards and a full board"""
+    for player in (seats.player1, seats.player2, seats.player1, seats.player2):
+        player.hand.add_card(seats.deck.deal())
+    for _ in range(5):
+        seats.community_cards.hand.add_card(seats.deck.deal())
+
+
+def dealt_table(seed):
+    """A whole PokerTable with its first hand dealt"""
+    table = PokerTable()
+    table.set_small_blind(5)
+    table.player1.balance = table.player2.balance = 1000
+    table.reset_game(seed)
+    return table
+
+
+def dealt_seats(make):
+    """Seats of one kind with a hand dealt"""
+    def build(seed):
+        seats = make()
+        seats.new_hand(seed)
+        return seats
+    return build
+
+
+def bytes_per_table(build, tables):
+    """Traced bytes per table for tables made by build(seed)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = [build(seed) for seed in range(tables)]  # Kept alive until they are measured
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size / tables
+
+
+def per_hand(make, hands):
+    """(bytes allocated on top of a dealt table while dealing the next hand, seconds per hand)"""
+    seats = make()
+    seats.new_hand(0)
+
+    tracemalloc.start()
+    peak = 0
+    for seed in range(1, min(hands, 1000)):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        seats.new_hand(seed)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for seed in range(hands):
+        seats.new_hand(seed)
+    return peak, (time.perf_counter() - start) / hands
+
+
+def main():
+    tables = int(sys.argv[1]) if len(sys.argv) > 1 else TABLES
+    hands = int(sys.argv[2]) if len(sys.argv) > 2 else HANDS
+
+    print(f"{'':>8}  {'bytes/table':>11}  {'bytes/hand':>10}  {'time/hand':>9}")
+    for name, make in (('before', LegacySeats), ('after', Seats)):
+        size = bytes_per_table(dealt_seats(make), tables)
+        allocated, seconds = per_hand(make, hands)
+        print(f"{name:>8}  {size:11.0f}  {allocated:10.0f}  {seconds * 1e6:6.1f} us")
+
+    print(f"whole PokerTable (rules, evaluator, ledger): {bytes_per_table(dealt_table, tables):.0f} bytes/table")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,226 @@
+"""load_test.py - Simulated clients playing scripted hands against a table server, with latency percentiles
+
+Run from the project folder: python benchmarks/load_test.py [--clients N] [--duration SECONDS] [--output FILE]
+Results are written as JSON so runs can be compared over time.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from poker_network_manager import create_network_manager
+from table_server import TableServer
+
+ACTION_TIMEOUT = 0.25  # Seconds to wait for the state an action should cause before giving up on it
+
+
+class SimulatedPlayer:
+    """Stands in for the game object: keeps the table state the server sends"""
+    def __init__(self):
+        self.state = {}
+
+    def update_from_network(self, changes):
+        self.state.update(changes)
+
+    def handle_remote_action(self, action, amount=0, player_id=None):
+        pass
+
+
+class LoadClient:
+    """One simulated client: a real PokerNetworkManager plus the timing of its actions"""
+    def __init__(self, server_ip, port, backend, seed):
+        self.player = SimulatedPlayer()
+        self.network = create_network_manager(self.player, False, server_ip, port, backend=backend)
+        self.rng = random.Random(seed)
+
+        # The action waiting for its state update, and when it was sent
+        self.pending_since = None
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.unanswered = 0
+        self.actions = 0
+        self.received_messages = 0
+        self.received_bytes = 0
+
+        # Time how long each action takes to come back as a game state (stamped on the network thread)
+        decode = self.network._decode_message
+        process = self.network._process_message
+
+        def count_decode(payload):
+            self.received_bytes += len(payload) + 4  # Plus the frame header
+            return decode(payload)
+
+        def stamp_process(message, sender=None):
+            self.received_messages += 1
+            if message.get('type') == 'game_state':
+                with self.lock:
+                    if self.pending_since is not None:
+                        self.latencies.append(time.perf_counter() - self.pending_since)
+                        self.pending_since = None
+            process(message, sender)
+
+        self.network._decode_message = count_decode
+        self.network._process_message = stamp_process
+
+    def my_turn(self):
+        """returns True if the server says it is our turn"""
+        state = self.player.state
+        return (self.network.seat is not None and state.get('current_player_id') == self.network.seat
+                and state.get('game_state') is not None)
+
+    def play(self):
+        """Send the next scripted action if it is our turn and nothing is in flight"""
+        with self.lock:
+            if self.pending_since is not None:
+                if time.perf_counter() - self.pending_since < ACTION_TIMEOUT:
+                    return
+                # The server ignored it (e.g. a raise it did not accept)
+                self.pending_since = None
+                self.unanswered += 1
+
+        if not self.my_turn():
+            return
+
+        state = self.player.state
+        my_bet = state.get('player1_bet' if self.network.seat == 0 else 'player2_bet', 0)
+        their_bet = state.get('player2_bet' if self.network.seat == 0 else 'player1_bet', 0)
+
+        # Script: mostly call or check, sometimes raise, fold now and then so hands end
+        roll = self.rng.random()
+        if roll < 0.1:
+            action, amount = 'fold', 0
+        elif roll < 0.2:
+            # Raises are "to" an amount, so go above their bet (the table may still refuse after 3 raises)
+            action, amount = 'raise', their_bet + 10
+        elif their_bet > my_bet:
+            action, amount = 'call', 0
+        else:
+            action, amount = 'check', 0
+
+        with self.lock:
+            self.pending_since = time.perf_counter()
+        self.actions += 1
+        self.network.send_action(action, amount, self.network.seat + 1)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_load_test(clients, duration, backend, server_ip, port, start_server, stats_port=None):
+    """Run the load test and return the results dict"""
+    server = None
+    if start_server:
+        server = TableServer(port, table_count=(clients + 1) // 2)
+        server.stats_port = stats_port  # Scrape http://127.0.0.1:<stats_port>/stats while the test runs
+        server.start()
+
+    players = [LoadClient(server_ip, port, backend, seed) for seed in range(clients)]
+    for client in players:
+        client.network.start()
+
+    # Two clients per table
+    for index, client in enumerate(players):
+        client.network.join_table(index // 2)
+    deadline = time.perf_counter() + 10
+    while time.perf_counter() < deadline and any(client.network.seat is None for client in players):
+        for client in players:
+            client.network.process_messages()
+        time.sleep(0.01)
+
+    # Only count what happens from here on
+    for client in players:
+        with client.lock:
+            client.latencies.clear()
+        client.received_messages = client.received_bytes = 0
+    sent_before = sum(stats['sent_messages'] for client in players
+                      for stats in client.network.send_queue_stats().values())
+    sent_bytes_before = sum(stats['sent_bytes'] for client in players
+                            for stats in client.network.send_queue_stats().values())
+
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        for client in players:
+            client.network.process_messages()
+            client.play()
+        time.sleep(0.0005)
+    elapsed = time.perf_counter() - start
+
+    sent = sum(stats['sent_messages'] for client in players
+               for stats in client.network.send_queue_stats().values()) - sent_before
+    sent_bytes = sum(stats['sent_bytes'] for client in players
+                     for stats in client.network.send_queue_stats().values()) - sent_bytes_before
+    received = sum(client.received_messages for client in players)
+    received_bytes = sum(client.received_bytes for client in players)
+
+    latencies = sorted(latency for client in players for latency in client.latencies)
+    results = {
+        'clients': clients,
+        'seated': sum(1 for client in players if client.network.seat is not None),
+        'backend': backend,
+        'duration_s': elapsed,
+        'actions': sum(client.actions for client in players),
+        'unanswered_actions': sum(client.unanswered for client in players),
+        'messages_sent': sent,
+        'messages_received': received,
+        'messages_per_sec': (sent + received) / elapsed,
+        'bytes_per_sec': (sent_bytes + received_bytes) / elapsed,
+        'latency_ms': {
+            'samples': len(latencies),
+            'p50': _ms(percentile(latencies, 0.50)),
+            'p99': _ms(percentile(latencies, 0.99)),
+            'p999': _ms(percentile(latencies, 0.999)),
+            'max': _ms(latencies[-1] if latencies else None),
+        },
+    }
+
+    for client in players:
+        client.network.stop()
+    if server:
+        server.stop()
+    return results
+
+
+def _ms(seconds):
+    """Seconds to milliseconds, keeping None"""
+    return None if seconds is None else seconds * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test a table server with simulated clients')
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--backend', choices=['threaded', 'asyncio'], default='threaded')
+    parser.add_argument('--server', default=None, help='host:port of a running table server (default: start one)')
+    parser.add_argument('--port', type=int, default=5597)
+    parser.add_argument('--output', default='load_test_results.json')
+    parser.add_argument('--stats-port', type=int, default=None, help='serve the started server\'s network stats here')
+    args = parser.parse_args()
+
+    server_ip, port = '127.0.0.1', args.port
+    if args.server:
+        server_ip, port = args.server.rsplit(':', 1)
+        port = int(port)
+
+    results = run_load_test(args.clients, args.duration, args.backend, server_ip, port, args.server is None,
+                            args.stats_port)
+
+    with open(args.output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
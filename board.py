@@ -0,0 +1,21 @@
+"""board.py - The community cards"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+from hand import Hand
+
+class Board:
+    """Community cards: drawn and evaluated through a hand like a player's, but always face up and with no chips"""
+    __slots__ = ('hand', 'cards_visible')
+
+    def __init__(self):
+        """Initialization"""
+        self.hand = Hand()
+        self.cards_visible = True  # community cards should always be face up
+
+    def reset_for_new_hand(self):
+        """Empty the board for a new hand"""
+        self.hand.clear()
+
+    def __str__(self):
+        return 'Board'
@@ -12,30 +12,41 @@ class Button(pygame.sprite.Sprite):
         """Initialization"""
         super().__init__()
 
-        self.image = pygame.Surface((width, height))
-        self.rect = self.image.get_rect(topleft=(x, y))
-
         self.text = text
         self.font = font
         self.idle_color = idle_color
         self.hover_color = hover_color
         self.text_color = text_color
 
-        self.render()
+        # The text never changes, so both looks are rendered once up front
+        self.idle_image = self._render_surface(width, height, idle_color)
+        self.hover_image = self._render_surface(width, height, hover_color)
 
-    def render(self, hover=False):
-        """renders the button"""
-        if hover:
-            color = self.hover_color
-        else:
-            color = self.idle_color
-        self.image.fill(color)
+        self.hovered = False
+        self.image = self.idle_image
+        self.rect = self.image.get_rect(topleft=(x, y))
+
+    def _render_surface(self, width, height, color):
+        """renders the button in one color"""
+        surface = pygame.Surface((width, height))
+        surface.fill(color)
 
-        text_surface = self.font.render(self.text, True, (0, 0, 0))  # Black text
-        text_rect = text_surface.get_rect(center=(self.rect.width // 2, self.rect.height // 2))
+        text_surface = self.font.render(self.text, True, self.text_color)
+        text_rect = text_surface.get_rect(center=(width // 2, height // 2))
 
         # Blit text onto the button surface
-        self.image.blit(text_surface, text_rect)
+        surface.blit(text_surface, text_rect)
+        return surface
+
+    def render(self, hover=False):
+        """switches to the idle or hover look, returns True if the button looks different now"""
+        hover = bool(hover)
+        if hover == self.hovered:
+            return False
+
+        self.hovered = hover
+        self.image = self.hover_image if hover else self.idle_image
+        return True
 
     def is_hovered(self, mouse_pos):
         """returns the mouse location if it hovers over the button"""
@@ -43,4 +54,26 @@ class Button(pygame.sprite.Sprite):
 
     def draw(self, screen):
         """draws the button"""
-        screen.blit(self.image, self.rect)
\ No newline at end of file
+        screen.blit(self.image, self.rect)
+
+
+class ButtonGroup(pygame.sprite.Group):
+    """A sprite group of buttons that can update hover states and draw them all in one pass"""
+    def update_hover(self, mouse_pos):
+        """Update every button's hover look, returns the buttons that changed"""
+        changed = []
+        for button in self.sprites():
+            if button.render(button.is_hovered(mouse_pos)):
+                changed.append(button)
+        return changed
+
+    def hovered_button(self, mouse_pos):
+        """Return the button under the mouse, or None"""
+        for button in self.sprites():
+            if button.is_hovered(mouse_pos):
+                return button
+        return None
+
+    def draw(self, surface):
+        """Draw all buttons with a single blits call"""
+        surface.blits([(button.image, button.rect) for button in self.sprites()], doreturn=False)
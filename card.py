@@ -2,7 +2,13 @@
 __version__ = '05/22/2025'
 __author__ = 'Kayla Cao'
 
+# Order used for compact card ids (id = suit index * 13 + value index)
+SUITS = ["Clubs", "Diamonds", "Hearts", "Spades"]
+VALUES = [2, 3, 4, 5, 6, 7, 8, 9, 10, "Jack", "Queen", "King", "Ace"]
+
 class Card:
+    __slots__ = ('suit', 'raw_value', 'name', 'id')  # No per-card dict, cards are made once (see CARDS)
+
     def __init__(self, suit, val):
         """Initialization"""
         self.suit = suit
@@ -11,6 +17,9 @@ class Card:
         # Set the display name
         self.name = str(val) + " of " + suit
 
+        # Compact id (see card_id)
+        self.id = SUITS.index(suit) * 13 + VALUES.index(val)
+
     def get_image_filename(self):
         """Return the filename for this card's image"""
         if self.raw_value == "Jack":
@@ -26,6 +35,19 @@ class Card:
 
         return f"{value_str}_of_{self.suit.lower()}.png"
 
+    def card_id(self):
+        """Return this card as a single number from 0 to 51"""
+        return self.id
+
+    @staticmethod
+    def from_id(card_id):
+        """Return the card for a number made by card_id() (cards never change, so every deck and hand shares them)"""
+        return CARDS[card_id]
+
     def __str__(self):
         """Return the string representation of this card"""
-        return self.name
\ No newline at end of file
+        return self.name
+
+
+# All 52 cards in id order, made once
+CARDS = tuple(Card(suit, val) for suit in SUITS for val in VALUES)
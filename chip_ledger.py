@@ -0,0 +1,133 @@
+"""chip_ledger.py - Double entry record of every chip that moves at a table
+
+Accounts are the bank (chips that come to or leave the table between hands), each
+player (by id) and the pot. Every transfer is stored as one integer,
+amount << 8 | source << 4 | destination, in an array of 64 bit ints, so a hand costs
+a few dozen bytes. Account balances are kept as transfers are added, so checking a
+hand when it ends is O(1): the ledger's balances must match the table's, the pot must
+be empty and the chips at the table must be the ones the bank put there.
+
+Closing a hand also stores what the table showed (record count, both balances, the
+pot), so reconcile() can replay a whole ledger - millions of simulated hands - in one
+pass without trusting the running balances.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+from array import array
+
+from config import *
+
+# Accounts (players use their id: 1 and 2)
+BANK = 0
+POT = 3
+ACCOUNTS = 4
+ACCOUNT_NAMES = {BANK: 'bank', 1: 'player 1', 2: 'player 2', POT: 'pot'}
+
+HAND_ROW = 4  # Per closed hand: records so far, player 1's balance, player 2's balance, pot
+
+
+def unpack_transfer(record):
+    """returns (source, destination, amount) of a transfer record"""
+    return record >> 4 & 0xF, record & 0xF, record >> 8
+
+
+class ChipLedger:
+    """Transfers between the bank, the players and the pot, checked at the end of every hand"""
+    def __init__(self, max_hands=CHIP_LEDGER_HANDS):
+        """Initialization (max_hands = hands of records kept, 0 keeps everything for reconcile())"""
+        self.max_hands = max_hands
+        self.records = array('q')
+        self.hands = array('q')
+        self.balances = [0] * ACCOUNTS
+        self.base = [0] * ACCOUNTS  # Balances before the first record kept
+        self.hand_open = False
+        self.closed = 0  # Hands closed since the ledger was made (not just the ones kept)
+        self.leaks = 0  # Hands whose chips didn't add up
+
+    def transfer(self, source, destination, amount):
+        """Record chips moving from one account to another"""
+        self.records.append(amount << 8 | source << 4 | destination)
+        self.balances[source] -= amount
+        self.balances[destination] += amount
+
+    def open_hand(self, balance1, balance2, pot=0):
+        """Start a hand: chips that came or went since the last one (buy-ins, abandoned hands) go through the bank"""
+        if self.max_hands and len(self.hands) >= self.max_hands * HAND_ROW:
+            # Forget the old records, the running balances carry on
+            self.base = list(self.balances)
+            del self.records[:]
+            del self.hands[:]
+
+        for account, balance in ((1, balance1), (2, balance2), (POT, pot)):
+            difference = balance - self.balances[account]
+            if difference > 0:
+                self.transfer(BANK, account, difference)
+            elif difference < 0:
+                self.transfer(account, BANK, -difference)
+        self.hand_open = True
+
+    def close_hand(self, balance1, balance2, pot):
+        """End a hand given what the table shows, returns None if every chip is accounted for, otherwise why not"""
+        if not self.hand_open:
+            return None
+        self.hand_open = False
+        self.closed += 1
+        self.hands.extend((len(self.records), balance1, balance2, pot))
+
+        problem = check_hand(self.balances, balance1, balance2, pot)
+        if problem:
+            self.leaks += 1
+        return problem
+
+    def hand_transfers(self, hand):
+        """(source, destination, amount) of every transfer recorded for a closed hand that is still kept"""
+        row = (hand - (self.closed - len(self.hands) // HAND_ROW)) * HAND_ROW
+        if row < 0 or row >= len(self.hands):
+            return []
+        start = self.hands[row - HAND_ROW] if row else 0
+        return [unpack_transfer(record) for record in self.records[start:self.hands[row]]]
+
+    def stats(self):
+        """Sizes and leak count (e.g. for a table's stats)"""
+        return {
+            'hands': self.closed,
+            'records': len(self.records),
+            'bytes': len(self.records) * self.records.itemsize + len(self.hands) * self.hands.itemsize,
+            'leaks': self.leaks,
+        }
+
+
+def check_hand(balances, balance1, balance2, pot):
+    """Conservation check for one hand: None if the ledger's balances agree with the table's, otherwise why not"""
+    if balances[POT] != 0 or pot != 0:
+        return f"{balances[POT]} chips left in the ledger's pot, {pot} on the table"
+    if balances[1] != balance1 or balances[2] != balance2:
+        return f"ledger has players at ${balances[1]} and ${balances[2]}, table shows ${balance1} and ${balance2}"
+    if balance1 + balance2 + pot != -balances[BANK]:
+        return f"{balance1 + balance2 + pot} chips at the table, the bank put in {-balances[BANK]}"
+    return None
+
+
+def reconcile(ledger):
+    """Replay every kept record in one pass, returns a list of (hand number, problem) for hands that don't add up"""
+    balances = list(ledger.base)
+    records = ledger.records
+    hands = ledger.hands
+    first_hand = ledger.closed - len(hands) // HAND_ROW
+
+    problems = []
+    position = 0
+    for row in range(0, len(hands), HAND_ROW):
+        end, balance1, balance2, pot = hands[row:row + HAND_ROW]
+        for index in range(position, end):
+            record = records[index]
+            amount = record >> 8
+            balances[record >> 4 & 0xF] -= amount
+            balances[record & 0xF] += amount
+        position = end
+
+        problem = check_hand(balances, balance1, balance2, pot)
+        if problem:
+            problems.append((first_hand + row // HAND_ROW, problem))
+    return problems
@@ -20,4 +20,64 @@ STATE_TURN = 3
 STATE_RIVER = 4
 STATE_SHOWDOWN = 5
 STATE_GAME_OVER = 6 #lost the round
-STATE_LOST = 7 #lost all money
\ No newline at end of file
+STATE_LOST = 7 #lost all money
+
+# Asset loading
+ASSET_LOADER_WORKERS = 4  # Threads used to decode images and sounds
+PLACEHOLDER_COLOR = (0, 0, 128)  # Navy blue, shown until a card image is loaded
+
+# Main loop scheduling
+EVENT_DRIVEN_LOOP = True  # Sleep until something happens instead of redrawing every frame
+FRAME_RATE = 30  # Frame rate cap (used while a redraw is pending, or always if EVENT_DRIVEN_LOOP is off)
+IDLE_TIMEOUT_MS = 500  # Longest the main loop sleeps before waking up on its own
+
+# Prompts
+INPUT_OVERLAY_COLOR = (0, 0, 0, 170)  # Dims the table behind an open prompt
+
+# Frame profiler (F3 toggles the overlay while it is on)
+PROFILER_ENABLED = False
+PROFILER_HISTORY = 300  # Frames kept for the percentiles and the trace file
+PROFILER_TRACE_FILE = 'frame_trace.json'
+
+# Chip ledger
+CHIP_LEDGER = True  # Record every chip transfer and check each hand's chips add up
+CHIP_LEDGER_HANDS = 10000  # Hands of transfer records a table keeps (0 = all, for simulations)
+
+# Player stats
+PLAYER_STATS = True  # Keep VPIP, PFR, aggression and showdown stats for both players
+
+# Hand history export (see hand_history.py)
+HAND_HISTORY_CHUNK = 65536  # Hands buffered before they are appended to the column files
+HAND_HISTORY_ACTIONS = 8  # Actions stored per street (3 raises and the answers fit)
+
+# Networking
+FRAME_BUFFER_SIZE = 64 * 1024  # Starting size of each connection's receive buffer
+MAX_FRAME_SIZE = 16 * 1024 * 1024  # Largest message a peer may send
+STATE_HISTORY = 64  # Game state versions the server keeps for building deltas
+NETWORK_BACKEND = 'threaded'  # 'threaded' (a thread per socket) or 'asyncio' (one event loop for every socket)
+MAX_CONNECTIONS = 10000  # asyncio server: connections past this are refused
+CONNECT_TIMEOUT = 5  # Seconds to wait for the server to start or the client to connect
+INBOUND_QUEUE_SIZE = 256  # Received messages waiting for the main loop, network threads wait when it is full
+INBOUND_TIME_BUDGET_MS = 4  # Most time per frame the main loop spends applying network messages
+SEND_QUEUE_MAX_BYTES = 1024 * 1024  # Bytes waiting to go out on one connection, messages past this are dropped
+SEND_QUEUE_HIGH_WATER = 256 * 1024  # A peer whose queue stays over this for SEND_STALL_TIMEOUT is disconnected
+SEND_STALL_TIMEOUT = 5  # Seconds
+HEARTBEAT_INTERVAL = 1.0  # Seconds between heartbeats
+HEARTBEAT_TIMEOUT = 5  # Seconds without hearing from a peer before its connection is dropped
+RECONNECT_TIMEOUT = 30  # Seconds a client keeps trying to reconnect before giving up
+RECONNECT_DELAY = 0.05  # Seconds between reconnect attempts
+UNIX_SOCKET_PATH = None  # Servers also listen on this Unix socket (e.g. '/tmp/heads_down.sock'), clients pick it with server_ip='unix:<path>'
+SHARED_STATE_NAME = None  # Host: shared memory block game states are also written to, for clients on a Unix socket that ask for it
+SHARED_STATE_SLOTS = 8  # States kept in the shared memory ring
+SHARED_STATE_SLOT_SIZE = 256  # Bytes per state (a full snapshot is under 50)
+STATS_PORT = None  # Serve network stats on http://127.0.0.1:<port>/stats (and /stats.txt), None = off
+TRUSTED_LOCKSTEP_MODE = False  # Both players run the rules from a shared seed and only exchange actions. Each side can work out the other's hole cards, trusted peers only
+LOCKSTEP_HASH_INTERVAL = 4  # Actions between state hash checks in lockstep mode
+
+# Table server
+TABLE_COUNT = 16  # Tables the server opens at startup
+TABLE_START_BALANCE = 1000  # Chips each player sits down with
+TABLE_SMALL_BLIND = 5
+TABLE_BATCH = 32  # Messages a table may handle before the next table gets a turn
+TABLE_STATS_INTERVAL = 10  # Seconds between per-table throughput reports
+RECONNECT_GRACE = 30  # Seconds a dropped player's seat is kept for them to reconnect with their session token
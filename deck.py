@@ -3,27 +3,32 @@ __version__ = '05/22/2025'
 __author__ = 'Kayla Cao'
 
 import random
-from card import Card
+from card import CARDS
 
 class Deck:
-    def __init__(self):
-        """Initialization"""
+    def __init__(self, seed=None):
+        """Initialization, a deck with a seed always shuffles the same way"""
+        self.rng = random.Random(seed) if seed is not None else random
         self.cards = []
         self.build()
 
     def build(self):
         """Create a new 52-card deck"""
-        suits = ["Clubs", "Diamonds", "Hearts", "Spades"]
-        values = [2, 3, 4, 5, 6, 7, 8, 9, 10, "Jack", "Queen", "King", "Ace"]  # 11=J, 12=Q, 13=K, 14=A
+        self.cards = list(CARDS)  # Jack, Queen, King, Ace are 11-14 when evaluating
 
-        self.cards = []
-        for suit in suits:
-            for val in values:
-                self.cards.append(Card(suit, val))
+    def reset(self, seed=None):
+        """Put all 52 cards back (reseeded like Deck(seed)), reusing this deck instead of making a new one"""
+        if seed is None:
+            self.rng = random
+        elif self.rng is random:
+            self.rng = random.Random(seed)
+        else:
+            self.rng.seed(seed)
+        self.cards[:] = CARDS
 
     def shuffle(self):
         """Shuffle the deck"""
-        random.shuffle(self.cards)
+        self.rng.shuffle(self.cards)
 
     def deal(self):
         """Deal one card from the deck"""
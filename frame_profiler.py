@@ -0,0 +1,136 @@
+"""frame_profiler.py - Times each part of a frame, shows an overlay and saves a trace file"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import json
+import time
+from collections import deque
+
+import pygame
+
+from config import *
+
+
+class FrameProfiler:
+    def __init__(self, screen, history=PROFILER_HISTORY, trace_file=PROFILER_TRACE_FILE):
+        """Initialization"""
+        self.screen = screen
+        self.trace_file = trace_file
+        self.show_overlay = True
+
+        # Recent frames only, so a long session doesn't keep growing
+        self.frame_times = deque(maxlen=history)  # seconds of work per frame
+        self.frame_ends = deque(maxlen=history)  # when each frame was shown (for FPS)
+        self.trace_events = deque(maxlen=history * 16)  # Chrome trace events
+
+        # Phases timed in the frame that is being built
+        self.frame_start = None
+        self.phase_totals = {}
+        self.last_phases = {}  # Per-phase totals of the last finished frame
+
+        self.overlay_font = pygame.font.SysFont(None, 20)
+
+    def attach(self, obj, phases, frame_end='present'):
+        """Wrap obj's methods so each call is timed under its phase name"""
+        # Only called when profiling is on, so a disabled profiler costs nothing
+        for method_name, phase in phases.items():
+            self._wrap(obj, method_name, phase)
+
+        # The frame_end method shows the frame, so it also draws the overlay and closes the frame
+        present = getattr(obj, frame_end)
+
+        def timed_present(*args, **kwargs):
+            if self.show_overlay:
+                start = time.perf_counter()
+                self.draw_overlay()
+                self.record('overlay', start, time.perf_counter())
+
+            start = time.perf_counter()
+            result = present(*args, **kwargs)
+            self.record('flip', start, time.perf_counter())
+            self.end_frame()
+            return result
+
+        setattr(obj, frame_end, timed_present)
+
+    def _wrap(self, obj, method_name, phase):
+        """Replace one method with a timed version"""
+        method = getattr(obj, method_name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.record(phase, start, time.perf_counter())
+
+        setattr(obj, method_name, timed)
+
+    def record(self, phase, start, end):
+        """Add one timed phase to the current frame"""
+        if self.frame_start is None:
+            self.frame_start = start
+        self.phase_totals[phase] = self.phase_totals.get(phase, 0) + (end - start)
+
+        # Trace viewers want microseconds
+        self.trace_events.append({
+            'name': phase, 'ph': 'X', 'pid': os.getpid(), 'tid': 1,
+            'ts': start * 1e6, 'dur': (end - start) * 1e6,
+        })
+
+    def end_frame(self):
+        """Close the current frame"""
+        end = time.perf_counter()
+        if self.frame_start is not None:
+            self.frame_times.append(end - self.frame_start)
+            self.trace_events.append({
+                'name': 'frame', 'ph': 'X', 'pid': os.getpid(), 'tid': 0,
+                'ts': self.frame_start * 1e6, 'dur': (end - self.frame_start) * 1e6,
+            })
+        self.frame_ends.append(end)
+
+        self.last_phases = self.phase_totals
+        self.phase_totals = {}
+        self.frame_start = None
+
+    def fps(self):
+        """Frames shown in the last second"""
+        if not self.frame_ends:
+            return 0
+        cutoff = self.frame_ends[-1] - 1.0
+        return sum(1 for end in self.frame_ends if end >= cutoff)
+
+    def percentile(self, fraction):
+        """Frame time (in ms) at the given fraction, e.g. 0.99 for p99"""
+        if not self.frame_times:
+            return 0.0
+        ordered = sorted(self.frame_times)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return ordered[index] * 1000
+
+    def draw_overlay(self):
+        """Draw FPS, p50/p99 frame time and the last frame's phases in the top right corner"""
+        lines = [
+            f"FPS: {self.fps()}",
+            f"p50: {self.percentile(0.50):.2f} ms  p99: {self.percentile(0.99):.2f} ms",
+        ]
+        for phase, seconds in sorted(self.last_phases.items()):
+            lines.append(f"{phase}: {seconds * 1000:.2f} ms")
+
+        line_height = 18
+        width = 220
+        panel = pygame.Surface((width, line_height * len(lines) + 8), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        for i, line in enumerate(lines):
+            text = self.overlay_font.render(line, True, TEXT_COLOR)
+            panel.blit(text, (6, 4 + i * line_height))
+
+        self.screen.blit(panel, (SCREEN_WIDTH - width - 10, 10))
+
+    def dump_trace(self, path=None):
+        """Save the recorded frames as a Chrome trace file (open in chrome://tracing or Perfetto)"""
+        path = path or self.trace_file
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': list(self.trace_events), 'displayTimeUnit': 'ms'}, f)
+        print(f"Frame trace saved to {path}")
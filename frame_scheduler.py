@@ -0,0 +1,79 @@
+"""frame_scheduler.py - Decides when the main loop should wake up and redraw"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import pygame
+
+from config import *
+
+# Posted from network threads so a sleeping main loop wakes up right away
+NETWORK_EVENT = pygame.USEREVENT + 2
+
+
+class FrameScheduler:
+    def __init__(self, event_driven=EVENT_DRIVEN_LOOP, frame_rate=FRAME_RATE, idle_timeout=IDLE_TIMEOUT_MS):
+        """Initialization"""
+        self.event_driven = event_driven
+        self.frame_rate = frame_rate  # Cap used while redraws are pending (or always, if not event driven)
+        self.idle_timeout = idle_timeout  # Longest we sleep before checking things like the network
+        self.clock = pygame.time.Clock()
+
+        # Redraw flags
+        self.dirty = True  # Always draw the first frame
+        self.hover_key = None  # What the mouse was over last time we drew
+        self.hover_changed = False  # The mouse moved onto or off a button since the last frame
+
+    def request_redraw(self):
+        """Ask for the next frame to be drawn"""
+        self.dirty = True
+
+    def note_event(self, event):
+        """Mark the frame dirty if this event can change what is on screen"""
+        # Mouse movement only matters when it changes which button is hovered (see note_hover)
+        if event.type != pygame.MOUSEMOTION:
+            self.dirty = True
+
+    def note_hover(self, key):
+        """Ask for a redraw if the mouse moved onto or off a button"""
+        if key != self.hover_key:
+            self.hover_key = key
+            self.hover_changed = True
+
+    def hover_only(self):
+        """returns True if only the hovered button changed since the last frame (so only buttons need redrawing)"""
+        return self.hover_changed and not self.dirty
+
+    def wait_for_events(self):
+        """Wait for the next batch of events, sleeping while nothing is happening"""
+        # Old behaviour: fixed frame rate, always redraw
+        if not self.event_driven:
+            self.clock.tick(self.frame_rate)
+            self.dirty = True
+            return pygame.event.get()
+
+        # A redraw is waiting, so keep a capped frame rate
+        if self.dirty or self.hover_changed:
+            self.clock.tick(self.frame_rate)
+            return pygame.event.get()
+
+        # Idle: block until an event arrives (network threads and the asset loader post events too)
+        event = pygame.event.wait(self.idle_timeout)
+        events = [] if event.type == pygame.NOEVENT else [event]
+        events.extend(pygame.event.get())
+
+        # Keep the clock in step so the next capped frame doesn't think we ran late
+        self.clock.tick()
+        return events
+
+    def should_render(self):
+        """returns True if a frame should be drawn, and clears the redraw flags"""
+        render = self.dirty or self.hover_changed
+        self.dirty = False
+        self.hover_changed = False
+        return render
+
+    @staticmethod
+    def wake():
+        """Wake up the main loop from another thread"""
+        if pygame.display.get_init():
+            pygame.event.post(pygame.event.Event(NETWORK_EVENT))
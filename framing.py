@@ -0,0 +1,100 @@
+"""framing.py - Length-prefixed message frames for the network code"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import struct
+
+from config import *
+
+# Every frame starts with the payload length as a 4 byte big-endian unsigned int
+FRAME_HEADER = struct.Struct('!I')
+
+
+class FrameError(Exception):
+    """Raised when a peer sends a frame we can't accept"""
+
+
+def encode_frame(payload):
+    """Put the length header in front of a payload"""
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(payload)} bytes is larger than {MAX_FRAME_SIZE}")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class FrameBuffer:
+    """Reusable receive buffer that joins partial reads and splits reads holding several frames"""
+    def __init__(self, size=FRAME_BUFFER_SIZE, max_frame_size=MAX_FRAME_SIZE):
+        """Initialization"""
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.max_frame_size = max_frame_size
+
+        # Unread bytes live in buffer[start:end]
+        self.start = 0
+        self.end = 0
+
+    def recv_from(self, sock):
+        """Read straight into the buffer from a socket, returns the number of bytes read (0 = closed)"""
+        self._make_room()
+        count = sock.recv_into(self.view[self.end:])
+        self.end += count
+        return count
+
+    def feed(self, data):
+        """Add bytes that were read some other way"""
+        self._make_room(len(data))
+        self.buffer[self.end:self.end + len(data)] = data
+        self.end += len(data)
+
+    def frames(self):
+        """Yield every complete frame payload in the buffer
+
+        Payloads are memoryviews into the buffer, so use them before the next read.
+        """
+        header_size = FRAME_HEADER.size
+        while self.end - self.start >= header_size:
+            (length,) = FRAME_HEADER.unpack_from(self.buffer, self.start)
+            if length > self.max_frame_size:
+                raise FrameError(f"Peer sent a {length} byte frame, limit is {self.max_frame_size}")
+
+            frame_end = self.start + header_size + length
+            if frame_end > self.end:
+                # Only part of this frame has arrived, make sure the rest will fit
+                self._reserve(header_size + length)
+                return
+
+            payload = self.view[self.start + header_size:frame_end]
+            self.start = frame_end
+            yield payload
+
+    def _make_room(self, needed=1):
+        """Move unread bytes to the front of the buffer, growing it only if a frame doesn't fit"""
+        if self.start == self.end:
+            # Everything has been read, start again from the front
+            self.start = self.end = 0
+        elif len(self.buffer) - self.end < needed and self.start > 0:
+            unread = self.end - self.start
+            self.buffer[:unread] = self.view[self.start:self.end]
+            self.start, self.end = 0, unread
+
+        if len(self.buffer) - self.end < needed:
+            self._grow(self.end + needed)
+
+    def _reserve(self, frame_size):
+        """Make sure a frame of this size fits once it has fully arrived"""
+        if len(self.buffer) - self.start < frame_size:
+            self._make_room(frame_size - (self.end - self.start))
+
+    def _grow(self, size):
+        """Grow the buffer (doubling) so it can hold at least size bytes"""
+        new_size = len(self.buffer)
+        while new_size < size:
+            new_size *= 2
+
+        # Copy into a new buffer, so payloads handed out earlier stay valid
+        unread = self.end - self.start
+        buffer = bytearray(new_size)
+        buffer[:unread] = self.view[self.start:self.end]
+        self.buffer = buffer
+        self.view = memoryview(buffer)
+        self.start, self.end = 0, unread
@@ -2,7 +2,10 @@
 __version__ = '05/22/2025'
 __author__ = 'Kayla Cao'
 
+import time
+
 from hand_evaluator import HandEvaluator
+from chip_ledger import POT
 
 class GameOverHandler:
     def __init__(self):
@@ -10,17 +13,29 @@ class GameOverHandler:
         self.pots = []  # List of (amount, eligible_players) tuples
         self.main_pot = 0
         self.hand_evaluator = HandEvaluator()
+        self.ledger = None  # Chip ledger payouts are recorded in, set by the table
+        self.last_categories = None  # Hand categories of both players at the last showdown
+
+        # Settlement cost: how many settlements, the hand evaluations they needed, and their total time
+        self.settlements = 0
+        self.evaluations = 0
+        self.settle_time = 0.0
 
     def reset(self):
         """Reset all pots"""
         self.pots = []
         self.main_pot = 0
 
-    @staticmethod
-    def handle_fold(folding_player, other_player, current_pot):
+    def pay(self, player, amount):
+        """Pay chips out of the pot to a player"""
+        player.balance += amount
+        if self.ledger and amount:
+            self.ledger.transfer(POT, player.id, amount)
+
+    def handle_fold(self, folding_player, other_player, current_pot):
         """Handle when a player folds"""
         # Award the pot to the other player
-        other_player.balance += current_pot
+        self.pay(other_player, current_pot)
 
         # Reset bets
         folding_player.current_bet = 0
@@ -84,6 +99,8 @@ class GameOverHandler:
         hand1 = self.hand_evaluator.evaluate_hand(player1.hand.cards, community_cards.hand.cards)
         hand2 = self.hand_evaluator.evaluate_hand(player2.hand.cards, community_cards.hand.cards)
 
+        self.last_categories = (hand1[0], hand2[0])
+
         # Get hand names for display
         hand1_name = self.hand_evaluator.get_hand_name(hand1[0])
         hand2_name = self.hand_evaluator.get_hand_name(hand2[0])
@@ -106,18 +123,18 @@ class GameOverHandler:
 
         # Award pot
         if winner:
-            winner.balance += current_pot
+            self.pay(winner, current_pot)
         else:
             # Split pot for ties
             split_amount = current_pot // 2
             remainder = current_pot % 2
 
-            player1.balance += split_amount
-            player2.balance += split_amount
+            self.pay(player1, split_amount)
+            self.pay(player2, split_amount)
 
             # Give the remainder to player1 (arbitrary)
             if remainder > 0:
-                player1.balance += remainder
+                self.pay(player1, remainder)
 
         # Reset bets
         player1.current_bet = 0
@@ -126,12 +143,22 @@ class GameOverHandler:
         return winner, message
 
     def distribute_winnings(self, player1, player2, community_cards):
-        """Distribute winnings from all pots based on hand strength"""
+        """Distribute winnings from all pots based on hand strength
+
+        Both hands are evaluated and compared once (only if some pot needs it), and every
+        pot, side pots first and then the main pot, is settled from that one result.
+        """
+        start = time.perf_counter()
         winnings = {player1: 0, player2: 0}
         result_message = ""
+        ranking = None  # (compare_hands result, player 1's hand name, player 2's hand name)
+
+        # Side pots from smallest to largest, then the main pot (both players are eligible for it)
+        pots = [('Side pot', pot_amount, eligible_players) for pot_amount, eligible_players in self.pots]
+        if self.main_pot > 0:
+            pots.append(('Main pot', self.main_pot, (player1, player2)))
 
-        # Process each side pot from smallest to largest
-        for pot_amount, eligible_players in self.pots:
+        for label, pot_amount, eligible_players in pots:
             # Skip if both players folded
             if player1.is_folded and player2.is_folded:
                 continue
@@ -139,105 +166,67 @@ class GameOverHandler:
             # If one player folded, give pot to the other
             if player1.is_folded and player2 in eligible_players:
                 winnings[player2] += pot_amount
-                result_message += f"Side pot ${pot_amount}: Player 2 wins (Player 1 folded)\n"
+                result_message += f"{label} ${pot_amount}: Player 2 wins (Player 1 folded)\n"
                 continue
 
             if player2.is_folded and player1 in eligible_players:
                 winnings[player1] += pot_amount
-                result_message += f"Side pot ${pot_amount}: Player 1 wins (Player 2 folded)\n"
+                result_message += f"{label} ${pot_amount}: Player 1 wins (Player 2 folded)\n"
                 continue
 
-            # Both players still in, determine winner
             eligible_p1 = player1 in eligible_players and not player1.is_folded
             eligible_p2 = player2 in eligible_players and not player2.is_folded
 
             if eligible_p1 and eligible_p2:
-                # Evaluate both hands
-                hand1 = self.hand_evaluator.evaluate_hand(player1.hand.cards, community_cards.hand.cards)
-                hand2 = self.hand_evaluator.evaluate_hand(player2.hand.cards, community_cards.hand.cards)
-
-                # Get hand names
-                hand1_name = self.hand_evaluator.get_hand_name(hand1[0])
-                hand2_name = self.hand_evaluator.get_hand_name(hand2[0])
-
-                # Compare hands
-                result = self.hand_evaluator.compare_hands(hand1, hand2)
+                if ranking is None:
+                    ranking = self._rank_hands(player1, player2, community_cards)
+                result, hand1_name, hand2_name = ranking
 
                 if result == 1:
                     winnings[player1] += pot_amount
-                    result_message += f"Side pot ${pot_amount}: Player 1 wins with {hand1_name}\n"
+                    result_message += f"{label} ${pot_amount}: Player 1 wins with {hand1_name}\n"
                 elif result == 2:
                     winnings[player2] += pot_amount
-                    result_message += f"Side pot ${pot_amount}: Player 2 wins with {hand2_name}\n"
+                    result_message += f"{label} ${pot_amount}: Player 2 wins with {hand2_name}\n"
                 else:
-                    # Split pot for ties
-                    split_amount = pot_amount // 2
-                    remainder = pot_amount % 2
-
-                    winnings[player1] += split_amount
-                    winnings[player2] += split_amount
-
-                    # Give the remainder to player1 (arbitrary)
-                    if remainder > 0:
-                        winnings[player1] += remainder
-
-                    result_message += f"Side pot ${pot_amount}: Tie with {hand1_name}. Split pot.\n"
+                    # Split pot for ties, the remainder goes to player1 (arbitrary)
+                    winnings[player1] += pot_amount // 2 + pot_amount % 2
+                    winnings[player2] += pot_amount // 2
+                    result_message += f"{label} ${pot_amount}: Tie with {hand1_name}. Split pot.\n"
             elif eligible_p1:
                 winnings[player1] += pot_amount
-                result_message += f"Side pot ${pot_amount}: Player 1 wins (Player 2 not eligible)\n"
+                result_message += f"{label} ${pot_amount}: Player 1 wins (Player 2 not eligible)\n"
             elif eligible_p2:
                 winnings[player2] += pot_amount
-                result_message += f"Side pot ${pot_amount}: Player 2 wins (Player 1 not eligible)\n"
-
-        # Process the main pot
-        if self.main_pot > 0:
-            # Skip if both players folded
-            if not (player1.is_folded and player2.is_folded):
-                # If one player folded, give pot to the other
-                if player1.is_folded:
-                    winnings[player2] += self.main_pot
-                    result_message += f"Main pot ${self.main_pot}: Player 2 wins (Player 1 folded)\n"
-                elif player2.is_folded:
-                    winnings[player1] += self.main_pot
-                    result_message += f"Main pot ${self.main_pot}: Player 1 wins (Player 2 folded)\n"
-                else:
-                    # Both players still in, determine winner
-                    hand1 = self.hand_evaluator.evaluate_hand(player1.hand.cards, community_cards.hand.cards)
-                    hand2 = self.hand_evaluator.evaluate_hand(player2.hand.cards, community_cards.hand.cards)
-
-                    # Get hand names
-                    hand1_name = self.hand_evaluator.get_hand_name(hand1[0])
-                    hand2_name = self.hand_evaluator.get_hand_name(hand2[0])
-
-                    # Compare hands
-                    result = self.hand_evaluator.compare_hands(hand1, hand2)
-
-                    if result == 1:
-                        winnings[player1] += self.main_pot
-                        result_message += f"Main pot ${self.main_pot}: Player 1 wins with {hand1_name}\n"
-                    elif result == 2:
-                        winnings[player2] += self.main_pot
-                        result_message += f"Main pot ${self.main_pot}: Player 2 wins with {hand2_name}\n"
-                    else:
-                        # Split pot for ties
-                        split_amount = self.main_pot // 2
-                        remainder = self.main_pot % 2
-
-                        winnings[player1] += split_amount
-                        winnings[player2] += split_amount
-
-                        # Give the remainder to player1 (arbitrary)
-                        if remainder > 0:
-                            winnings[player1] += remainder
-
-                        result_message += f"Main pot ${self.main_pot}: Tie with {hand1_name}. Split pot.\n"
+                result_message += f"{label} ${pot_amount}: Player 2 wins (Player 1 not eligible)\n"
 
         # Update player balances
-        player1.balance += winnings[player1]
-        player2.balance += winnings[player2]
+        self.pay(player1, winnings[player1])
+        self.pay(player2, winnings[player2])
 
         # Reset bets
         player1.current_bet = 0
         player2.current_bet = 0
 
-        return result_message
\ No newline at end of file
+        self.settlements += 1
+        self.settle_time += time.perf_counter() - start
+        return result_message
+
+    def _rank_hands(self, player1, player2, community_cards):
+        """Evaluate both hands once, returns (compare_hands result, player 1's hand name, player 2's hand name)"""
+        hand1 = self.hand_evaluator.evaluate_hand(player1.hand.cards, community_cards.hand.cards)
+        hand2 = self.hand_evaluator.evaluate_hand(player2.hand.cards, community_cards.hand.cards)
+        self.evaluations += 2
+
+        return (self.hand_evaluator.compare_hands(hand1, hand2),
+                self.hand_evaluator.get_hand_name(hand1[0]),
+                self.hand_evaluator.get_hand_name(hand2[0]))
+
+    def settlement_cost(self):
+        """Settlements so far, hand evaluations they needed, and average time per settlement"""
+        return {
+            'settlements': self.settlements,
+            'evaluations': self.evaluations,
+            'evaluations_per_settlement': self.evaluations / self.settlements if self.settlements else 0,
+            'mean_settle_ms': self.settle_time / self.settlements * 1000 if self.settlements else 0,
+        }
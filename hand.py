@@ -3,6 +3,8 @@ __version__ = '05/22/2025'
 __author__ = 'Kayla Cao'
 
 class Hand:
+    __slots__ = ('cards',)
+
     def __init__(self):
         """Initialization"""
         self.cards = []
@@ -11,6 +13,10 @@ class Hand:
         """Add a card to the hand"""
         self.cards.append(card)
 
+    def clear(self):
+        """Empty the hand in place for the next deal"""
+        self.cards.clear()
+
     def __str__(self):
         """String representation of the hand"""
         return ", ".join(str(card) for card in self.cards)
\ No newline at end of file
@@ -18,17 +18,9 @@ class HandEvaluator:
     @staticmethod #no self variables
     def evaluate_hand(player_cards, community_cards):
         """Evaluate the best 5-card hand from player's 2 cards and community cards"""
-        print(f"Player cards: {len(player_cards)}")
-        print(f"Community cards: {len(community_cards)}")
-
         # Combine player cards and community cards
         all_cards = player_cards + community_cards
 
-        # Debugging: print all card values
-        print("All cards:")
-        for card in all_cards:
-            print(f"{card.name}")
-
         # Convert face cards to numeric values for easier comparison
         card_values = []
         for card in all_cards:
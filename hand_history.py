@@ -0,0 +1,172 @@
+"""hand_history.py - Hand histories written as columns of .npy files, for loading millions of hands into NumPy/pandas
+
+A HandHistoryWriter on a table (table.hand_history) gets every hand, action and
+result from the table. Finished hands are kept in small per-column buffers and
+appended to one .npy file per column every HAND_HISTORY_CHUNK hands, so memory stays
+the same however many hands are played. The shape in each file's header is fixed up
+on every flush, so the files can be opened while a simulation is still running.
+
+numpy isn't needed to write them (the .npy header is simple). To read:
+    np.load('history/pot.npy', mmap_mode='r')
+read_column() reads one without numpy.
+
+Columns (one row per finished hand):
+- seed (int64): seed the hand was dealt with (-1 if it wasn't seeded)
+- dealer (int8): player id of the dealer, who acts first preflop (big blind acts first after)
+- hole_cards (int8, 2 x 2): card ids (see Card.card_id) of player 1's and player 2's cards
+- board (int8, 5): community card ids, -1 for cards that weren't dealt
+- actions (int8, 4 x HAND_HISTORY_ACTIONS): per street, action codes in order (players take turns)
+- action_amounts (int32, 4 x HAND_HISTORY_ACTIONS): chips for a call, bet total for a raise
+- pot (int64): chips paid out
+- winner (int8): player id, 0 for a split pot
+- categories (int8, 2): HandEvaluator category of each hand at showdown, -1 if the hand ended with a fold
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import ast
+import sys
+from array import array
+
+from config import *
+
+# Action codes (0 = no action in that slot)
+ACTION_CODES = {'fold': 1, 'check': 2, 'call': 3, 'raise': 4}
+STREETS = 4  # preflop, flop, turn, river
+NO_ACTIONS = array('b', bytes(STREETS * HAND_HISTORY_ACTIONS))
+NO_AMOUNTS = array('i', bytes(STREETS * HAND_HISTORY_ACTIONS * array('i').itemsize))
+
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+NPY_HEADER_SIZE = 128  # Whole header, padded so the final shape can be written over it in place
+ENDIAN = '<' if sys.byteorder == 'little' else '>'
+
+# name: (array typecode, numpy dtype, shape of one row)
+COLUMNS = {
+    'seed': ('q', ENDIAN + 'i8', ()),
+    'dealer': ('b', '|i1', ()),
+    'hole_cards': ('b', '|i1', (2, 2)),
+    'board': ('b', '|i1', (5,)),
+    'actions': ('b', '|i1', (STREETS, HAND_HISTORY_ACTIONS)),
+    'action_amounts': ('i', ENDIAN + 'i4', (STREETS, HAND_HISTORY_ACTIONS)),
+    'pot': ('q', ENDIAN + 'i8', ()),
+    'winner': ('b', '|i1', ()),
+    'categories': ('b', '|i1', (2,)),
+}
+
+
+def npy_header(dtype, shape):
+    """A version 1.0 .npy header of exactly NPY_HEADER_SIZE bytes"""
+    header = repr({'descr': dtype, 'fortran_order': False, 'shape': shape}).encode('latin1')
+    padding = NPY_HEADER_SIZE - len(NPY_MAGIC) - 2 - len(header) - 1
+    return NPY_MAGIC + (NPY_HEADER_SIZE - len(NPY_MAGIC) - 2).to_bytes(2, 'little') + header + b' ' * padding + b'\n'
+
+
+class HandHistoryWriter:
+    """Streams finished hands from a table into one .npy file per column"""
+    def __init__(self, directory, chunk=HAND_HISTORY_CHUNK):
+        """Create (or empty) the column files in a directory"""
+        self.directory = directory
+        self.chunk = chunk
+        self.rows = 0  # Hands written to the files
+        self.overflow = 0  # Actions past HAND_HISTORY_ACTIONS on a street that had to be left out
+
+        os.makedirs(directory, exist_ok=True)
+        self.buffers = {name: array(typecode) for name, (typecode, _, _) in COLUMNS.items()}
+        self.files = {}
+        for name, (_, dtype, shape) in COLUMNS.items():
+            self.files[name] = open(os.path.join(directory, name + '.npy'), 'wb')
+            self.files[name].write(npy_header(dtype, (0,) + shape))
+
+        # The hand being played
+        self.hand_open = False
+        self.seed = -1
+        self.dealer = 0
+        self.actions = array('b', NO_ACTIONS)
+        self.amounts = array('i', NO_AMOUNTS)
+        self.counts = [0] * STREETS
+
+    def new_hand(self, seed, dealer_id):
+        """A hand was dealt (a hand that never finished is dropped)"""
+        self.hand_open = True
+        self.seed = -1 if seed is None else seed
+        self.dealer = dealer_id
+        self.actions[:] = NO_ACTIONS
+        self.amounts[:] = NO_AMOUNTS
+        self.counts = [0] * STREETS
+
+    def action(self, game_state, action, amount):
+        """An action was applied during a betting round"""
+        street = game_state - STATE_PREFLOP
+        if not self.hand_open or not 0 <= street < STREETS:
+            return
+        count = self.counts[street]
+        if count >= HAND_HISTORY_ACTIONS:
+            self.overflow += 1
+            return
+        index = street * HAND_HISTORY_ACTIONS + count
+        self.actions[index] = ACTION_CODES[action]
+        self.amounts[index] = amount
+        self.counts[street] = count + 1
+
+    def end_hand(self, player1, player2, board, pot, winner_id, categories=None):
+        """The hand is over: store its row (winner_id 0 = split pot, categories None = nobody showed down)"""
+        if not self.hand_open:
+            return
+        self.hand_open = False
+
+        buffers = self.buffers
+        buffers['seed'].append(self.seed)
+        buffers['dealer'].append(self.dealer)
+        for player in (player1, player2):
+            cards = [card.id for card in player.hand.cards[:2]]
+            buffers['hole_cards'].extend(cards + [-1] * (2 - len(cards)))
+        cards = [card.id for card in board.hand.cards[:5]]
+        buffers['board'].extend(cards + [-1] * (5 - len(cards)))
+        buffers['actions'].extend(self.actions)
+        buffers['action_amounts'].extend(self.amounts)
+        buffers['pot'].append(pot)
+        buffers['winner'].append(winner_id)
+        buffers['categories'].extend(categories if categories else (-1, -1))
+
+        if len(buffers['seed']) >= self.chunk:
+            self.flush()
+
+    def flush(self):
+        """Append the buffered hands to the files and fix up their headers"""
+        rows = len(self.buffers['seed'])
+        if not rows:
+            return
+        self.rows += rows
+        for name, (_, dtype, shape) in COLUMNS.items():
+            column = self.files[name]
+            self.buffers[name].tofile(column)
+            del self.buffers[name][:]
+
+            end = column.tell()
+            column.seek(0)
+            column.write(npy_header(dtype, (self.rows,) + shape))
+            column.seek(end)
+            column.flush()
+
+    def close(self):
+        """Write what is left and close the files"""
+        self.flush()
+        for column in self.files.values():
+            column.close()
+
+
+def read_column(path):
+    """returns (array, shape) for a column file, without numpy"""
+    with open(path, 'rb') as column:
+        if column.read(len(NPY_MAGIC)) != NPY_MAGIC:
+            raise ValueError(f"{path} is not a .npy file")
+        header_size = int.from_bytes(column.read(2), 'little')
+        header = ast.literal_eval(column.read(header_size).decode('latin1'))
+
+        typecode = {'i1': 'b', 'i4': 'i', 'i8': 'q'}[header['descr'][1:]]
+        values = array(typecode)
+        values.frombytes(column.read())
+    if header['descr'][0] not in ('|', ENDIAN):
+        values.byteswap()
+    return values, header['shape']
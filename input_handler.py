@@ -4,70 +4,135 @@ __author__ = 'Kayla Cao'
 
 import pygame
 from config import *
+from frame_scheduler import FrameScheduler
+
+
+class NumericInput:
+    """A numeric prompt that lives inside the main loop instead of running its own loop"""
+    def __init__(self, message, x, y, min_value=0, max_value=None, on_commit=None, on_cancel=None):
+        """Initialization"""
+        self.message = message
+        self.x = x
+        self.y = y
+        self.min_value = min_value
+        self.max_value = max_value
+
+        # Called with the value when Enter is pressed on a valid number, or with nothing on ESC
+        self.on_commit = on_commit
+        self.on_cancel = on_cancel
+
+        self.input_text = ''
+        self.error_message = ''
+        self.done = False
+        self.value = None
+
+        # Fonts and the dimmed overlay are made once, not every frame
+        self.font = pygame.font.Font(None, 50)
+        self.error_font = pygame.font.Font(None, 36)
+        self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.overlay.fill(INPUT_OVERLAY_COLOR)
+
+    def handle_event(self, event):
+        """Feed an event to the prompt, returns True if the prompt used it"""
+        if self.done or event.type != pygame.KEYDOWN:
+            return False
+
+        if event.key == pygame.K_ESCAPE:
+            self.cancel()
+
+        elif event.key == pygame.K_RETURN:
+            if self.input_text:
+                self._commit_text()
+
+        elif event.key == pygame.K_BACKSPACE:
+            self.input_text = self.input_text[:-1]
+
+        elif event.unicode.isdigit():
+            self.input_text += event.unicode
+
+        return True
+
+    def cancel(self):
+        """Close the prompt without a value"""
+        self.done = True
+        if self.on_cancel:
+            self.on_cancel()
+
+    def _commit_text(self):
+        """Validate the typed text and resolve the prompt if it is valid"""
+        try:
+            value = int(self.input_text)
+        except ValueError:
+            # Invalid input, try again
+            self.input_text = ''
+            self.error_message = "Invalid input"
+            return
+
+        # Validate input
+        if value < self.min_value:
+            self.error_message = f"Must be at least {self.min_value}"
+            self.input_text = ''
+            return
+
+        if self.max_value is not None and value > self.max_value:
+            self.error_message = f"Cannot exceed {self.max_value}"
+            self.input_text = ''
+            return
+
+        self.done = True
+        self.value = value
+        if self.on_commit:
+            self.on_commit(value)
+
+    def draw(self, screen, background=None):
+        """Draw the prompt, over the table (dimmed) unless a background is given"""
+        if background is not None:
+            screen.blit(background, (0, 0))
+        else:
+            screen.blit(self.overlay, (0, 0))
+
+        # Draw main text
+        text = self.font.render(f'{self.message} {self.input_text}', True, (255, 255, 255))
+        text_rect = text.get_rect(center=(self.x, self.y))
+        screen.blit(text, text_rect)
+
+        # Draw error message if any
+        if self.error_message:
+            error_text = self.error_font.render(self.error_message, True, (255, 0, 0))
+            error_rect = error_text.get_rect(center=(self.x, self.y + 50))
+            screen.blit(error_text, error_rect)
+
 
 class InputHandler:
     @staticmethod #no self variables
     def get_numeric_input(screen, message, x, y, min_value=0, max_value=None):
-        """gets a numeric input from the user"""
-        input_text = ''
-        clock = pygame.time.Clock()
+        """gets a numeric input from the user (blocks until a value is entered, used for setup)"""
+        prompt = NumericInput(message, x, y, min_value, max_value)
+
+        # Sleep until a key is pressed instead of spinning (capped at 10 FPS if not event driven)
+        scheduler = FrameScheduler(frame_rate=10)
 
         # Create a background surface
         input_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
         input_surface.fill(BACKGROUND_COLOR)
 
-        error_message = ""
-
-        while True:
-            clock.tick(10)  # Limit frame rate
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT or \
-                        (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
-                    return None
-
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN and input_text:
-                        try:
-                            value = int(input_text)
-
-                            # Validate input
-                            if value < min_value:
-                                error_message = f"Must be at least {min_value}"
-                                input_text = ''
-                                continue
-
-                            if max_value is not None and value > max_value:
-                                error_message = f"Cannot exceed {max_value}"
-                                input_text = ''
-                                continue
-
-                            return value
-
-                        except ValueError:
-                            # Invalid input, try again
-                            input_text = ''
-                            error_message = "Invalid input"
-
-                    elif event.key == pygame.K_BACKSPACE and input_text:
-                        input_text = input_text[:-1]
-
-                    elif event.unicode.isdigit():
-                        input_text += event.unicode
-
-            # Draw background
-            screen.blit(input_surface, (0, 0))
-
-            # Draw main text
-            font = pygame.font.Font(None, 50)
-            text = font.render(f'{message} {input_text}', True, (255, 255, 255))
-            text_rect = text.get_rect(center=(x, y))
-            screen.blit(text, text_rect)
-
-            # Draw error message if any
-            if error_message:
-                error_font = pygame.font.Font(None, 36)
-                error_text = error_font.render(error_message, True, (255, 0, 0))
-                error_rect = error_text.get_rect(center=(x, y + 50))
-                screen.blit(error_text, error_rect)
-
-            pygame.display.flip()
\ No newline at end of file
+        while not prompt.done:
+            for event in scheduler.wait_for_events():
+                scheduler.note_event(event)
+
+                if event.type == pygame.QUIT:
+                    prompt.cancel()
+                else:
+                    prompt.handle_event(event)
+
+                if prompt.done:
+                    break
+
+            # Nothing changed, go back to sleep
+            if prompt.done or not scheduler.should_render():
+                continue
+
+            prompt.draw(screen, input_surface)
+            pygame.display.flip()
+
+        return prompt.value
@@ -0,0 +1,170 @@
+"""lockstep.py - Trusted lockstep play: both players run the rules from a shared seed and only exchange actions
+
+Each hand's seed comes from a commit-reveal exchange, so neither player can choose
+a seed that deals them good cards. It does NOT hide cards: once the seeds are
+revealed, both sides can work out the whole deck, the other player's hole cards
+included. That's why the mode is called trusted lockstep (TRUSTED_LOCKSTEP_MODE,
+enable_trusted_lockstep): only use it between players (or bots) that trust each
+other's software, and play anyone else through the host or a table server.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import hashlib
+
+from config import *
+
+NONCE_SIZE = 16
+
+
+def seed_commitment(nonce):
+    """What a player sends before revealing its half of the seed"""
+    return hashlib.sha256(nonce).digest()[:NONCE_SIZE]
+
+
+class TrustedLockstepSession:
+    """Seed exchange and desync checks for one trusted lockstep game (lives on the PokerNetworkManager)"""
+    def __init__(self, network_manager, game, hash_interval=LOCKSTEP_HASH_INTERVAL):
+        """Initialization"""
+        self.network_manager = network_manager
+        self.game = game
+        self.is_host = network_manager.is_server
+        self.hash_interval = hash_interval
+
+        # The host deals the first hand once its setup is done and the guest has connected
+        self.setup = None
+        self.peer_connected = False
+
+        # Seed exchange for the current hand
+        self.hand = 0
+        self.nonce = None
+        self.revealed = False
+        self.dealt = False  # True once the current hand's cards are dealt
+        self.peer_commits = {}  # hand -> commitment
+        self.peer_nonces = {}  # hand -> revealed nonce
+
+        # Desync checks: state hashes by action count, ours and the other player's
+        self.seq = 0
+        self.own_hashes = {}
+        self.peer_hashes = {}
+        self.desyncs = 0
+
+    def host_ready(self):
+        """The host has picked balances and blinds, deal once the guest is here"""
+        self.setup = {
+            'type': 'table_setup',
+            'small_blind': self.game.small_blind,
+            'player1_balance': self.game.player1.balance,
+            'player2_balance': self.game.player2.balance,
+        }
+        self._maybe_start()
+
+    def peer_joined(self):
+        """The guest connected (host only)"""
+        self.peer_connected = True
+        self._maybe_start()
+
+    def _maybe_start(self):
+        """Send the setup and start the first hand once both sides are ready (host only)"""
+        if self.setup and self.peer_connected and self.hand == 0:
+            self.network_manager.send_message(self.setup)
+            self.start_hand()
+
+    def start_hand(self):
+        """Commit to our half of the next hand's seed"""
+        self.hand += 1
+        self.nonce = os.urandom(NONCE_SIZE)
+        self.revealed = False
+        self.dealt = False
+        self.game.status_message = "Shuffling..."
+
+        self.network_manager.send_message({'type': 'seed_commit', 'hand': self.hand,
+                                           'commit': seed_commitment(self.nonce)})
+        self._maybe_reveal()
+
+    def handle_message(self, message):
+        """Handle a lockstep message from the other player"""
+        msg_type = message.get('type')
+
+        if msg_type == 'table_setup':
+            # Guest: play with the host's balances and blinds
+            self.game.set_small_blind(message['small_blind'])
+            self.game.player1.balance = message['player1_balance']
+            self.game.player2.balance = message['player2_balance']
+            self.start_hand()
+
+        elif msg_type == 'seed_commit':
+            self.peer_commits[message['hand']] = message['commit']
+            self._maybe_reveal()
+
+        elif msg_type == 'seed_reveal':
+            hand = message['hand']
+            if seed_commitment(message['nonce']) != self.peer_commits.get(hand):
+                # The other player changed its half after seeing ours
+                self._report_desync(f"seed for hand {hand} does not match its commitment")
+                return
+            self.peer_nonces[hand] = message['nonce']
+            self._maybe_deal()
+
+        elif msg_type == 'state_hash':
+            self.peer_hashes[message['seq']] = message['hash']
+            self._compare_hashes(message['seq'])
+
+    def _maybe_reveal(self):
+        """Reveal our half only after the other player has committed to theirs"""
+        if self.nonce and not self.revealed and self.hand in self.peer_commits:
+            self.revealed = True
+            self.network_manager.send_message({'type': 'seed_reveal', 'hand': self.hand, 'nonce': self.nonce})
+            self._maybe_deal()
+
+    def _maybe_deal(self):
+        """Deal the hand once both halves of the seed are known"""
+        if not self.revealed or self.hand not in self.peer_nonces:
+            return
+
+        peer_nonce = self.peer_nonces.pop(self.hand)
+        del self.peer_commits[self.hand]
+
+        # Same order on both sides: host's half first
+        halves = self.nonce + peer_nonce if self.is_host else peer_nonce + self.nonce
+        # 63 bits, so it fits the hand history's signed int64 seed column
+        seed = int.from_bytes(hashlib.sha256(halves).digest()[:8], 'big') >> 1
+
+        self.nonce = None
+        self.dealt = True
+        self.game.reset_game(seed)
+
+    def action_applied(self):
+        """Call after every game action, ours or the other player's"""
+        self.seq += 1
+
+        hand_over = self.game.game_state in (STATE_GAME_OVER, STATE_LOST)
+        if self.seq % self.hash_interval == 0 or hand_over:
+            self.own_hashes[self.seq] = self.state_hash()
+            self.network_manager.send_message({'type': 'state_hash', 'seq': self.seq,
+                                               'hash': self.own_hashes[self.seq]})
+            self._compare_hashes(self.seq)
+
+        if self.game.game_state == STATE_GAME_OVER:
+            self.start_hand()
+
+    def state_hash(self):
+        """8 byte hash of everything the rules decide, including both players' hole cards"""
+        state = self.game.get_network_state()
+        state['hand'] = self.hand
+        state['player1_cards'] = [card.card_id() for card in self.game.player1.hand.cards]
+        state['player2_cards'] = [card.card_id() for card in self.game.player2.hand.cards]
+        return int.from_bytes(hashlib.blake2b(repr(state).encode(), digest_size=8).digest(), 'big')
+
+    def _compare_hashes(self, seq):
+        """Compare hashes once both sides have one for seq"""
+        if seq in self.own_hashes and seq in self.peer_hashes:
+            if self.own_hashes.pop(seq) != self.peer_hashes.pop(seq):
+                self._report_desync(f"state differs after action {seq}")
+
+    def _report_desync(self, reason):
+        """Tell the player the two games no longer match"""
+        self.desyncs += 1
+        print(f"Lockstep desync: {reason}")
+        self.game.status_message = "Out of sync with the other player!"
@@ -0,0 +1,321 @@
+"""message_codec.py - Compact binary encoding for the poker network messages (replaces pickle)"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import struct
+
+from state_sync import STATE_FIELDS
+
+# Bump this whenever a message layout changes
+CODEC_VERSION = 11
+
+# Every message starts with the codec version and the message type
+HEADER = struct.Struct('!BB')
+
+# Message types
+TYPE_ACTION = 1
+TYPE_GAME_STATE = 2
+TYPE_STATE_ACK = 3
+TYPE_JOIN = 4
+TYPE_LEAVE = 5
+TYPE_LIST_TABLES = 6
+TYPE_TABLE_LIST = 7
+TYPE_JOINED = 8
+TYPE_SPECTATE = 9
+TYPE_TABLE_SETUP = 10
+TYPE_SEED_COMMIT = 11
+TYPE_SEED_REVEAL = 12
+TYPE_STATE_HASH = 13
+TYPE_HEARTBEAT = 14
+TYPE_HELLO = 15
+TYPE_SESSION = 16
+TYPE_STATE_READY = 17
+
+# Action names <-> one byte codes
+ACTIONS = ['fold', 'call', 'raise', 'check', 'toggle_cards']
+ACTION_CODES = {action: code for code, action in enumerate(ACTIONS)}
+
+# action code, amount, player id, sequence number (0 = not predicted by the client)
+ACTION = struct.Struct('!BIBI')
+
+# version, base version (0 = full snapshot), bitmask of the fields that follow (bit i = STATE_FIELDS[i])
+GAME_STATE = struct.Struct('!IIH')
+
+# How each scalar state field is written
+FIELD_FORMATS = {
+    'pot': struct.Struct('!I'),
+    'game_state': struct.Struct('!B'),
+    'player1_balance': struct.Struct('!I'),
+    'player2_balance': struct.Struct('!I'),
+    'player1_bet': struct.Struct('!I'),
+    'player2_bet': struct.Struct('!I'),
+    'current_player_id': struct.Struct('!B'),
+    'raise_count': struct.Struct('!B'),
+    'action_seq': struct.Struct('!I'),
+}
+
+# A whole state is packed and unpacked with one struct per set of fields (bit i = STATE_FIELDS[i]).
+# Card lists go last as fixed-size pascal strings (a count byte, then room for the most cards the list can hold)
+FIELD_BITS = {field: 1 << bit for bit, field in enumerate(STATE_FIELDS)}
+ALL_FIELDS = (1 << len(STATE_FIELDS)) - 1
+CARD_LIMITS = {'hole_cards': 2, 'community_cards': 5}
+STATE_MASK_OFFSET = 8  # Where the mask sits in GAME_STATE
+STATE_HEADER = HEADER.pack(CODEC_VERSION, TYPE_GAME_STATE)
+_STATE_LAYOUTS = {}  # mask -> (struct, scalar fields, card fields); masks with unknown bits are refused, so at most 2 ** len(STATE_FIELDS)
+MAX_LAYOUTS = 1024  # States are also looked up by their key order, so keep that cache bounded
+_STATE_KEYS = {}  # state keys -> (mask, struct, scalar fields, card fields)
+
+# version the client has
+STATE_ACK = struct.Struct('!I')
+
+# Lobby messages: table id (join and spectate); table id and seat (NO_SEAT if the join was refused,
+# SPECTATOR_SEAT when watching); table count followed by (table id, seated players) for each table
+JOIN = struct.Struct('!H')
+JOINED = struct.Struct('!HB')
+TABLE_COUNT = struct.Struct('!H')
+TABLE_ENTRY = struct.Struct('!HB')
+NO_SEAT = 255
+SPECTATOR_SEAT = 254
+
+# Lockstep messages: small blind and both balances; hand number and seed commitment (or the revealed
+# seed half); action count and state hash
+TABLE_SETUP = struct.Struct('!III')
+SEED = struct.Struct('!I16s')
+STATE_HASH = struct.Struct('!IQ')
+
+# Connection messages: reply flag and send time in microseconds; session token (NO_TOKEN for a new
+# player), the state version the client has and whether it reads states from shared memory; the
+# session token and the server's state version. state_ready has no body, it tells a client reading
+# shared memory that a new state is there
+HEARTBEAT = struct.Struct('!?Q')
+HELLO = struct.Struct('!16sI?')
+SESSION = struct.Struct('!16sI')
+NO_TOKEN = bytes(16)
+
+
+class CodecError(ValueError):
+    """Raised when a message can't be encoded or decoded"""
+
+
+def encode_message(message):
+    """Encode a message dict to bytes"""
+    msg_type = message.get('type')
+
+    # Game states first, they are most of the traffic
+    if msg_type == 'game_state':
+        return STATE_HEADER + encode_state(message['version'], message['base_version'], message['state'])
+
+    if msg_type == 'action':
+        action = message.get('action')
+        if action not in ACTION_CODES:
+            raise CodecError(f"Unknown action: {action}")
+        return HEADER.pack(CODEC_VERSION, TYPE_ACTION) + ACTION.pack(
+            ACTION_CODES[action],
+            message.get('amount', 0),
+            message.get('player_id', 0),
+            message.get('seq', 0)
+        )
+
+    if msg_type == 'state_ack':
+        return HEADER.pack(CODEC_VERSION, TYPE_STATE_ACK) + STATE_ACK.pack(message['version'])
+
+    if msg_type == 'join':
+        return HEADER.pack(CODEC_VERSION, TYPE_JOIN) + JOIN.pack(message['table_id'])
+
+    if msg_type == 'spectate':
+        return HEADER.pack(CODEC_VERSION, TYPE_SPECTATE) + JOIN.pack(message['table_id'])
+
+    if msg_type == 'leave':
+        return HEADER.pack(CODEC_VERSION, TYPE_LEAVE)
+
+    if msg_type == 'list_tables':
+        return HEADER.pack(CODEC_VERSION, TYPE_LIST_TABLES)
+
+    if msg_type == 'joined':
+        seat = message['seat']
+        if message.get('spectator'):
+            seat = SPECTATOR_SEAT
+        elif seat is None:
+            seat = NO_SEAT
+        return HEADER.pack(CODEC_VERSION, TYPE_JOINED) + JOINED.pack(message['table_id'], seat)
+
+    if msg_type == 'table_list':
+        tables = message['tables']
+        return HEADER.pack(CODEC_VERSION, TYPE_TABLE_LIST) + TABLE_COUNT.pack(len(tables)) + b''.join(
+            TABLE_ENTRY.pack(table['table_id'], table['players']) for table in tables)
+
+    if msg_type == 'table_setup':
+        return HEADER.pack(CODEC_VERSION, TYPE_TABLE_SETUP) + TABLE_SETUP.pack(
+            message['small_blind'], message['player1_balance'], message['player2_balance'])
+
+    if msg_type == 'seed_commit':
+        return HEADER.pack(CODEC_VERSION, TYPE_SEED_COMMIT) + SEED.pack(message['hand'], message['commit'])
+
+    if msg_type == 'seed_reveal':
+        return HEADER.pack(CODEC_VERSION, TYPE_SEED_REVEAL) + SEED.pack(message['hand'], message['nonce'])
+
+    if msg_type == 'state_hash':
+        return HEADER.pack(CODEC_VERSION, TYPE_STATE_HASH) + STATE_HASH.pack(message['seq'], message['hash'])
+
+    if msg_type == 'heartbeat':
+        return HEADER.pack(CODEC_VERSION, TYPE_HEARTBEAT) + HEARTBEAT.pack(message['reply'], message['timestamp'])
+
+    if msg_type == 'hello':
+        return HEADER.pack(CODEC_VERSION, TYPE_HELLO) + HELLO.pack(
+            message.get('token') or NO_TOKEN, message['version'], message.get('shared', False))
+
+    if msg_type == 'session':
+        return HEADER.pack(CODEC_VERSION, TYPE_SESSION) + SESSION.pack(message['token'], message['version'])
+
+    if msg_type == 'state_ready':
+        return HEADER.pack(CODEC_VERSION, TYPE_STATE_READY)
+
+    raise CodecError(f"Unknown message type: {msg_type}")
+
+
+def decode_message(data):
+    """Decode bytes made by encode_message back to a message dict"""
+    if len(data) < HEADER.size:
+        raise CodecError("Message is too short")
+
+    version, msg_type = data[0], data[1]  # HEADER, read without a struct call
+    if version != CODEC_VERSION:
+        raise CodecError(f"Peer uses codec version {version}, we use {CODEC_VERSION}")
+
+    try:
+        # Game states first, they are most of the traffic
+        if msg_type == TYPE_GAME_STATE:
+            version, base_version, state = decode_state(data, HEADER.size)
+            return {'type': 'game_state', 'version': version, 'base_version': base_version, 'state': state}
+
+        if msg_type == TYPE_ACTION:
+            code, amount, player_id, seq = ACTION.unpack_from(data, HEADER.size)
+            if code >= len(ACTIONS):
+                raise CodecError(f"Unknown action code: {code}")
+            return {'type': 'action', 'action': ACTIONS[code], 'amount': amount, 'player_id': player_id, 'seq': seq}
+
+        if msg_type == TYPE_STATE_ACK:
+            (version,) = STATE_ACK.unpack_from(data, HEADER.size)
+            return {'type': 'state_ack', 'version': version}
+
+        if msg_type == TYPE_JOIN:
+            (table_id,) = JOIN.unpack_from(data, HEADER.size)
+            return {'type': 'join', 'table_id': table_id}
+
+        if msg_type == TYPE_SPECTATE:
+            (table_id,) = JOIN.unpack_from(data, HEADER.size)
+            return {'type': 'spectate', 'table_id': table_id}
+
+        if msg_type == TYPE_LEAVE:
+            return {'type': 'leave'}
+
+        if msg_type == TYPE_LIST_TABLES:
+            return {'type': 'list_tables'}
+
+        if msg_type == TYPE_JOINED:
+            table_id, seat = JOINED.unpack_from(data, HEADER.size)
+            spectator = seat == SPECTATOR_SEAT
+            return {'type': 'joined', 'table_id': table_id,
+                    'seat': None if seat in (NO_SEAT, SPECTATOR_SEAT) else seat, 'spectator': spectator}
+
+        if msg_type == TYPE_TABLE_LIST:
+            (count,) = TABLE_COUNT.unpack_from(data, HEADER.size)
+            offset = HEADER.size + TABLE_COUNT.size
+            tables = []
+            for _ in range(count):
+                table_id, players = TABLE_ENTRY.unpack_from(data, offset)
+                offset += TABLE_ENTRY.size
+                tables.append({'table_id': table_id, 'players': players})
+            return {'type': 'table_list', 'tables': tables}
+
+        if msg_type == TYPE_TABLE_SETUP:
+            small_blind, player1_balance, player2_balance = TABLE_SETUP.unpack_from(data, HEADER.size)
+            return {'type': 'table_setup', 'small_blind': small_blind,
+                    'player1_balance': player1_balance, 'player2_balance': player2_balance}
+
+        if msg_type == TYPE_SEED_COMMIT:
+            hand, commit = SEED.unpack_from(data, HEADER.size)
+            return {'type': 'seed_commit', 'hand': hand, 'commit': commit}
+
+        if msg_type == TYPE_SEED_REVEAL:
+            hand, nonce = SEED.unpack_from(data, HEADER.size)
+            return {'type': 'seed_reveal', 'hand': hand, 'nonce': nonce}
+
+        if msg_type == TYPE_STATE_HASH:
+            seq, state_hash = STATE_HASH.unpack_from(data, HEADER.size)
+            return {'type': 'state_hash', 'seq': seq, 'hash': state_hash}
+
+        if msg_type == TYPE_HEARTBEAT:
+            reply, timestamp = HEARTBEAT.unpack_from(data, HEADER.size)
+            return {'type': 'heartbeat', 'reply': reply, 'timestamp': timestamp}
+
+        if msg_type == TYPE_HELLO:
+            token, version, shared = HELLO.unpack_from(data, HEADER.size)
+            return {'type': 'hello', 'token': None if token == NO_TOKEN else token, 'version': version,
+                    'shared': shared}
+
+        if msg_type == TYPE_SESSION:
+            token, version = SESSION.unpack_from(data, HEADER.size)
+            return {'type': 'session', 'token': token, 'version': version}
+
+        if msg_type == TYPE_STATE_READY:
+            return {'type': 'state_ready'}
+    except (IndexError, struct.error) as e:
+        raise CodecError(f"Message is too short: {e}")
+
+    raise CodecError(f"Unknown message type: {msg_type}")
+
+
+def _state_layout(mask):
+    """(struct, scalar fields, card fields) for the fields in a mask (cached)"""
+    layout = _STATE_LAYOUTS.get(mask)
+    if layout is None:
+        if mask & ~ALL_FIELDS:
+            raise CodecError(f"Unknown state fields in mask {mask:#06x}")
+        fields = [field for field in STATE_FIELDS if mask & FIELD_BITS[field] and field in FIELD_FORMATS]
+        cards = [field for field in STATE_FIELDS if mask & FIELD_BITS[field] and field in CARD_LIMITS]
+        fmt = GAME_STATE.format + ''.join(FIELD_FORMATS[field].format.lstrip('!') for field in fields)
+        fmt += ''.join(f'{CARD_LIMITS[field] + 1}p' for field in cards)
+        layout = _STATE_LAYOUTS[mask] = (struct.Struct(fmt), fields, cards)
+    return layout
+
+
+def encode_state(version, base_version, state):
+    """Encode a full or partial game state, only the fields present are written"""
+    keys = tuple(state)
+    known = _STATE_KEYS.get(keys)
+    if known is None:
+        mask = 0
+        for field in keys:
+            bit = FIELD_BITS.get(field)
+            if bit is None:
+                raise CodecError(f"Unknown state field: {field}")
+            mask |= bit
+        if len(_STATE_KEYS) >= MAX_LAYOUTS:
+            _STATE_KEYS.clear()
+        known = _STATE_KEYS[keys] = (mask,) + _state_layout(mask)
+
+    mask, layout, fields, cards = known
+    values = [state[field] for field in fields]
+    for field in cards:
+        card_ids = state[field]
+        if len(card_ids) > CARD_LIMITS[field]:
+            raise CodecError(f"{field} has {len(card_ids)} cards, at most {CARD_LIMITS[field]} fit")
+        values.append(bytes(card_ids))
+    return layout.pack(version, base_version, mask, *values)
+
+
+def decode_state(data, offset):
+    """Decode a state written by encode_state, returns (version, base version, fields)"""
+    try:
+        mask = data[offset + STATE_MASK_OFFSET] << 8 | data[offset + STATE_MASK_OFFSET + 1]
+        layout, fields, cards = _STATE_LAYOUTS.get(mask) or _state_layout(mask)
+        values = layout.unpack_from(data, offset)
+    except (IndexError, struct.error) as e:
+        raise CodecError(f"Message is too short: {e}")
+
+    state = dict(zip(fields, values[3:]))
+    if cards:
+        for field, card_ids in zip(cards, values[3 + len(fields):]):
+            state[field] = list(card_ids)
+    return values[0], values[1], state
@@ -6,65 +6,77 @@ import threading
 import pygame
 
 from config import *
-from deck import Deck
-from hand import Hand
-from player import Player
 from input_handler import InputHandler
-from button import Button
-from hand_evaluator import HandEvaluator
-from game_over_handler import GameOverHandler
+from button import Button, ButtonGroup
 from sounds import SoundManager
-from network_manager import NetworkManager
-from poker_network_manager import PokerNetworkManager
+from poker_table import PokerTable
+from poker_network_manager import create_network_manager
 from card import Card
+from asset_loader import AssetLoader, ASSET_LOADED_EVENT
+from frame_scheduler import FrameScheduler
 
 
-class MultiplayerPokerGame:
-    def __init__(self, is_server=False, server_ip='127.0.0.1'):
+class MultiplayerPokerGame(PokerTable):
+    def __init__(self, is_server=False, server_ip='127.0.0.1', trusted_lockstep=TRUSTED_LOCKSTEP_MODE, table_id=None):
         # Pygame initialization
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption('Heads Down! Multiplayer Poker')
 
+        # Decides when the main loop wakes up and redraws
+        self.scheduler = FrameScheduler()
+
+        # Numeric prompt drawn over the table (e.g. raise amount), None when closed
+        self.active_prompt = None
+
         # Network configuration
         self.is_server = is_server
         self.player_id = 0 if is_server else 1
-        self.network_manager = PokerNetworkManager(
+
+        # With a table id we are a thin client of a table server: it runs the rules, we only draw its state
+        self.table_id = table_id
+        self.thin = table_id is not None
+        self.network_manager = create_network_manager(
             game=self,
             is_server=is_server,
             server_ip=server_ip
         )
 
+        # Network threads only queue messages, wake the main loop up to apply them
+        self.network_manager.on_message = FrameScheduler.wake
+        if trusted_lockstep:
+            self.network_manager.enable_trusted_lockstep()
+        elif not is_server:
+            # Our own clicks show on the next frame, the server's state confirms or corrects them
+            self.network_manager.enable_prediction()
+
         # Game state initialization
         self._initialize_game_components()
         self._create_buttons()
 
     def _initialize_game_components(self):
-        # Card images
-        self.card_images = {}
+        # Card images and sounds load in the background
+        self.assets = AssetLoader()
+        self.card_images = self.assets.images
         self._load_card_images()
 
-        # Players and game state
-        self.player1 = Player()
-        self.player2 = Player()
-        self.community_cards = Player()
-        self.community_cards.cards_visible = True
-
-        # Game mechanics
-        self.pot = 0
-        self.hand_evaluator = HandEvaluator()
-        self.game_over_handler = GameOverHandler()
-        self.sound_manager = SoundManager()
-
-        # Game state tracking
-        self.status_message = ''
-        self.small_blind = 0
-        self.big_blind = 0
-        self.current_player = self.player2
-        self.current_dealer = self.player2
-        self.current_bigblind = self.player1
-        self.game_state = STATE_PREFLOP
-        self.winner = None
+        # Players, pot, blinds and game state come from the table rules
+        PokerTable.__init__(self)
+        self.sound_manager = SoundManager(self.assets)
+
+        # Clients that don't run the rules themselves take their chips from the host's state, it keeps the ledger and stats
+        if not self.is_server and not self.network_manager.lockstep:
+            self.ledger = self.game_over_handler.ledger = None
+            self.player_stats = None
+
+    def on_new_hand(self):
+        """reset bg music to play from beginning"""
+        self.sound_manager.stop_bg_music()
+        self.sound_manager.play_bg_music()
+
+    def on_chips_moved(self):
+        """play poker chip sound"""
+        self.sound_manager.play_poker_chip()
 
     def _create_buttons(self):
         # Fonts
@@ -72,7 +84,7 @@ class MultiplayerPokerGame:
         self.button_font = pygame.font.SysFont(None, 24)
 
         # Buttons
-        self.buttons = pygame.sprite.Group(
+        self.buttons = ButtonGroup(
             Button(50, 550, 80, 40, 'P1 Cards', self.button_font),
             Button(150, 550, 80, 40, 'P2 Cards', self.button_font),
             Button(250, 550, 80, 40, 'Call', self.button_font),
@@ -82,24 +94,23 @@ class MultiplayerPokerGame:
         )
 
     def _load_card_images(self):
-        # Copy the card image loading method from your original main.py
-        # This method should populate self.card_images with card images
+        """Start loading the card images in the background (same files as main.py)"""
         image_dir = 'img'
 
-        # Try to load card back image
-        try:
-            back_path = os.path.join(image_dir, 'red_back.png')
-            if os.path.exists(back_path):
-                self.card_back = pygame.image.load(back_path)
-                self.card_back = pygame.transform.scale(self.card_back, (CARD_WIDTH, CARD_HEIGHT))
-            else:
-                print(f'Warning: Card back image not found at {back_path}')
-                self.card_back = pygame.Surface((CARD_WIDTH, CARD_HEIGHT))
-                self.card_back.fill((0, 0, 128))  # Navy blue
-        except pygame.error as e:
-            print(f'Error loading card back: {e}')
-            self.card_back = pygame.Surface((CARD_WIDTH, CARD_HEIGHT))
-            self.card_back.fill((0, 0, 128))  # Navy blue
+        # Card back, drawn as a plain navy placeholder until it is loaded
+        self.assets.load_image('red_back.png', os.path.join(image_dir, 'red_back.png'),
+                               (CARD_WIDTH, CARD_HEIGHT))
+
+        values = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']
+        suits = ['clubs', 'diamonds', 'hearts', 'spades']
+
+        # Queue each card image, with a default card if the file is missing or can't be read (like main.py)
+        for suit in suits:
+            for value in values:
+                filename = f'{value}_of_{suit}.png'
+                self.assets.load_image(filename, os.path.join(image_dir, filename),
+                                       (CARD_WIDTH, CARD_HEIGHT),
+                                       fallback=lambda v=value, s=suit: AssetLoader.create_default_card(v, s))
 
     def draw_game(self):
         # Fill background
@@ -116,10 +127,8 @@ class MultiplayerPokerGame:
         self.screen.blit(pot_text, (SCREEN_WIDTH // 2 - 50, 70))
 
         # Draw buttons
-        mouse_pos = pygame.mouse.get_pos()
-        for button in self.buttons:
-            button.render(button.is_hovered(mouse_pos))
-            button.draw(self.screen)
+        self.buttons.update_hover(pygame.mouse.get_pos())
+        self.buttons.draw(self.screen)
 
         # Draw status message
         if self.status_message:
@@ -129,91 +138,144 @@ class MultiplayerPokerGame:
 
     def handle_remote_action(self, action, amount=0, player_id=None):
         """Process actions received from the network"""
-        action_map = {
-            'fold': self.handle_fold,
-            'call': self.handle_call,
-            'raise': lambda: self.handle_raise(amount),
-            'check': self.handle_check
-        }
-
-        if action in action_map:
-            action_map[action]()
-
-    def get_network_state(self):
-        """Serialize game state for network transmission"""
-        return {
-            'pot': self.pot,
-            'game_state': self.game_state,
-            'player1_balance': self.player1.balance,
-            'player2_balance': self.player2.balance,
-            'player1_bet': self.player1.current_bet,
-            'player2_bet': self.player2.current_bet,
-            'current_player_id': 0 if self.current_player == self.player1 else 1,
-            'community_cards': [card.name for card in self.community_cards.hand.cards]
-        }
-
-    def update_from_network(self, state):
-        """Update local game state from network data"""
-        # Update game state attributes from received state
-        for key, value in state.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
+        super().handle_remote_action(action, amount, player_id)
+        self.scheduler.request_redraw()
+
+    def update_from_network(self, changes):
+        """Apply the fields that changed on the server (a delta, or every field for a full snapshot)"""
+        # On a table server we sit wherever it seated us
+        if self.thin and self.network_manager.seat is not None:
+            self.player_id = self.network_manager.seat
+
+        if 'pot' in changes:
+            self.pot = changes['pot']
+        if 'game_state' in changes:
+            self.game_state = changes['game_state']
+        if 'player1_balance' in changes:
+            self.player1.balance = changes['player1_balance']
+        if 'player2_balance' in changes:
+            self.player2.balance = changes['player2_balance']
+        if 'player1_bet' in changes:
+            self.player1.current_bet = changes['player1_bet']
+        if 'player2_bet' in changes:
+            self.player2.current_bet = changes['player2_bet']
+        if 'raise_count' in changes:
+            self.raise_count = changes['raise_count']
 
         # Update community cards
-        self.community_cards.hand.cards = [
-            self.card_from_name(card_name) for card_name in state.get('community_cards', [])
-        ]
+        if 'community_cards' in changes:
+            self.community_cards.hand.cards = [
+                Card.from_id(card_id) for card_id in changes['community_cards']
+            ]
 
-        # Update current player
-        self.current_player = (
-            self.player1 if state.get('current_player_id', 0) == 0 else self.player2
-        )
+        # Our own hole cards (only in a seated player's view)
+        if 'hole_cards' in changes:
+            player = self.player1 if self.player_id == 0 else self.player2
+            player.hand.cards = [Card.from_id(card_id) for card_id in changes['hole_cards']]
 
-    def card_from_name(self, card_name):
-        """Convert card name back to Card object"""
-        value, _, suit = card_name.partition(' of ')
-        return Card(suit, value)
+        # Update current player
+        if 'current_player_id' in changes:
+            self.current_player = (
+                self.player1 if changes['current_player_id'] == 0 else self.player2
+            )
+        self.scheduler.request_redraw()
 
     def run(self):
         """Main game loop with network support"""
         # Start network manager
         self.network_manager.start()
 
-        # Initial game setup
-        self.player1.set_balance(self.screen, 'player 1\'s')
-        self.player2.set_balance(self.screen, 'player 2\'s')
-        self.set_blinds(self.screen)
-        self.reset_game()
+        # Show the first frame right away, assets keep loading in the background
+        self.screen.fill(BACKGROUND_COLOR)
+        pygame.display.flip()
+        self.assets.report_first_frame()
+
+        lockstep = self.network_manager.lockstep
+        if self.thin:
+            # The table server deals and sets the blinds, we just take a seat
+            self.network_manager.join_table(self.table_id)
+            self.status_message = f"Joining table {self.table_id}..."
+        elif lockstep:
+            # The host picks balances and blinds for both, the first hand is dealt once the seeds are exchanged
+            if self.is_server:
+                self._setup_table()
+            self.status_message = "Waiting for the other player..."
+            if self.is_server:
+                lockstep.host_ready()
+        else:
+            self._setup_table()
+            self.reset_game()
+
+            # Clients start from the host's state
+            self.network_manager.send_game_state()
 
         # Game loop
-        clock = pygame.time.Clock()
         running = True
 
         while self.network_manager.running and running:
-            self.draw_game()
+            # Sleep until input or a network message needs us
+            events = self.scheduler.wait_for_events()
+
+            # Apply network messages here so the table never changes in the middle of a draw
+            self.network_manager.process_messages()
+
+            for event in events:
+                # Work out if this event changes what is on screen
+                if event.type == pygame.MOUSEMOTION:
+                    self.scheduler.note_hover(self.buttons.hovered_button(event.pos))
+                else:
+                    self.scheduler.note_event(event)
+
+                # An open prompt gets the keyboard first (ESC closes the prompt, not the game)
+                if self.active_prompt and self.active_prompt.handle_event(event):
+                    if self.active_prompt.done:
+                        self.active_prompt = None
+                    continue
 
-            for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
 
+                if event.type == ASSET_LOADED_EVENT:
+                    self.sound_manager.on_asset_loaded(event.name)
+
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                     running = False
 
-                if event.type == pygame.MOUSEBUTTONDOWN:
+                # The table is locked while a prompt is open, network updates keep coming in
+                if event.type == pygame.MOUSEBUTTONDOWN and not self.active_prompt:
                     mouse_pos = event.pos
                     self._handle_mouse_click(mouse_pos)
 
-            pygame.display.flip()
-            clock.tick(30)
+            # Only draw when the state or hover changed
+            if self.scheduler.should_render():
+                self.draw_game()
+                if self.active_prompt:
+                    self.active_prompt.draw(self.screen)
+                pygame.display.flip()
 
+        self.assets.shutdown()
         pygame.quit()
         sys.exit()
 
+    def _setup_table(self):
+        """Ask for both balances and the blinds"""
+        self.player1.set_balance(self.screen, 'player 1\'s')
+        self.player2.set_balance(self.screen, 'player 2\'s')
+        self.set_blinds(self.screen)
+
     def _handle_mouse_click(self, mouse_pos):
         """Handle mouse clicks based on game state and player turn"""
         if self.game_state == STATE_GAME_OVER:
             return
 
+        # Lockstep: nothing to play until this hand's seed has been agreed
+        if self.network_manager.lockstep and not self.network_manager.lockstep.dealt:
+            return
+
+        # Waiting on the server for the cards after an action that ended the betting round
+        if self.network_manager.prediction and self.network_manager.prediction.waiting():
+            return
+
         # Check if it's the current player's turn
         if self.current_player == (self.player1 if self.player_id == 0 else self.player2):
             for button in self.buttons:
@@ -234,341 +296,51 @@ class MultiplayerPokerGame:
         if button_text in action_map:
             action_map[button_text]()
 
+    def _play(self, action, amount=0):
+        """Apply our own action and send it, or on a table server only send it (the server applies it)"""
+        if self.thin:
+            # Explain a move the server would refuse instead of sending it
+            error = self.validate_action(self.player_id, action, amount)
+            if error:
+                self.status_message = error
+                return
+        elif not self.network_manager.prediction:
+            self.handle_remote_action(action, amount)
+        # With prediction on, send_action applies it locally and keeps it until the server answers
+        self.network_manager.send_action(action, amount=amount)
+
     def _toggle_cards(self):
         """Toggle card visibility and send network action"""
         if self.current_player == self.player1:
             self.player1.cards_visible = not self.player1.cards_visible
-            self.network_manager.send_action('toggle_cards')
+            if not self.thin:  # Only changes our own screen, a table server has no use for it
+                self.network_manager.send_action('toggle_cards')
 
     def _handle_call_action(self):
         """Handle call button action"""
         if self.player1.current_bet > 0 or self.player2.current_bet > 0:
-            self.handle_call()
-            self.network_manager.send_action('call')
+            self._play('call')
 
     def _handle_raise_action(self):
-        """Handle raise button action"""
-        raise_amount = self.current_player.player_bet(self.screen)
-        if raise_amount is not None:
-            self.handle_raise(raise_amount)
-            self.network_manager.send_action('raise', amount=raise_amount)
+        """Handle raise button action (opens a prompt, the raise is sent once it is entered)"""
+        self.active_prompt = self.current_player.bet_prompt(self._send_raise)
+
+    def _send_raise(self, raise_amount):
+        """Apply and send a raise entered in the prompt"""
+        # The table may have moved on while the prompt was open
+        if self.current_player != (self.player1 if self.player_id == 0 else self.player2):
+            self.status_message = "It is no longer your turn"
+            return
+
+        self._play('raise', raise_amount)
 
     def _handle_fold_action(self):
         """Handle fold button action"""
-        self.handle_fold()
-        self.network_manager.send_action('fold')
+        self._play('fold')
 
     def _handle_check_action(self):
         """Handle check button action"""
-        self.handle_check()
-        self.network_manager.send_action('check')
-
-    def handle_fold(self):
-        """Handles what happens when a player folds"""
-        self.current_player.is_folded = True
-
-        other_player = self.player2 if self.current_player == self.player1 else self.player1
-        # Use the game over handler to determine winner
-        winner, message = self.game_over_handler.handle_fold(self.current_player, other_player, self.pot)
-
-        # Update pot and display message
-        self.pot = 0
-        self.status_message = message
-
-        # Set game state to game over
-        self.game_state = STATE_GAME_OVER
-        self.winner = winner
-
-    def handle_call(self):
-        """Handle when a player calls"""
-        # Hide both players' cards first
-        self.player1.cards_visible = False
-        self.player2.cards_visible = False
-
-        # play poker chip sound
-        self.sound_manager.play_poker_chip()
-
-        other_player = self.player2 if self.current_player == self.player1 else self.player1
-        call_amount = other_player.current_bet - self.current_player.current_bet
-
-        # Check if player has enough money to call
-        if call_amount > self.current_player.balance:
-            # Handle all in situation
-            call_amount = self.current_player.balance
-            self.current_player.is_all_in = True
-            self.status_message = f"Player {1 if self.current_player == self.player1 else 2} is ALL IN!"
-
-        # Add the call amount to the pot
-        self.pot += call_amount
-        self.current_player.place_bet(other_player.current_bet)
-
-        # Check if BOTH players are now all-in
-        if self.player1.is_all_in and self.player2.is_all_in:
-            # Deal all remaining community cards
-            while len(self.community_cards.hand.cards) < 5:
-                self.community_cards.hand.add_card(self.deck.deal())
-
-            # Go directly to showdown
-            self.game_state = STATE_SHOWDOWN
-            self.handle_showdown()
-            return
-
-        # Special handling for preflop
-        if self.game_state == STATE_PREFLOP:
-            # If current player is the dealer (small blind), switch to big blind
-            if self.current_player == self.current_dealer:
-                self.current_player = self.current_bigblind
-                return
-
-        # Check if both players have acted and bets are equal, or if someone is all-in
-        if (self.player1.current_bet == self.player2.current_bet) or \
-                self.player1.is_all_in or self.player2.is_all_in:
-            # Both players have acted and bets are equal, advance to next phase
-            self.advance_game_state()
-        else:
-            # Switch to the other player's turn
-            self.switch_turn()
-
-    def handle_raise(self, amount):
-        """Handle when a player raises to a specific amount"""
-
-        self.sound_manager.play_poker_chip()
-
-        other_player = self.player2 if self.current_player == self.player1 else self.player1
-
-        # Track the number of raises in the current betting round
-        if not hasattr(self, 'raise_count'):
-            self.raise_count = 0
-
-        # Standard rule: Maximum of 3 or 4 total bets (initial bet + 3 raises)
-        MAX_RAISES = 3  # Most common house rule
-
-        # Check if maximum raises have been reached
-        if self.raise_count >= MAX_RAISES:
-            # Set status message for max raises
-            self.status_message = "Maximum raises reached in this betting round."
-            return False
-
-        # Determine the maximum possible raise based on all-in status
-        max_possible_raise = other_player.balance + other_player.current_bet if other_player.is_all_in else self.current_player.balance + self.current_player.current_bet
-
-        # Calculate the amount to add to the pot
-        pot_addition = amount - self.current_player.current_bet
-
-        # Validate the raise amount with specific error messages
-        if amount <= other_player.current_bet:
-            # Raise must be higher than current bet
-            self.status_message = f"Raise must be higher than ${other_player.current_bet}"
-            return False
-
-        if amount > max_possible_raise:
-            # Not enough balance for the raise
-            self.status_message = f"Insufficient funds. Max raise is ${max_possible_raise}"
-            return False
-
-        # Check if this is an all-in
-        if amount >= self.current_player.balance + self.current_player.current_bet:
-            amount = self.current_player.balance + self.current_player.current_bet
-            self.current_player.is_all_in = True
-            self.status_message = f"Player {1 if self.current_player == self.player1 else 2} is ALL IN!"
-
-        # Add to pot and update player's bet
-        self.pot += pot_addition
-        result = self.current_player.place_bet(amount)
-
-        # Increment raise count
-        self.raise_count += 1
-
-        # Switch to the other player's turn
-        self.switch_turn()
-        return True
-
-    def handle_check(self):
-        """Handle when a player checks"""
-        # Only allow check if current bets are equal
-        if self.player1.current_bet == self.player2.current_bet:
-            # Switch to the other player
-            self.switch_turn()
-
-            # In preflop, if big blind checks and it's now the dealer's turn, advance to flop
-            if self.game_state == STATE_PREFLOP and self.current_player == self.current_dealer:
-                print("DEBUG: Advancing from preflop after big blind check")
-                # Explicitly deal flop and change game state
-                self.flop()
-                self.game_state = STATE_FLOP
-                # Big blind acts first after the flop
-                self.current_player = self.current_bigblind
-                # Reset bets
-                self.player1.current_bet = 0
-                self.player2.current_bet = 0
-                return
-
-            # Check if we've returned to the original starting player in other rounds
-            if self.current_player == (
-                    self.current_dealer if self.game_state == STATE_PREFLOP else self.current_bigblind
-            ):
-                # Advance to next game state
-                self.advance_game_state()
-
-        else:
-            # Show error or prevent checking
-            self.status_message = "Cannot check when there's an active bet"
-            print("Cannot check when there's an active bet")
-
-    def handle_showdown(self):
-        """Handle the showdown at the end of the hand"""
-        # Make all cards visible for showdown
-        self.player1.cards_visible = True
-        self.player2.cards_visible = True
-
-        # Use the game over handler to determine winner
-        winner, message = self.game_over_handler.handle_showdown(
-            self.player1, self.player2, self.community_cards, self.pot
-        )
-
-        # Update game state
-        self.pot = 0
-
-        # Modify the message to include the specific player
-        if winner == self.player1:
-            self.status_message = "Player 1 " + message
-        elif winner == self.player2:
-            self.status_message = "Player 2 " + message
-        else:
-            self.status_message = message
-
-        # Check if either player is out of money
-        if self.player1.balance <= 0 or self.player2.balance <= 0:
-            # Game over due to bankruptcy
-            if self.player1.balance <= 0:
-                self.status_message = "GAME OVER - Player 2 Wins! Press ESC to exit"
-                self.game_state = STATE_LOST
-            else:
-                self.status_message = "GAME OVER - Player 1 Wins! Press ESC to exit"
-                self.game_state = STATE_LOST
-        else:
-            self.game_state = STATE_GAME_OVER
-
-        self.winner = winner
-
-    def advance_game_state(self):
-        """Move to the next phase of the game"""
-        # Reset raise count when moving to a new betting round
-        if hasattr(self, 'raise_count'):
-            del self.raise_count
-
-        # Check if both players are all-in or one player is all-in
-        if (self.player1.is_all_in and self.player2.current_bet == self.player1.current_bet) or (self.player2.is_all_in and self.player1.current_bet == self.player2.current_bet):
-            # Deal all remaining community cards at once
-            while len(self.community_cards.hand.cards) < 5:
-                self.community_cards.hand.add_card(self.deck.deal())
-
-            # Skip to showdown
-            self.game_state = STATE_SHOWDOWN
-            self.handle_showdown()
-            return
-
-        # Reset bets for the new round
-        self.player1.current_bet = 0
-        self.player2.current_bet = 0
-
-        if self.game_state == STATE_PREFLOP:
-            # Deal the flop
-            self.flop()
-            self.game_state = STATE_FLOP
-            # Big blind acts first after the flop
-            self.current_player = self.current_bigblind
-
-        elif self.game_state == STATE_FLOP:
-            # Deal the turn
-            self.turn()
-            self.game_state = STATE_TURN
-            # Big blind acts first
-            self.current_player = self.current_bigblind
-
-        elif self.game_state == STATE_TURN:
-            # Deal the river
-            self.river()
-            self.game_state = STATE_RIVER
-            # Big blind acts first
-            self.current_player = self.current_bigblind
-
-        elif self.game_state == STATE_RIVER:
-            # Go to showdown
-            self.game_state = STATE_SHOWDOWN
-            self.handle_showdown()
-
-    def switch_turn(self):
-        """Switch to the other player's turn"""
-        self.current_player.cards_visible = False  # hide cards first
-
-        # Clear the status message when switching turns
-        self.status_message = ""
-
-        if self.current_player == self.player1:
-            self.current_player = self.player2
-        else:
-            self.current_player = self.player1
-
-    def switch_dealer(self):
-        """Switch the dealer to the other player"""
-
-        if self.current_dealer == self.player1:
-            self.current_dealer = self.player2
-            self.current_bigblind = self.player1
-        else:
-            self.current_dealer = self.player1
-            self.current_bigblind = self.player2
-
-    def reset_game(self):
-        """Reset the game to its initial state"""
-        # reset bg music to play from beginning
-        self.sound_manager.stop_bg_music()
-        self.sound_manager.play_bg_music()
-
-        # setup deck
-        self.deck = Deck()
-        self.deck.shuffle()
-
-        # Reset players
-        self.player1.reset_for_new_hand()
-        self.player2.reset_for_new_hand()
-        self.community_cards.hand = Hand()
-
-        # switching dealers after each round
-        self.switch_dealer()
-
-        # Check if players can afford blinds
-        if self.current_dealer.balance < self.small_blind or self.current_bigblind.balance < self.big_blind:
-            # Game over due to insufficient funds
-            if self.current_dealer.balance < self.small_blind:
-                self.status_message = "GAME OVER - Dealer cannot afford small blind! Press ESC to exit"
-                self.game_state = STATE_LOST
-            else:
-                self.status_message = "GAME OVER - Big Blind cannot afford big blind! Press ESC to exit"
-                self.game_state = STATE_LOST
-            return
-
-        # Reset pot
-        self.pot = 0
-
-        # Clear status message
-        self.status_message = ""
-
-        # Deal initial cards
-        self.player1.hand.add_card(self.deck.deal())
-        self.player1.hand.add_card(self.deck.deal())
-        self.player2.hand.add_card(self.deck.deal())
-        self.player2.hand.add_card(self.deck.deal())
-
-        # Set initial game state
-        self.game_state = STATE_PREFLOP
-
-        # Put blinds in for the new hand
-        self.put_blinds_in()
-
-        # First to act in preflop is the dealer (small blind)
-        self.current_player = self.current_dealer
+        self._play('check')
 
     def set_blinds(self, screen):
         """Set blinds with input"""
@@ -584,49 +356,20 @@ class MultiplayerPokerGame:
             # setting big blind to twice of small blind
             self.big_blind = self.small_blind * 2
 
-    def put_blinds_in(self):
-        """Put blinds in, calculate for bet and pot"""
-
-        # Deduct small blind from dealer
-        self.current_dealer.balance -= self.small_blind
-        self.current_dealer.current_bet = self.small_blind
-
-        # Deduct big blind from big blind player
-        self.current_bigblind.balance -= self.big_blind
-        self.current_bigblind.current_bet = self.big_blind
-
-        # Update pot with blinds
-        self.pot = self.small_blind + self.big_blind
-
-        # First to act in preflop is the dealer (small blind) (just to be safe)
-        self.current_player = self.current_dealer
-
-    def flop(self):
-        """Deal 3 cards for flop"""
-        self.community_cards.hand.add_card(self.deck.deal())
-        self.community_cards.hand.add_card(self.deck.deal())
-        self.community_cards.hand.add_card(self.deck.deal())
-
-    def turn(self):
-        """Deal 1 card for turn"""
-        self.community_cards.hand.add_card(self.deck.deal())
-
-    def river(self):
-        """Deal 1 card for river"""
-        self.community_cards.hand.add_card(self.deck.deal())
-
 
 def main():
     """Entry point for multiplayer poker game"""
     print('Multiplayer Poker Setup')
     print('1. Host Game')
     print('2. Join Game')
+    print('3. Join a table on a table server')
 
-    choice = input('Select mode (1/2): ')
+    choice = input('Select mode (1/2/3): ')
 
     game = MultiplayerPokerGame(
         is_server=choice == '1',
-        server_ip=input('Server IP: ') if choice == '2' else None
+        server_ip=input('Server IP: ') if choice in ('2', '3') else None,
+        table_id=int(input('Table number: ')) if choice == '3' else None
     )
     game.run()
 
@@ -0,0 +1,247 @@
+"""net_metrics.py - Per-connection network counters and histograms, and a local HTTP endpoint to read them
+
+GET http://127.0.0.1:<port>/stats returns JSON, /stats.txt the same numbers as one
+"name{labels} value" line each so a load test (or anything else) can scrape it.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import json
+import time
+import bisect
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in milliseconds (anything slower goes in the last, open bucket)
+BUCKETS_MS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class Histogram:
+    """Counts of durations per bucket, cheap enough to update for every message"""
+    def __init__(self):
+        """Initialization"""
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        """Record one duration"""
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def merge(self, other):
+        """Add another histogram's counts to this one"""
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples (ms), None if empty"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS_MS[index] if index < len(BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self):
+        """Summary for the stats endpoint"""
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else None,
+            'p50_ms': self.percentile(0.50),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': self.max,
+        }
+
+
+class ConnectionMetrics:
+    """Traffic counters for one connection (or the sum of several)"""
+    def __init__(self):
+        """Initialization"""
+        self.messages_in = 0
+        self.bytes_in = 0
+        self.messages_out = 0
+        self.bytes_out = 0
+        self.decode_time = Histogram()
+        self.rtt = Histogram()
+
+    def merge(self, other):
+        """Add another connection's counters to these"""
+        self.messages_in += other.messages_in
+        self.bytes_in += other.bytes_in
+        self.messages_out += other.messages_out
+        self.bytes_out += other.bytes_out
+        self.decode_time.merge(other.decode_time)
+        self.rtt.merge(other.rtt)
+
+    def to_dict(self):
+        """Counters for the stats endpoint"""
+        return {
+            'messages_in': self.messages_in,
+            'bytes_in': self.bytes_in,
+            'messages_out': self.messages_out,
+            'bytes_out': self.bytes_out,
+            'decode_time': self.decode_time.to_dict(),
+            'rtt': self.rtt.to_dict(),
+        }
+
+
+class NetworkMetrics:
+    """Metrics for every open connection, plus totals and disconnect reasons for closed ones
+
+    The reader updates the "in" counters and the writer the "out" counters of a
+    connection, so each number only ever has one thread adding to it.
+    """
+    def __init__(self):
+        """Initialization"""
+        self.connections = {}  # peer -> ConnectionMetrics
+        self.closed_totals = ConnectionMetrics()
+        self.disconnects = Counter()  # reason -> count
+        self.drop_reasons = {}  # peer -> why we are closing it, until its reader finishes
+        self.started = time.perf_counter()
+
+    def opened(self, peer):
+        """Start tracking a connection"""
+        self.connections[peer] = ConnectionMetrics()
+
+    def received(self, peer, size, decode_seconds):
+        """A message came in: its size on the wire and how long it took to decode"""
+        metrics = self.connections.get(peer)
+        if metrics:
+            metrics.messages_in += 1
+            metrics.bytes_in += size
+            metrics.decode_time.add(decode_seconds)
+
+    def sent(self, peer, size):
+        """A message went out"""
+        metrics = self.connections.get(peer)
+        if metrics:
+            metrics.messages_out += 1
+            metrics.bytes_out += size
+
+    def round_trip(self, peer, seconds):
+        """A heartbeat came back"""
+        metrics = self.connections.get(peer)
+        if metrics:
+            metrics.rtt.add(seconds)
+
+    def dropping(self, peer, reason):
+        """We are closing a connection ourselves, remember why for when it is closed"""
+        self.drop_reasons.setdefault(peer, reason)
+
+    def closed(self, peer, reason):
+        """A connection is gone, fold its counters into the totals"""
+        reason = self.drop_reasons.pop(peer, reason)
+        metrics = self.connections.pop(peer, None)
+        if metrics is None:
+            return
+        self.closed_totals.merge(metrics)
+        self.disconnects[reason] += 1
+
+    def snapshot(self, queue_stats, group_of=None):
+        """Totals, per group (e.g. per table) and per connection counters as a dict
+
+        queue_stats maps each peer to its send queue stats, group_of maps a peer to its
+        group name (every open connection is in 'all' if it is not given).
+        """
+        totals = ConnectionMetrics()
+        totals.merge(self.closed_totals)
+        groups = {}
+        connections = []
+        for peer, metrics in list(self.connections.items()):
+            totals.merge(metrics)
+            group = group_of(peer) if group_of else 'all'
+            groups.setdefault(group, ConnectionMetrics()).merge(metrics)
+
+            queue = queue_stats.get(peer, {})
+            stats = metrics.to_dict()
+            stats.update(peer=str(peer), group=group, queue_depth=queue.get('depth', 0),
+                         queue_bytes=queue.get('bytes', 0))
+            connections.append(stats)
+
+        return {
+            'uptime_s': time.perf_counter() - self.started,
+            'open_connections': len(connections),
+            'disconnects': dict(self.disconnects),
+            'totals': totals.to_dict(),
+            'groups': {str(group): metrics.to_dict() for group, metrics in groups.items()},
+            'connections': connections,
+        }
+
+
+def stats_text(stats):
+    """One "name{labels} value" line per number in a snapshot"""
+    lines = [f"net_uptime_seconds {stats['uptime_s']:.3f}",
+             f"net_open_connections {stats['open_connections']}"]
+    for reason, count in sorted(stats['disconnects'].items()):
+        lines.append(f'net_disconnects{{reason="{reason}"}} {count}')
+
+    sections = [('', stats['totals'])]
+    sections += [(f'group="{group}"', metrics) for group, metrics in sorted(stats['groups'].items())]
+    sections += [(f'peer="{metrics["peer"]}",group="{metrics["group"]}"', metrics)
+                 for metrics in stats['connections']]
+    for labels, metrics in sections:
+        suffix = f'{{{labels}}}' if labels else ''
+        for name in ('messages_in', 'bytes_in', 'messages_out', 'bytes_out', 'queue_depth', 'queue_bytes'):
+            if name in metrics:
+                lines.append(f"net_{name}{suffix} {metrics[name]}")
+        for histogram in ('decode_time', 'rtt'):
+            for key, value in metrics[histogram].items():
+                if value is not None:
+                    lines.append(f"net_{histogram}_{key}{suffix} {value}")
+    return '\n'.join(lines) + '\n'
+
+
+class StatsServer:
+    """Serves a stats callback over HTTP on 127.0.0.1 from a background thread"""
+    def __init__(self, get_stats, port):
+        """Initialization"""
+        self.get_stats = get_stats
+        self.port = port
+        self.httpd = None
+
+    def start(self):
+        """Start serving, returns self"""
+        get_stats = self.get_stats
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/stats':
+                    body, content_type = json.dumps(get_stats(), indent=2).encode(), 'application/json'
+                elif self.path == '/stats.txt':
+                    body, content_type = stats_text(get_stats()).encode(), 'text/plain'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # Scraping every second would flood the console
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        print(f"Network stats on http://127.0.0.1:{self.port}/stats")
+        return self
+
+    def stop(self):
+        """Stop serving"""
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
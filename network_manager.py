@@ -1,7 +1,14 @@
+import os
+import time
 import socket
 import pickle
 import threading
 
+from config import *
+from framing import FRAME_HEADER, FrameBuffer, FrameError, encode_frame
+from net_metrics import NetworkMetrics, StatsServer
+from send_queue import SendQueue
+
 class NetworkManager:
     def __init__(self, is_server=False, server_ip='127.0.0.1', port=5555):
         self.is_server = is_server
@@ -9,8 +16,29 @@ class NetworkManager:
         self.port = port
         self.socket = None
         self.client_sockets = []
+
+        # Servers can also listen on a Unix socket for clients on the same machine
+        self.unix_path = UNIX_SOCKET_PATH
+        self.unix_socket = None
         self.running = False
-    
+
+        # Each socket gets its own outbound queue and writer, so a slow peer only holds up itself
+        self.send_queues = {}
+        self.slow_disconnects = 0
+
+        # Heartbeats: when we last heard from each peer, and the round trip of its last heartbeat
+        self.last_seen = {}
+        self.rtt = {}
+
+        # Clients reconnect after a dropped connection instead of giving up
+        self.reconnect = not is_server
+        self.reconnects = 0
+
+        # Traffic counters per connection, served on 127.0.0.1:stats_port when it is set
+        self.metrics = NetworkMetrics()
+        self.stats_port = STATS_PORT
+        self.stats_server = None
+
     def start(self):
         """Start the network manager as either server or client"""
         self.running = True
@@ -18,110 +46,346 @@ class NetworkManager:
             self._start_server()
         else:
             self._connect_to_server()
-    
+
+        if self.running:
+            threading.Thread(target=self._heartbeat_loop, daemon=True).start()
+            self._start_stats_server()
+
     def _start_server(self):
         """Initialize and run the server"""
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # Allow quick restarts
         self.socket.bind(('0.0.0.0', self.port))
         self.socket.listen(2)  # Listen for 2 players
-        
+
         # Start a thread to accept connections
-        threading.Thread(target=self._accept_connections, daemon=True).start()
-    
-    def _accept_connections(self):
-        """Accept client connections (runs in a separate thread)"""
+        threading.Thread(target=self._accept_connections, args=(self.socket,), daemon=True).start()
         print(f"Server started, waiting for connections on port {self.port}...")
-        while self.running and len(self.client_sockets) < 2:
+
+        if self.unix_path:
+            self.unix_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._remove_unix_path()  # Left behind by a server that crashed
+            self.unix_socket.bind(self.unix_path)
+            self.unix_socket.listen(2)
+            threading.Thread(target=self._accept_connections, args=(self.unix_socket,), daemon=True).start()
+            print(f"Also listening on {self.unix_path}")
+
+    def _remove_unix_path(self):
+        """Delete the Unix socket file"""
+        try:
+            os.unlink(self.unix_path)
+        except FileNotFoundError:
+            pass
+
+    def _accept_connections(self, listener):
+        """Accept client connections (runs in a separate thread)"""
+        while self.running:
             try:
-                client_socket, addr = self.socket.accept()
+                client_socket, addr = listener.accept()
+
+                # Keep accepting so a player who dropped can come back, but only 2 at a time
+                if len(self.client_sockets) >= 2:
+                    client_socket.close()
+                    continue
+
+                if client_socket.family == socket.AF_INET:
+                    client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Small messages go out right away
                 self.client_sockets.append(client_socket)
                 print(f"Connection from {addr}")
-                
+                self._start_writer(client_socket)
+                self._on_connect(client_socket)
+
                 # Start a thread to handle this client
-                threading.Thread(target=self._handle_client, 
+                threading.Thread(target=self._handle_client,
                                 args=(client_socket,), daemon=True).start()
-            except:
+            except OSError:
                 break
-    
+
     def _handle_client(self, client_socket):
         """Handle communication with a client"""
-        while self.running:
-            try:
-                # Receive data from client
-                data = client_socket.recv(4096)
-                if not data:
-                    break
-                
-                # Process the received data
-                message = pickle.loads(data)
-                self._process_message(message, client_socket)
-            except:
-                break
-        
+        reason = self._receive_frames(client_socket, client_socket)
+        self.metrics.closed(client_socket, reason)
+
         # Clean up when client disconnects
         if client_socket in self.client_sockets:
             self.client_sockets.remove(client_socket)
+        self._stop_writer(client_socket)
         client_socket.close()
-    
+        self._on_disconnect(client_socket)
+
     def _connect_to_server(self):
         """Connect to the server as a client"""
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
-            self.socket.connect((self.server_ip, self.port))
-            print(f"Connected to server at {self.server_ip}:{self.port}")
-            
+            self._open_server_connection()
+
             # Start a thread to receive messages
             threading.Thread(target=self._receive_messages, daemon=True).start()
         except Exception as e:
             print(f"Failed to connect: {e}")
             self.running = False
-    
+
+    def _open_server_connection(self, dropped_at=None):
+        """Connect (or reconnect) to the server and start sending"""
+        unix_path = self._server_unix_path()
+        if unix_path:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            address = unix_path
+        else:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # Small messages go out right away
+            address = (self.server_ip, self.port)
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        sock.settimeout(None)
+
+        self.socket = sock
+        print(f"Connected to server at {unix_path or f'{self.server_ip}:{self.port}'}")
+        self._start_writer(sock)
+        self._on_connected(dropped_at)
+
+    def _server_unix_path(self):
+        """Path of the server's Unix socket if server_ip is 'unix:<path>', otherwise None (TCP)"""
+        if self.server_ip and self.server_ip.startswith('unix:'):
+            return self.server_ip[len('unix:'):]
+        return None
+
+    def _is_local(self, peer):
+        """returns True if a peer is connected over the Unix socket (so it is on this machine)"""
+        return peer.family == getattr(socket, 'AF_UNIX', None)
+
     def _receive_messages(self):
-        """Receive messages from the server (client mode)"""
-        while self.running:
-            try:
-                data = self.socket.recv(4096)
-                if not data:
-                    break
-                
-                message = pickle.loads(data)
-                self._process_message(message)
-            except:
+        """Receive messages from the server (client mode), reconnecting if the connection drops"""
+        while True:
+            reason = self._receive_frames(self.socket)
+            self.metrics.closed(self.socket, reason)
+            self._stop_writer(self.socket)
+            self.socket.close()
+            if not (self.running and self.reconnect and self._reconnect()):
                 break
         self.running = False
-    
+
+    def _reconnect(self):
+        """Keep trying to get back to the server for RECONNECT_TIMEOUT seconds, returns True once connected"""
+        dropped_at = time.perf_counter()
+        print("Connection lost, reconnecting...")
+        while self.running and time.perf_counter() - dropped_at < RECONNECT_TIMEOUT:
+            try:
+                self._open_server_connection(dropped_at)
+                self.reconnects += 1
+                return True
+            except OSError:
+                time.sleep(RECONNECT_DELAY)
+        return False
+
+    def _receive_frames(self, sock, sender=None):
+        """Read frames from a socket until it closes, passing each message on, returns why it stopped"""
+        # One buffer per connection, reused for every message
+        frame_buffer = FrameBuffer()
+        while self.running:
+            try:
+                if frame_buffer.recv_from(sock) == 0:
+                    return 'closed'
+
+                # A single read can hold part of a message, or several messages
+                for payload in frame_buffer.frames():
+                    message = self._decode_timed(payload, sock)
+                    self._deliver(message, sender, sock)
+            except FrameError as e:
+                print(f"Dropping connection: {e}")
+                return 'frame_error'
+            except (pickle.UnpicklingError, EOFError, ValueError) as e:
+                print(f"Dropping connection, bad message: {e}")
+                return 'bad_message'
+            except OSError:
+                return 'socket_error'
+        return 'shutdown'
+
+    def _decode_timed(self, payload, peer):
+        """Decode a message, counting it and its decode time in the metrics"""
+        start = time.perf_counter()
+        message = self._decode_message(payload)
+        self.metrics.received(peer, len(payload) + FRAME_HEADER.size, time.perf_counter() - start)
+        return message
+
+    def _deliver(self, message, sender, peer):
+        """Note that a peer is alive, answer heartbeats and pass everything else on"""
+        now = time.monotonic()
+        self.last_seen[peer] = now
+
+        if message.get('type') != 'heartbeat':
+            self._process_message(message, sender)
+        elif message['reply']:
+            self.rtt[peer] = now - message['timestamp'] / 1e6
+            self.metrics.round_trip(peer, self.rtt[peer])
+        else:
+            self.send_message({'type': 'heartbeat', 'reply': True, 'timestamp': message['timestamp']}, sender)
+
+    def _heartbeat_loop(self):
+        """Send heartbeats every HEARTBEAT_INTERVAL seconds (runs in a separate thread)"""
+        while self.running:
+            time.sleep(HEARTBEAT_INTERVAL)
+            self._heartbeat()
+
+    def _heartbeat(self):
+        """Drop peers we haven't heard from in HEARTBEAT_TIMEOUT seconds, then ping everyone else"""
+        now = time.monotonic()
+        for peer, seen in list(self.last_seen.items()):
+            if now - seen > HEARTBEAT_TIMEOUT:
+                print("Dropping connection: no heartbeat")
+                self._drop_peer(peer, 'heartbeat_timeout')
+
+        self.send_message({'type': 'heartbeat', 'reply': False, 'timestamp': int(now * 1e6)})
+
+    def _encode_message(self, message):
+        """Turn a message into bytes"""
+        return pickle.dumps(message)
+
+    def _decode_message(self, payload):
+        """Turn received bytes back into a message"""
+        return pickle.loads(payload)
+
     def send_message(self, message, client_socket=None):
-        """Send a message to the server or to a specific client"""
+        """Queue a message for the server or a specific client (never waits on the socket)"""
         try:
-            data = pickle.dumps(message)
-            if self.is_server and client_socket:
-                # Server sending to a specific client
-                client_socket.send(data)
-            elif self.is_server:
-                # Server broadcasting to all clients
-                for client in self.client_sockets:
-                    client.send(data)
-            else:
-                # Client sending to server
-                self.socket.send(data)
-            return True
+            frame = self.encode_once(message)
         except Exception as e:
             print(f"Error sending message: {e}")
             return False
-    
+        return self.send_frame(frame, self._targets(client_socket), self._coalesce_key(message))
+
+    def encode_once(self, message):
+        """Encode and frame a message, the read-only result can be queued for any number of peers"""
+        return memoryview(encode_frame(self._encode_message(message)))
+
+    def send_frame(self, frame, targets, key=None):
+        """Queue the same encoded frame for every target, returns False if any of them dropped it"""
+        queued = [self._queue_frame(target, frame, key) for target in targets]
+        return all(queued)
+
+    def _targets(self, client_socket=None):
+        """Who send_message sends to"""
+        if self.is_server and client_socket:
+            # Server sending to a specific client
+            return [client_socket]
+        elif self.is_server:
+            # Server broadcasting to all clients
+            return list(self.client_sockets)
+        else:
+            # Client sending to server
+            return [self.socket]
+
+    def _coalesce_key(self, message):
+        """Messages with the same key replace each other while queued (None = always send) - override this in subclasses"""
+        return None
+
+    def _queue_frame(self, sock, data, key=None):
+        """Put a frame on a socket's send queue, disconnecting peers that stopped reading"""
+        send_queue = self.send_queues.get(sock)
+        if send_queue is None:
+            return False
+
+        queued = send_queue.push(data, key)
+        if send_queue.stalled():
+            self._drop_slow_peer(sock)
+        return queued
+
+    def _start_writer(self, sock):
+        """Give a socket its send queue and writer thread"""
+        send_queue = SendQueue()
+        self.send_queues[sock] = send_queue
+        self.last_seen[sock] = time.monotonic()
+        self.metrics.opened(sock)
+        threading.Thread(target=self._write_frames, args=(sock, send_queue), daemon=True).start()
+
+    def _stop_writer(self, sock):
+        """Stop a socket's writer and drop whatever it had queued"""
+        send_queue = self.send_queues.pop(sock, None)
+        if send_queue:
+            send_queue.close()
+        self.last_seen.pop(sock, None)
+        self.rtt.pop(sock, None)
+
+    def _write_frames(self, sock, send_queue):
+        """Send queued frames to one socket (runs in a separate thread)"""
+        while not send_queue.closed:
+            data = send_queue.wait_pop(timeout=0.5)
+            if data is None:
+                continue
+            try:
+                sock.sendall(data)
+            except OSError:
+                break
+            send_queue.sent(len(data))
+            self.metrics.sent(sock, len(data))
+
+    def _drop_slow_peer(self, sock):
+        """Disconnect a peer that has stayed over the high-water mark (its reader thread cleans up)"""
+        print("Dropping connection: peer is not reading its messages")
+        self.slow_disconnects += 1
+        self._drop_peer(sock, 'slow_peer')
+
+    def _drop_peer(self, sock, reason):
+        """Close a connection from our side, its reader thread cleans up (and a client reconnects)"""
+        self.metrics.dropping(sock, reason)
+        self._stop_writer(sock)
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def send_queue_stats(self):
+        """Queue depth and counters for every connection"""
+        return {sock: send_queue.stats() for sock, send_queue in list(self.send_queues.items())}
+
+    def network_stats(self):
+        """Traffic, decode time, round trips and queue depth per connection and per group, plus disconnect reasons"""
+        return self.metrics.snapshot(self.send_queue_stats(), self._stats_group)
+
+    def _stats_group(self, peer):
+        """Which group a connection's numbers are added to in network_stats - override this in subclasses"""
+        return 'all'
+
+    def _start_stats_server(self):
+        """Serve network_stats over HTTP if a stats port is set"""
+        if self.stats_port:
+            try:
+                self.stats_server = StatsServer(self.network_stats, self.stats_port).start()
+            except OSError as e:
+                print(f"Failed to start the stats endpoint: {e}")
+
     def _process_message(self, message, sender=None):
         """Process received messages - override this in subclasses"""
         print(f"Received message: {message}")
         # This should be overridden to handle game-specific messages
-    
+
+    def _on_connect(self, client_socket):
+        """Called on the server when a client connects - override this in subclasses"""
+
+    def _on_disconnect(self, client_socket):
+        """Called on the server when a client disconnects - override this in subclasses"""
+
+    def _on_connected(self, dropped_at=None):
+        """Called on a client once it is connected, dropped_at is set when this is a reconnect - override this in subclasses"""
+
     def stop(self):
         """Stop the network manager and close all connections"""
         self.running = False
+        if self.stats_server:
+            self.stats_server.stop()
+        for sock in list(self.send_queues):
+            self._stop_writer(sock)
         if self.is_server:
             for client in self.client_sockets:
                 try:
                     client.close()
-                except:
+                except OSError:
                     pass
         if self.socket:
-            self.socket.close()
\ No newline at end of file
+            self.socket.close()
+        if self.unix_socket:
+            self.unix_socket.close()
+            self._remove_unix_path()
@@ -2,12 +2,12 @@
 __version__ = '05/22/2025'
 __author__ = 'Kayla Cao'
 
-import pygame
 from hand import Hand
 from config import *
-from input_handler import InputHandler
 
 class Player:
+    __slots__ = ('hand', 'balance', 'password', 'current_bet', 'is_folded', 'cards_visible', 'is_all_in', 'id')
+
     def __init__(self, id):
         """Initialization"""
         self.hand = Hand()
@@ -20,6 +20,9 @@ class Player:
         self.id = id
     def set_balance(self, screen, player):
         """sets the balance of the player"""
+        # pygame is only imported for prompts, so table servers can use Player without it
+        from input_handler import InputHandler
+
         self.balance = InputHandler.get_numeric_input(
             screen,
             "Set " + player + " balance to:",
@@ -30,6 +33,8 @@ class Player:
 
     def player_bet(self, screen):
         """betting functionality"""
+        from input_handler import InputHandler
+
         # Determine maximum bet amount (can't bet more than balance + current bet)
         max_bet = self.balance + self.current_bet
 
@@ -54,6 +59,30 @@ class Player:
 
         return current_bet
 
+    def bet_prompt(self, on_bet, on_cancel=None):
+        """Non-blocking version of player_bet, on_bet is called with the amount once it is entered"""
+        from input_handler import NumericInput
+
+        # Determine maximum bet amount (can't bet more than balance + current bet)
+        max_bet = self.balance + self.current_bet
+
+        def commit(current_bet):
+            # Check if this is an all-in bet
+            if current_bet >= max_bet:
+                current_bet = max_bet
+                self.is_all_in = True
+            on_bet(current_bet)
+
+        return NumericInput(
+            f"Raise bet to: (Max: {max_bet})",
+            SCREEN_WIDTH // 2,
+            SCREEN_HEIGHT // 2,
+            min_value=1,
+            max_value=max_bet,
+            on_commit=commit,
+            on_cancel=on_cancel
+        )
+
     def place_bet(self, amount):
         """Place a bet, deducting from balance"""
         # Validate bet amount
@@ -87,7 +116,7 @@ class Player:
 
     def reset_for_new_hand(self):
         """Reset player state for a new hand"""
-        self.hand = Hand()  # Create a new empty hand
+        self.hand.clear()  # Empty the hand, no new objects every hand
         self.current_bet = 0
         self.is_folded = False
         self.cards_visible = False
@@ -0,0 +1,121 @@
+"""player_stats.py - Running per-player poker stats (VPIP, PFR, aggression, showdowns) by position
+
+The table tells the tracker about each hand and action as it happens, and each one
+only bumps a few counters, so stats can stay on for long sessions and simulations.
+Trackers from several simulation workers add up with merge(), and snapshot() turns
+the counters into the percentages a HUD shows.
+
+- VPIP: hands where the player put chips in preflop by choice (a call or a raise, not the blinds)
+- PFR: hands where the player raised preflop
+- Aggression factor: (bets + raises) / calls
+- WTSD / W$SD: hands that went to showdown, and showdowns won (a split pot counts as half a win)
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+from config import *
+
+POSITIONS = ('dealer', 'big_blind')
+COUNTERS = ('hands', 'vpip', 'pfr', 'raises', 'calls', 'checks', 'folds', 'showdowns', 'showdowns_won', 'showdowns_split')
+
+
+class PositionStats:
+    """Counters for one player in one position"""
+    __slots__ = COUNTERS
+
+    def __init__(self):
+        """Initialization"""
+        for name in COUNTERS:
+            setattr(self, name, 0)
+
+    def merge(self, other):
+        """Add another set of counters to these"""
+        for name in COUNTERS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def to_dict(self):
+        """Counters and the rates worked out from them"""
+        stats = {name: getattr(self, name) for name in COUNTERS}
+        hands = self.hands
+        stats.update(
+            vpip=self.vpip / hands if hands else None,
+            pfr=self.pfr / hands if hands else None,
+            aggression=self.raises / self.calls if self.calls else None,
+            went_to_showdown=self.showdowns / hands if hands else None,
+            won_at_showdown=(self.showdowns_won + self.showdowns_split / 2) / self.showdowns if self.showdowns else None,
+        )
+        return stats
+
+
+class PlayerStatsTracker:
+    """Stats for both players of a table (or the sum of many tables), fed by the table as it plays"""
+    def __init__(self):
+        """Initialization"""
+        self.players = {player_id: {position: PositionStats() for position in POSITIONS}
+                        for player_id in (1, 2)}
+
+        # The hand being played: where each player sits, and who has already counted for VPIP / PFR
+        self.seats = {}  # player id -> PositionStats for this hand
+        self.voluntary = set()
+        self.raised = set()
+
+    def new_hand(self, dealer_id, bigblind_id):
+        """A hand was dealt"""
+        self.seats = {dealer_id: self.players[dealer_id]['dealer'],
+                      bigblind_id: self.players[bigblind_id]['big_blind']}
+        self.voluntary.clear()
+        self.raised.clear()
+        for stats in self.seats.values():
+            stats.hands += 1
+
+    def action(self, player_id, action, game_state):
+        """A player's action was applied ('fold', 'check', 'call' or 'raise') during a betting round"""
+        stats = self.seats.get(player_id)
+        if stats is None:
+            return
+
+        if action == 'call':
+            stats.calls += 1
+        elif action == 'raise':
+            stats.raises += 1
+        elif action == 'check':
+            stats.checks += 1
+        elif action == 'fold':
+            stats.folds += 1
+
+        if game_state == STATE_PREFLOP and action in ('call', 'raise'):
+            if player_id not in self.voluntary:
+                self.voluntary.add(player_id)
+                stats.vpip += 1
+            if action == 'raise' and player_id not in self.raised:
+                self.raised.add(player_id)
+                stats.pfr += 1
+
+    def showdown(self, winner_id):
+        """The hand went to showdown, winner_id is None for a split pot"""
+        for player_id, stats in self.seats.items():
+            stats.showdowns += 1
+            if winner_id is None:
+                stats.showdowns_split += 1
+            elif winner_id == player_id:
+                stats.showdowns_won += 1
+        self.seats = {}
+
+    def merge(self, other):
+        """Add another tracker's counters to this one (e.g. from another simulation worker)"""
+        for player_id, positions in other.players.items():
+            for position, stats in positions.items():
+                self.players[player_id][position].merge(stats)
+
+    def snapshot(self):
+        """Stats per player: each position and both together, as plain dicts"""
+        snapshot = {}
+        for player_id, positions in self.players.items():
+            total = PositionStats()
+            player = {}
+            for position, stats in positions.items():
+                total.merge(stats)
+                player[position] = stats.to_dict()
+            player['all'] = total.to_dict()
+            snapshot[player_id] = player
+        return snapshot
@@ -1,32 +1,283 @@
+import os
+import time
+import queue
+from collections import deque
+
+from config import *
 from network_manager import NetworkManager
+from async_network_manager import AsyncNetworkManager
+from message_codec import encode_message, decode_message
+from state_sync import StateSyncServer, StateSyncClient
+from lockstep import TrustedLockstepSession
+from shared_state import SharedStateRing
+from prediction import ActionPredictor
+
+# Actions that go through the rules (toggle_cards only changes what one screen shows)
+GAME_ACTIONS = ('fold', 'call', 'raise', 'check')
 
 class PokerNetworkManager(NetworkManager):
     def __init__(self, game, is_server=False, server_ip='127.0.0.1', port=5555):
         super().__init__(is_server, server_ip, port)
         self.game = game  # Reference to the main game object
-    
+
+        # Versioned state: the server tracks what each client has, the client what it has applied
+        self.state_sync = StateSyncServer() if is_server else StateSyncClient()
+
+        # Table server lobby (client only): where we are seated, and the last table list received
+        self.table_id = None
+        self.seat = None
+        self.spectating = False
+        self.tables = []
+
+        # Messages received on network threads, applied by the main loop in process_messages
+        self.inbox = queue.Queue(maxsize=INBOUND_QUEUE_SIZE)
+        self.on_message = None  # Called from the network thread after a message is queued
+
+        # Trusted lockstep mode (see enable_trusted_lockstep): both sides run the rules, only actions are exchanged
+        self.lockstep = None
+
+        # Client-side prediction (see enable_prediction): our actions show before the server answers
+        self.prediction = None
+        self.action_seq = 0  # Server: sequence number of the last action the client sent, echoed in the state
+
+        # Sessions: the server hands each client a token, a client that reconnects with it carries on
+        # from the state version it already has instead of starting over
+        self.session_token = None  # Client: our token
+        self.sessions = set()  # Server: tokens it has handed out
+        self.session_of = {}  # Server: client -> its token, once it has said hello (it gets no state before that)
+        self.resumed_at = None  # Client: when the dropped connection we are recovering from went down
+        self.resync_version = None  # Client: server version we need to reach before we are back in sync
+        self.last_recovery_time = None  # Client: seconds from the last drop until we were back in sync
+
+        # Same-host clients can read game states from shared memory instead of the socket (see enable_shared_state)
+        self.shared_state = None
+        self.shared_clients = set()  # Server: clients that read their states from shared memory
+        self.state_ready_frame = None  # Server: the notice those clients get over the socket for each new state
+
+    def _encode_message(self, message):
+        """Poker messages use the compact binary codec instead of pickle"""
+        return encode_message(message)
+
+    def _decode_message(self, payload):
+        """Decode a binary poker message (never unpickles data from a peer)"""
+        return decode_message(payload)
+
+    def enable_trusted_lockstep(self):
+        """Play in lockstep: no game state is sent, each hand is dealt from a seed both sides agree on
+
+        Only for players (or bots) that trust each other: both sides know the whole deck,
+        so either one can read the other's hole cards.
+        """
+        self.lockstep = TrustedLockstepSession(self, self.game)
+
+    def enable_prediction(self):
+        """Apply our own actions as soon as they are sent, and reconcile when the server's state arrives (client only)"""
+        self.prediction = ActionPredictor(self, self.game)
+
+    def enable_shared_state(self, name=SHARED_STATE_NAME):
+        """Host: also write every game state to a shared memory block. Client: read game states from it
+
+        Call before start. The host has to enable it first, and a client only gets its
+        states this way when it connects over the host's Unix socket (server_ip='unix:<path>').
+        """
+        self.shared_state = SharedStateRing(name, create=self.is_server)
+        if self.is_server:
+            # Clients read the state itself from the ring, the socket only tells them when to look
+            self.state_ready_frame = self.encode_once({'type': 'state_ready'})
+
+    def _coalesce_key(self, message):
+        """A queued game state is replaced by a newer one, each delta covers everything since the client's ack"""
+        msg_type = message.get('type')
+        return msg_type if msg_type in ('game_state', 'state_ready') else None
+
     def _process_message(self, message, sender=None):
-        """Handle poker-specific messages"""
+        """Queue a received message for the main loop (runs on the network thread)"""
+        # When the main loop falls behind, stop reading so TCP slows the peer down
+        while self.running:
+            try:
+                self.inbox.put((message, sender), timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+        if self.on_message:
+            self.on_message()
+
+    def process_messages(self, time_budget_ms=INBOUND_TIME_BUDGET_MS):
+        """Apply queued messages until the queue is empty or the time budget runs out, returns how many"""
+        deadline = time.perf_counter() + time_budget_ms / 1000
+        handled = 0
+        while time.perf_counter() < deadline:
+            try:
+                message, sender = self.inbox.get_nowait()
+            except queue.Empty:
+                break
+            self._handle_message(message, sender)
+            handled += 1
+
+        # Out of time with messages left: make sure the main loop comes back for them
+        if not self.inbox.empty() and self.on_message:
+            self.on_message()
+        return handled
+
+    def _handle_message(self, message, sender=None):
+        """Handle poker-specific messages (runs on the main loop)"""
         msg_type = message.get('type')
-        
+
         if msg_type == 'action':
             # Handle player actions (bet, fold, etc.)
             action = message.get('action')
             amount = message.get('amount', 0)
             player_id = message.get('player_id')
-            
+            if self.is_server:
+                self.action_seq = message.get('seq', 0)
+
             # Update the game state based on the action
             self.game.handle_remote_action(action, amount, player_id)
-            
-            # If server, broadcast the updated game state
-            if self.is_server:
+
+            if self.lockstep:
+                if action in GAME_ACTIONS:
+                    self.lockstep.action_applied()
+            elif self.is_server:
+                # If server, broadcast the updated game state
                 self.send_game_state()
-        
+
         elif msg_type == 'game_state':
             # Update local game state with server data
             if not self.is_server:
-                self.game.update_from_network(message.get('state'))
-    
+                self._apply_game_state(message)
+
+        elif msg_type == 'state_ready':
+            # The host wrote a new state to shared memory
+            if self.shared_state and not self.is_server:
+                self._read_shared_state()
+
+        elif msg_type == 'state_ack':
+            # Client confirmed a version (or asked for a full snapshot with version 0)
+            if self.is_server:
+                self.state_sync.ack(sender, message['version'])
+                if message['version'] == 0:
+                    self._send_state_to(sender)
+
+        elif msg_type == 'joined':
+            # Table server answered a join or spectate (seat is None if the table was full, or when watching)
+            joined = message['seat'] is not None or message.get('spectator')
+            self.table_id = message['table_id'] if joined else None
+            self.seat = message['seat']
+            self.spectating = message.get('spectator', False)
+            self.state_sync = StateSyncClient()
+            if self.prediction:
+                self.prediction.reset()
+
+        elif msg_type == 'reconnected':
+            # Actions sent just before the drop may never have arrived, the server's state will tell
+            if self.prediction:
+                self.prediction.reset()
+
+        elif msg_type == 'table_list':
+            self.tables = message['tables']
+
+        elif msg_type in ('table_setup', 'seed_commit', 'seed_reveal', 'state_hash'):
+            if self.lockstep:
+                self.lockstep.handle_message(message)
+
+        elif msg_type == 'hello':
+            # A client (re)connected, a known token carries on from the version it says it has
+            if self.is_server:
+                self._resume_session(message, sender)
+
+        elif msg_type == 'session':
+            # Server accepted our hello
+            self.session_token = message['token']
+            self.resync_version = message['version']
+            self._check_recovered()
+
+        elif msg_type == 'connected':
+            # The client's hello decides what state it is sent
+            if self.lockstep:
+                self.lockstep.peer_joined()
+
+        elif msg_type == 'disconnected':
+            # Stop tracking a client that left
+            self.state_sync.forget(sender)
+            self.session_of.pop(sender, None)
+            self.shared_clients.discard(sender)
+
+    def _apply_game_state(self, message):
+        """Apply a full snapshot or delta from the server and acknowledge it"""
+        changes = self.state_sync.apply(message)
+        if changes is None:
+            # We missed a version, ask for a full snapshot
+            self.send_message({'type': 'state_ack', 'version': 0})
+            return
+
+        if self.prediction:
+            self.prediction.reconcile(self.state_sync.state, changes)
+        elif changes:
+            self.game.update_from_network(changes)
+        self.send_message({'type': 'state_ack', 'version': self.state_sync.version})
+        self._check_recovered()
+
+    def _resume_session(self, message, client_socket):
+        """Give a client its session token and whatever state it is missing (server only)"""
+        token = message['token']
+        if token in self.sessions:
+            # Only send what changed since the version it still has (a snapshot if that is too old)
+            self.state_sync.ack(client_socket, message['version'])
+        else:
+            token = os.urandom(16)
+            self.sessions.add(token)
+        self.session_of[client_socket] = token
+
+        self.send_message({'type': 'session', 'token': token, 'version': self.state_sync.version}, client_socket)
+        if message.get('shared') and self.shared_state and self._is_local(client_socket):
+            # Reads its states from shared memory, the socket only carries actions, heartbeats and state_ready
+            self.shared_clients.add(client_socket)
+            self.send_frame(self.state_ready_frame, [client_socket], 'state_ready')
+        else:
+            self._send_state_to(client_socket)
+
+    def _read_shared_state(self):
+        """Apply the newest game state in shared memory if we don't have it yet"""
+        latest = self.shared_state.latest(newer_than=self.state_sync.version)
+        if latest is None:
+            return
+
+        version, state = latest
+        changes = self.state_sync.apply({'type': 'game_state', 'version': version, 'base_version': 0, 'state': state})
+        if self.prediction:
+            self.prediction.reconcile(self.state_sync.state, changes)
+        elif changes:
+            self.game.update_from_network(changes)
+        self._check_recovered()
+
+    def _check_recovered(self):
+        """After a reconnect, note how long it took to get back in sync with the server (client only)"""
+        if self.resumed_at is None or self.resync_version is None:
+            return
+        if self.state_sync.version >= self.resync_version:
+            self.last_recovery_time = time.perf_counter() - self.resumed_at
+            self.resumed_at = None
+            print(f"Reconnected, back in sync after {self.last_recovery_time * 1000:.0f} ms")
+
+    def _on_connect(self, client_socket):
+        """Let the main loop send the new client its snapshot"""
+        self._process_message({'type': 'connected'}, client_socket)
+
+    def _on_disconnect(self, client_socket):
+        """Let the main loop forget the client"""
+        self._process_message({'type': 'disconnected'}, client_socket)
+
+    def _on_connected(self, dropped_at=None):
+        """Say hello with our session token and state version, so a reconnect only needs what we missed"""
+        self.resumed_at = dropped_at
+        self.resync_version = None
+        if dropped_at is not None:
+            self._process_message({'type': 'reconnected'})
+        version = self.state_sync.version if dropped_at is not None else 0
+        self.send_message({'type': 'hello', 'token': self.session_token, 'version': version,
+                           'shared': self.shared_state is not None})
+
     def send_action(self, action, amount=0, player_id=0):
         """Send a player action to the server"""
         message = {
@@ -35,15 +286,126 @@ class PokerNetworkManager(NetworkManager):
             'amount': amount,
             'player_id': player_id
         }
+        if self.prediction and action in GAME_ACTIONS:
+            # Show it now, the server's state will confirm or correct it
+            message['seq'] = self.prediction.predict(action, amount)
         self.send_message(message)
-    
+
+        if self.lockstep:
+            # The other side applies the same action, we only check now and then that we still agree
+            if action in GAME_ACTIONS:
+                self.lockstep.action_applied()
+        elif self.is_server:
+            # The host applied its own action locally, so clients need the new state too
+            self.send_game_state()
+
     def send_game_state(self):
-        """Send the current game state to all clients (server only)"""
-        if not self.is_server:
+        """Send each client whatever changed since the last version it acknowledged (server only)"""
+        if not self.is_server or self.lockstep:
             return
-            
-        message = {
-            'type': 'game_state',
-            'state': self.game.get_network_state()
-        }
-        self.send_message(message)
\ No newline at end of file
+
+        state = self.game.get_network_state()
+        state['action_seq'] = self.action_seq
+        self.state_sync.publish(state)
+        if self.shared_state:
+            self.shared_state.publish(self.state_sync.version, state)
+
+        shared = []
+        for client in list(self.session_of):
+            if client in self.shared_clients:
+                shared.append(client)
+            else:
+                self._send_state_to(client)
+        if shared:
+            self.send_frame(self.state_ready_frame, shared, 'state_ready')
+
+    def list_tables(self):
+        """Ask a table server which tables exist and how full they are"""
+        self.send_message({'type': 'list_tables'})
+
+    def join_table(self, table_id):
+        """Ask a table server for a seat at a table"""
+        self.send_message({'type': 'join', 'table_id': table_id})
+
+    def spectate_table(self, table_id):
+        """Watch a table on a table server (public view, no hole cards)"""
+        self.send_message({'type': 'spectate', 'table_id': table_id})
+
+    def leave_table(self):
+        """Give up our seat on a table server"""
+        self.send_message({'type': 'leave'})
+        self.table_id = None
+        self.seat = None
+        self.spectating = False
+
+    def _send_state_to(self, client_socket):
+        """Send one client the delta (or full snapshot) it needs, encoded once for every client on the same version"""
+        frame = self.state_sync.frame_for(client_socket, self.encode_once)
+        if frame is not None:
+            self.send_frame(frame, [client_socket], 'game_state')
+
+
+    def stop(self):
+        """Stop networking and let go of the shared memory block"""
+        super().stop()
+        if self.shared_state:
+            self.shared_state.close()
+            self.shared_state = None
+
+
+class AsyncPokerNetworkManager(PokerNetworkManager, AsyncNetworkManager):
+    """PokerNetworkManager running on the asyncio backend"""
+    def __init__(self, game, is_server=False, server_ip='127.0.0.1', port=5555):
+        super().__init__(game, is_server, server_ip, port)
+
+        # Messages that arrived while the inbox was full, in order, and the peers we stopped reading
+        # from because of them (event loop only)
+        self.backlog = deque()
+        self.paused = set()
+
+    def _process_message(self, message, sender=None):
+        """Queue a received message for the main loop without ever blocking the event loop (runs on the event loop)"""
+        # When the main loop falls behind, stop reading from this peer so TCP slows it down
+        # (only this thread puts, so the inbox can't fill up between full() and put_nowait)
+        if not self.backlog and not self.inbox.full():
+            self.inbox.put_nowait((message, sender))
+        else:
+            self.backlog.append((message, sender))
+            peer = sender or self.connection
+            if peer is not None:
+                self.paused.add(peer)
+                self._pause_reading(peer)
+
+        if self.on_message:
+            self.on_message()
+
+    def process_messages(self, time_budget_ms=INBOUND_TIME_BUDGET_MS):
+        """Apply queued messages, then have the event loop refill the inbox from the backlog"""
+        handled = super().process_messages(time_budget_ms)
+        if self.backlog:
+            self._call_in_loop(self._refill_inbox)
+        return handled
+
+    def _refill_inbox(self):
+        """Move backlogged messages into the inbox, and read from paused peers again once it has all fit (runs on the event loop)"""
+        moved = 0
+        while self.backlog:
+            try:
+                self.inbox.put_nowait(self.backlog[0])
+            except queue.Full:
+                break
+            self.backlog.popleft()
+            moved += 1
+
+        if not self.backlog:
+            self._resume_reading(self.paused)
+            self.paused.clear()
+        if moved and self.on_message:
+            self.on_message()
+
+
+def create_network_manager(game, is_server=False, server_ip='127.0.0.1', port=5555, backend=NETWORK_BACKEND):
+    """Make a poker network manager using the configured backend"""
+    if backend == 'asyncio':
+        return AsyncPokerNetworkManager(game, is_server, server_ip, port)
+    return PokerNetworkManager(game, is_server, server_ip, port)
@@ -0,0 +1,539 @@
+"""poker_table.py - The rules of a heads-up table, with no pygame so servers and simulations can run it"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+from config import *
+from deck import Deck
+from board import Board
+from player import Player
+from hand_evaluator import HandEvaluator
+from game_over_handler import GameOverHandler
+from chip_ledger import ChipLedger, POT
+from player_stats import PlayerStatsTracker
+
+# Standard rule: Maximum of 3 or 4 total bets (initial bet + 3 raises)
+MAX_RAISES = 3  # Most common house rule
+
+# Betting rounds, the only states where a player can act
+BETTING_STATES = (STATE_PREFLOP, STATE_FLOP, STATE_TURN, STATE_RIVER)
+
+class PokerTable:
+    def __init__(self):
+        """initialization"""
+        # making players
+        self.player1 = Player(1)
+        self.player2 = Player(2)
+        self.community_cards = Board()  # has a "hand" like a player, always face up
+
+        # pot
+        self.pot = 0
+
+        # initialize hand evaluator
+        self.hand_evaluator = HandEvaluator()
+
+        # Initialize game over handler
+        self.game_over_handler = GameOverHandler()
+
+        # Every chip that moves is recorded, and each hand is checked to add up when it ends
+        self.ledger = ChipLedger() if CHIP_LEDGER else None
+        self.game_over_handler.ledger = self.ledger
+
+        # Running stats for each player, updated with every action
+        self.player_stats = PlayerStatsTracker() if PLAYER_STATS else None
+
+        # Hand history columns are only written when a simulation sets a HandHistoryWriter here
+        self.hand_history = None
+
+        # Add status message display
+        self.status_message = ""
+
+        # blinds
+        self.small_blind = 0
+        self.big_blind = 0
+
+        # Set initial dealer and big blind
+        #this is opposite since in self.reset() we call switch dealer which changes it
+        self.current_player = self.player2
+        self.current_dealer = self.player2
+        self.current_bigblind = self.player1
+
+        self.game_state = STATE_PREFLOP
+        self.winner = None
+        self.deck = Deck()
+
+    def set_small_blind(self, small_blind):
+        """Set the small blind, the big blind is twice that"""
+        self.small_blind = small_blind
+        self.big_blind = small_blind * 2
+
+    def on_new_hand(self):
+        """Called at the start of every hand - games override this to play music"""
+
+    def on_chips_moved(self):
+        """Called when chips go into the pot - games override this to play a sound"""
+
+    def handle_remote_action(self, action, amount=0, player_id=None):
+        """Process actions received from the network"""
+        action_map = {
+            'fold': self.handle_fold,
+            'call': self.handle_call,
+            'raise': lambda: self.handle_raise(amount),
+            'check': self.handle_check
+        }
+
+        if action in action_map:
+            action_map[action]()
+
+    def validate_action(self, seat, action, amount=0):
+        """returns None if the player in seat (0 = player 1) may take this action now, otherwise why not
+
+        Servers check every action with this before applying it, clients can use it to
+        explain a refused click without waiting for the server.
+        """
+        if self.game_state not in BETTING_STATES:
+            return "The hand is over"
+        if seat != (0 if self.current_player == self.player1 else 1):
+            return "It is not your turn"
+
+        player = self.current_player
+        other_player = self.player2 if player == self.player1 else self.player1
+
+        if action == 'fold':
+            return None
+
+        if action == 'check':
+            if player.current_bet != other_player.current_bet:
+                return "Cannot check when there's an active bet"
+            return None
+
+        if action == 'call':
+            if other_player.current_bet <= player.current_bet:
+                return "There is nothing to call"
+            return None
+
+        if action == 'raise':
+            # Same limits as handle_raise
+            if getattr(self, 'raise_count', 0) >= MAX_RAISES:
+                return "Maximum raises reached in this betting round."
+            max_possible_raise = other_player.balance + other_player.current_bet if other_player.is_all_in else player.balance + player.current_bet
+            if amount <= other_player.current_bet:
+                return f"Raise must be higher than ${other_player.current_bet}"
+            if amount > max_possible_raise:
+                return f"Insufficient funds. Max raise is ${max_possible_raise}"
+            return None
+
+        return f"Unknown action: {action}"
+
+    def get_network_state(self, seat=None):
+        """Serialize game state for network transmission
+
+        With a seat (0 = player 1) the state includes that player's own hole cards,
+        without one it is the public view that spectators get.
+        """
+        state = {
+            'pot': self.pot,
+            'game_state': self.game_state,
+            'player1_balance': self.player1.balance,
+            'player2_balance': self.player2.balance,
+            'player1_bet': self.player1.current_bet,
+            'player2_bet': self.player2.current_bet,
+            'current_player_id': 0 if self.current_player == self.player1 else 1,
+            'raise_count': getattr(self, 'raise_count', 0),
+            'community_cards': [card.card_id() for card in self.community_cards.hand.cards]
+        }
+        if seat is not None:
+            player = self.player1 if seat == 0 else self.player2
+            state['hole_cards'] = [card.card_id() for card in player.hand.cards]
+        return state
+
+    def reset_game(self, seed=None):
+        """Reset the game to its initial state (a seed deals the same cards every time)"""
+        # let the game restart its music etc.
+        self.on_new_hand()
+
+        #setup deck (the same deck every hand, refilled)
+        self.deck.reset(seed)
+        self.deck.shuffle()
+
+        # Reset players
+        self.player1.reset_for_new_hand()
+        self.player2.reset_for_new_hand()
+        self.community_cards.reset_for_new_hand()
+
+        # switching dealers after each round
+        self.switch_dealer()
+
+        # Check if players can afford blinds
+        if self.current_dealer.balance < self.small_blind or self.current_bigblind.balance < self.big_blind:
+            # Game over due to insufficient funds
+            if self.current_dealer.balance < self.small_blind:
+                self.status_message = "GAME OVER - Dealer cannot afford small blind! Press ESC to exit"
+                self.game_state = STATE_LOST
+            else:
+                self.status_message = "GAME OVER - Big Blind cannot afford big blind! Press ESC to exit"
+                self.game_state = STATE_LOST
+            return
+
+        # Reset pot
+        self.pot = 0
+        if self.ledger:
+            self.ledger.open_hand(self.player1.balance, self.player2.balance)
+        if self.player_stats:
+            self.player_stats.new_hand(self.current_dealer.id, self.current_bigblind.id)
+        if self.hand_history:
+            self.hand_history.new_hand(seed, self.current_dealer.id)
+
+        # Clear status message
+        self.status_message = ""
+
+        # Deal initial cards
+        self.player1.hand.add_card(self.deck.deal())
+        self.player1.hand.add_card(self.deck.deal())
+        self.player2.hand.add_card(self.deck.deal())
+        self.player2.hand.add_card(self.deck.deal())
+
+        # Set initial game state
+        self.game_state = STATE_PREFLOP
+
+        # Put blinds in for the new hand
+        self.put_blinds_in()
+
+        # First to act in preflop is the dealer (small blind)
+        self.current_player = self.current_dealer
+
+
+    def put_blinds_in(self):
+        """Put blinds in, calculate for bet and pot"""
+
+        # Deduct small blind from dealer
+        self.current_dealer.balance -= self.small_blind
+        self.current_dealer.current_bet = self.small_blind
+
+        # Deduct big blind from big blind player
+        self.current_bigblind.balance -= self.big_blind
+        self.current_bigblind.current_bet = self.big_blind
+
+        # Update pot with blinds
+        self.pot = self.small_blind + self.big_blind
+        self.move_chips(self.current_dealer, self.small_blind)
+        self.move_chips(self.current_bigblind, self.big_blind)
+
+        # First to act in preflop is the dealer (small blind) (just to be safe)
+        self.current_player = self.current_dealer
+
+
+    def handle_fold(self):
+        """Handles what happens when a player folds"""
+        self.record_action('fold')
+        self.current_player.is_folded = True
+
+        other_player = self.player2 if self.current_player == self.player1 else self.player1
+        # Use the game over handler to determine winner
+        winner, message = self.game_over_handler.handle_fold(self.current_player, other_player, self.pot)
+
+        # Update pot and display message
+        paid = self.pot
+        self.pot = 0
+        self.status_message = message
+        self.close_hand(paid, winner)
+
+        # Set game state to game over
+        self.game_state = STATE_GAME_OVER
+        self.winner = winner
+
+
+    def handle_call(self):
+        """Handle when a player calls"""
+        # Hide both players' cards first
+        self.player1.cards_visible = False
+        self.player2.cards_visible = False
+
+        #play poker chip sound
+        self.on_chips_moved()
+
+        other_player = self.player2 if self.current_player == self.player1 else self.player1
+        call_amount = other_player.current_bet - self.current_player.current_bet
+
+        if call_amount > 0:
+
+            # Check if player has enough money to call
+            if call_amount > self.current_player.balance:
+                # Handle all in situation
+                call_amount = self.current_player.balance
+                self.current_player.is_all_in = True
+                self.status_message = f"Player {1 if self.current_player == self.player1 else 2} is ALL IN!"
+
+            # Add the call amount to the pot
+            self.record_action('call', call_amount)
+            self.pot += call_amount
+            self.move_chips(self.current_player, call_amount)
+            self.current_player.place_bet(other_player.current_bet)
+
+            # Check if BOTH players are now all-in
+            if self.player1.is_all_in and self.player2.is_all_in:
+                # Deal all remaining community cards
+                while len(self.community_cards.hand.cards) < 5:
+                    self.community_cards.hand.add_card(self.deck.deal())
+
+                # Go directly to showdown
+                self.game_state = STATE_SHOWDOWN
+                self.handle_showdown()
+                return
+
+            # Special handling for preflop
+            if self.game_state == STATE_PREFLOP:
+                # If current player is the dealer (small blind), switch to big blind
+                if self.current_player == self.current_dealer:
+                    self.current_player = self.current_bigblind
+                    return
+
+            # Check if both players have acted and bets are equal, or if someone is all-in
+            if (self.player1.current_bet == self.player2.current_bet) or \
+                    self.player1.is_all_in or self.player2.is_all_in:
+                # Both players have acted and bets are equal, advance to next phase
+                self.advance_game_state()
+            else:
+                # Switch to the other player's turn
+                self.switch_turn()
+
+
+    def handle_check(self):
+        """Handle when a player checks"""
+        # Only allow check if current bets are equal
+        if self.player1.current_bet == self.player2.current_bet:
+            self.record_action('check')
+
+            # Switch to the other player
+            self.switch_turn()
+
+            # In preflop, if big blind checks and it's now the dealer's turn, advance to flop
+            if self.game_state == STATE_PREFLOP and self.current_player == self.current_dealer:
+                # Explicitly deal flop and change game state
+                self.flop()
+                self.game_state = STATE_FLOP
+                # Big blind acts first after the flop
+                self.current_player = self.current_bigblind
+                # Reset bets
+                self.player1.current_bet = 0
+                self.player2.current_bet = 0
+                return
+
+            # Check if we've returned to the original starting player in other rounds
+            if self.current_player == (
+                    self.current_dealer if self.game_state == STATE_PREFLOP else self.current_bigblind
+            ):
+                # Advance to next game state
+                self.advance_game_state()
+
+        else:
+            # Show error or prevent checking
+            self.status_message = "Cannot check when there's an active bet"
+            print("Cannot check when there's an active bet")
+
+
+    def handle_raise(self, amount):
+        """Handle when a player raises to a specific amount"""
+
+        self.on_chips_moved()
+
+        other_player = self.player2 if self.current_player == self.player1 else self.player1
+
+        # Track the number of raises in the current betting round
+        if not hasattr(self, 'raise_count'):
+            self.raise_count = 0
+
+        # Check if maximum raises have been reached
+        if self.raise_count >= MAX_RAISES:
+            # Set status message for max raises
+            self.status_message = "Maximum raises reached in this betting round."
+            return False
+
+        # Determine the maximum possible raise based on all-in status
+        max_possible_raise = other_player.balance + other_player.current_bet if other_player.is_all_in else self.current_player.balance + self.current_player.current_bet
+
+        # Calculate the amount to add to the pot
+        pot_addition = amount - self.current_player.current_bet
+
+        # Validate the raise amount with specific error messages
+        if amount <= other_player.current_bet:
+            # Raise must be higher than current bet
+            self.status_message = f"Raise must be higher than ${other_player.current_bet}"
+            return False
+
+        if amount > max_possible_raise:
+            # Not enough balance for the raise
+            self.status_message = f"Insufficient funds. Max raise is ${max_possible_raise}"
+            return False
+
+        # Check if this is an all-in
+        if amount >= self.current_player.balance + self.current_player.current_bet:
+            amount = self.current_player.balance + self.current_player.current_bet
+            self.current_player.is_all_in = True
+            self.status_message = f"Player {1 if self.current_player == self.player1 else 2} is ALL IN!"
+
+        # Add to pot and update player's bet
+        self.record_action('raise', amount)
+        self.pot += pot_addition
+        self.move_chips(self.current_player, pot_addition)
+        result = self.current_player.place_bet(amount)
+
+        # Increment raise count
+        self.raise_count += 1
+
+        # Switch to the other player's turn
+        self.switch_turn()
+        return True
+
+
+    def handle_showdown(self):
+        """Handle the showdown at the end of the hand"""
+        # Make all cards visible for showdown
+        self.player1.cards_visible = True
+        self.player2.cards_visible = True
+
+        # Use the game over handler to determine winner
+        winner, message = self.game_over_handler.handle_showdown(
+            self.player1, self.player2, self.community_cards, self.pot
+        )
+
+        # Update game state
+        paid = self.pot
+        self.pot = 0
+        self.close_hand(paid, winner, showdown=True)
+        if self.player_stats:
+            self.player_stats.showdown(winner.id if winner else None)
+
+        # Modify the message to include the specific player
+        if winner == self.player1:
+            self.status_message = "Player 1 " + message
+        elif winner == self.player2:
+            self.status_message = "Player 2 " + message
+        else:
+            self.status_message = message
+
+        # Check if either player is out of money
+        if self.player1.balance <= 0 or self.player2.balance <= 0:
+            # Game over due to bankruptcy
+            if self.player1.balance <= 0:
+                self.status_message = "GAME OVER - Player 2 Wins! Press ESC to exit"
+                self.game_state = STATE_LOST
+            else:
+                self.status_message = "GAME OVER - Player 1 Wins! Press ESC to exit"
+                self.game_state = STATE_LOST
+        else:
+            self.game_state = STATE_GAME_OVER
+
+        self.winner = winner
+
+
+    def record_action(self, action, amount=0):
+        """Count an action the current player is taking in their stats (and the hand history)"""
+        if self.player_stats:
+            self.player_stats.action(self.current_player.id, action, self.game_state)
+        if self.hand_history:
+            self.hand_history.action(self.game_state, action, amount)
+
+    def move_chips(self, player, amount):
+        """Record chips a player put in the pot"""
+        if self.ledger:
+            self.ledger.transfer(player.id, POT, amount)
+
+    def close_hand(self, paid, winner, showdown=False):
+        """The pot has been paid out: check the hand's chips add up and finish its history (winner None = split)"""
+        if self.hand_history:
+            categories = self.game_over_handler.last_categories if showdown else None
+            self.hand_history.end_hand(self.player1, self.player2, self.community_cards, paid,
+                                       winner.id if winner else 0, categories)
+        if self.ledger:
+            problem = self.ledger.close_hand(self.player1.balance, self.player2.balance, self.pot)
+            if problem:
+                print(f"Chip ledger: hand {self.ledger.closed} doesn't add up: {problem}")
+
+
+    def advance_game_state(self):
+        """Move to the next phase of the game"""
+        # Reset raise count when moving to a new betting round
+        if hasattr(self, 'raise_count'):
+            del self.raise_count
+
+        # Check if both players are all-in or one player is all-in
+        if (self.player1.is_all_in and self.player2.current_bet == self.player1.current_bet) or (self.player2.is_all_in and self.player1.current_bet == self.player2.current_bet):
+            # Deal all remaining community cards at once
+            while len(self.community_cards.hand.cards) < 5:
+                self.community_cards.hand.add_card(self.deck.deal())
+
+            # Skip to showdown
+            self.game_state = STATE_SHOWDOWN
+            self.handle_showdown()
+            return
+
+        # Reset bets for the new round
+        self.player1.current_bet = 0
+        self.player2.current_bet = 0
+
+        if self.game_state == STATE_PREFLOP:
+            # Deal the flop
+            self.flop()
+            self.game_state = STATE_FLOP
+            # Big blind acts first after the flop
+            self.current_player = self.current_bigblind
+
+        elif self.game_state == STATE_FLOP:
+            # Deal the turn
+            self.turn()
+            self.game_state = STATE_TURN
+            # Big blind acts first
+            self.current_player = self.current_bigblind
+
+        elif self.game_state == STATE_TURN:
+            # Deal the river
+            self.river()
+            self.game_state = STATE_RIVER
+            # Big blind acts first
+            self.current_player = self.current_bigblind
+
+        elif self.game_state == STATE_RIVER:
+            # Go to showdown
+            self.game_state = STATE_SHOWDOWN
+            self.handle_showdown()
+
+
+    def flop(self):
+        """Deal 3 cards for flop"""
+        self.community_cards.hand.add_card(self.deck.deal())
+        self.community_cards.hand.add_card(self.deck.deal())
+        self.community_cards.hand.add_card(self.deck.deal())
+
+
+    def turn(self):
+        """Deal 1 card for turn"""
+        self.community_cards.hand.add_card(self.deck.deal())
+
+
+    def river(self):
+        """Deal 1 card for river"""
+        self.community_cards.hand.add_card(self.deck.deal())
+
+
+    def switch_turn(self):
+        """Switch to the other player's turn"""
+        self.current_player.cards_visible = False  # hide cards first
+
+        # Clear the status message when switching turns
+        self.status_message = ""
+
+        if self.current_player == self.player1:
+            self.current_player = self.player2
+        else:
+            self.current_player = self.player1
+
+
+    def switch_dealer(self):
+        """Switch the dealer to the other player"""
+
+        if self.current_dealer == self.player1:
+            self.current_dealer = self.player2
+            self.current_bigblind = self.player1
+        else:
+            self.current_dealer = self.player1
+            self.current_bigblind = self.player2
@@ -0,0 +1,130 @@
+"""prediction.py - Show our own actions right away, then line the table back up with the server's state
+
+Each action we send gets a sequence number and is applied to the local table at once,
+so the click shows on the next frame. The server's state says which of our actions it
+has handled; when it arrives the table goes back to that state and the actions the
+server hasn't answered yet are played again on top of it.
+
+Actions that end a betting round (or the hand) are not predicted: the cards that come
+next are only known to the server, so the table waits for it and input is blocked.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import time
+from collections import deque
+
+from deck import Deck
+from net_metrics import Histogram
+
+
+def _silent():
+    """Stands in for the game's chip sound during a replay"""
+
+
+class PendingAction:
+    """One of our actions the server hasn't answered yet"""
+    def __init__(self, seq, action, amount, predicted):
+        """Initialization"""
+        self.seq = seq
+        self.action = action
+        self.amount = amount
+        self.predicted = predicted  # Table state we showed after it, None if it wasn't predicted
+        self.sent_at = time.perf_counter()
+
+
+class ActionPredictor:
+    """Optimistic local actions and reconciliation for a client (lives on the PokerNetworkManager)"""
+    def __init__(self, network_manager, game):
+        """Initialization"""
+        self.network_manager = network_manager
+        self.game = game
+        self.seq = 0
+        self.pending = deque()
+
+        # How it is going: predicted actions, ones the server saw differently, and round trips
+        self.predicted = 0
+        self.mispredicted = 0
+        self.confirm_time = Histogram()
+
+    def predict(self, action, amount=0):
+        """Apply one of our actions to the local table right away, returns its sequence number"""
+        self.seq += 1
+        round_before = self.game.game_state
+        self.game.handle_remote_action(action, amount)
+
+        if self.game.game_state == round_before:
+            self.predicted += 1
+            self.pending.append(PendingAction(self.seq, action, amount, self._view()))
+        else:
+            # It ended the round: wait for the server's cards instead of showing ones we made up
+            self.pending.append(PendingAction(self.seq, action, amount, None))
+            self._rebuild()
+        return self.seq
+
+    def waiting(self):
+        """returns True while an action we couldn't predict is unanswered (the table is not ours to click)"""
+        return any(pending.predicted is None for pending in self.pending)
+
+    def reconcile(self, state, changes):
+        """Apply a state from the server: state is the whole authoritative state, changes what is new in it"""
+        if not changes:
+            return
+
+        # Drop the actions the server has handled, noting any it saw differently
+        acked = state.get('action_seq', 0)
+        predicted_before = bool(self.pending)
+        while self.pending and self.pending[0].seq <= acked:
+            pending = self.pending.popleft()
+            self.confirm_time.add(time.perf_counter() - pending.sent_at)
+            if pending.predicted is not None and pending.seq == acked and \
+                    any(state.get(key) != value for key, value in pending.predicted.items()):
+                # Refused, or the other player acted before the server answered
+                self.mispredicted += 1
+
+        if predicted_before:
+            self._rebuild()
+        else:
+            self.game.update_from_network(changes)
+
+    def reset(self):
+        """Forget every unanswered action (new table, or a reconnect the server may have missed them in)"""
+        self.pending.clear()
+
+    def _rebuild(self):
+        """Go back to the server's state, then play our unanswered actions on top of it again"""
+        # Replayed actions already played their chip sound the first time round
+        self.game.on_chips_moved = _silent
+        try:
+            while not self._replay():
+                pass
+        finally:
+            del self.game.on_chips_moved
+
+    def _replay(self):
+        """One go at a rebuild, returns False if a replayed action ended the round and it has to start over
+
+        The server's state may have moved on since the action was predicted, so an action
+        can end the round on replay: it isn't predicted any more (the server deals the next
+        cards), and the table goes back to the server's state without it.
+        """
+        state = self.network_manager.state_sync.state
+        if state:
+            # Includes the raises already made this round, so MAX_RAISES holds for our predictions too
+            self.game.update_from_network(dict(state))
+
+        # Predictions never use the real deck (only the server has it)
+        self.game.deck = Deck()
+        for pending in self.pending:
+            if pending.predicted is None:
+                continue
+            round_before = self.game.game_state
+            self.game.handle_remote_action(pending.action, pending.amount)
+            if self.game.game_state != round_before:
+                pending.predicted = None
+                return not state  # With no server state yet there is nothing to go back to
+        return True
+
+    def _view(self):
+        """The part of the table the server also sends"""
+        return self.game.get_network_state()
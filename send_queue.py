@@ -0,0 +1,137 @@
+"""send_queue.py - Per-connection outbound queue that keeps a slow peer from holding up everyone else"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import time
+import threading
+from collections import deque
+
+from config import *
+
+
+class SendQueue:
+    """Frames waiting to go out on one connection (safe to share between threads)"""
+    def __init__(self, max_bytes=SEND_QUEUE_MAX_BYTES, high_water=SEND_QUEUE_HIGH_WATER):
+        """Initialization"""
+        self.max_bytes = max_bytes
+        self.high_water = high_water
+        self.lock = threading.Condition()
+        self.closed = False
+
+        # Queued [key, data] entries, and the entry for each coalescing key still waiting
+        self.entries = deque()
+        self.pending = {}
+        self.depth = 0  # Frames still to send (entries also holds replaced ones)
+        self.bytes = 0
+        self.high_water_since = None  # When the queue went over the high-water mark
+
+        # Counters
+        self.sent_messages = 0
+        self.sent_bytes = 0
+        self.coalesced = 0  # Replaced by a newer message with the same key before being sent
+        self.dropped = 0  # Refused because the queue was full
+        self.peak_bytes = 0
+
+    def push(self, data, key=None):
+        """Queue a frame, returns False if it was dropped
+
+        A frame with a key replaces a queued frame with the same key, so the peer
+        only gets the newest one (e.g. the latest game state). The new frame still
+        goes to the back, so it never overtakes messages sent before it.
+        """
+        with self.lock:
+            if self.closed:
+                return False
+
+            old = self.pending.pop(key, None) if key is not None else None
+            freed = len(old[1]) if old else 0
+            if self.bytes - freed + len(data) > self.max_bytes:
+                if old:
+                    self.pending[key] = old
+                self.dropped += 1
+                return False
+
+            if old:
+                # Leave the old entry in place but empty, pop skips it
+                old[1] = None
+                self.bytes -= freed
+                self.depth -= 1
+                self.coalesced += 1
+
+            entry = [key, data]
+            self.entries.append(entry)
+            if key is not None:
+                self.pending[key] = entry
+            self.bytes += len(data)
+            self.depth += 1
+            self.peak_bytes = max(self.peak_bytes, self.bytes)
+
+            self.lock.notify()
+            return True
+
+    def pop(self):
+        """Take the next frame, or None if the queue is empty"""
+        with self.lock:
+            return self._pop()
+
+    def wait_pop(self, timeout=None):
+        """Wait for the next frame, returns None on timeout or once the queue is closed"""
+        with self.lock:
+            if not self.depth and not self.closed:
+                self.lock.wait(timeout)
+            return self._pop()
+
+    def _pop(self):
+        """Take the next frame (lock held)"""
+        while self.entries and not self.closed:
+            key, data = self.entries.popleft()
+            if data is None:
+                continue  # Replaced by a newer frame
+
+            if key is not None:
+                del self.pending[key]
+            self.bytes -= len(data)
+            self.depth -= 1
+            return data
+        return None
+
+    def sent(self, size):
+        """Count a frame that went out"""
+        with self.lock:
+            self.sent_messages += 1
+            self.sent_bytes += size
+
+    def stalled(self, timeout=SEND_STALL_TIMEOUT):
+        """returns True if the queue has stayed over the high-water mark for longer than timeout"""
+        with self.lock:
+            if self.bytes <= self.high_water:
+                self.high_water_since = None
+                return False
+
+            now = time.monotonic()
+            if self.high_water_since is None:
+                self.high_water_since = now
+            return now - self.high_water_since > timeout
+
+    def close(self):
+        """Throw away anything queued and wake up a waiting writer"""
+        with self.lock:
+            self.closed = True
+            self.entries.clear()
+            self.pending.clear()
+            self.depth = 0
+            self.bytes = 0
+            self.lock.notify_all()
+
+    def stats(self):
+        """Queue depth and counters"""
+        with self.lock:
+            return {
+                'depth': self.depth,
+                'bytes': self.bytes,
+                'peak_bytes': self.peak_bytes,
+                'sent_messages': self.sent_messages,
+                'sent_bytes': self.sent_bytes,
+                'coalesced': self.coalesced,
+                'dropped': self.dropped,
+            }
@@ -0,0 +1,98 @@
+"""shared_state.py - Ring buffer of game state snapshots in shared memory, for clients on the same machine as the host
+
+The host writes each new state into the next slot and bumps the latest version in the
+header; a reader copies the newest slot straight out of memory, no socket in between.
+States use the same compact binary layout as the network messages (message_codec),
+never pickle.
+
+Layout: header (latest version), then SHARED_STATE_SLOTS slots of
+(sequence, length, data). A slot's sequence is odd while the host is writing it,
+and 2 * version once it is complete, so a reader can tell a torn copy and retry.
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import struct
+from multiprocessing import shared_memory, resource_tracker
+
+from config import *
+from message_codec import CodecError, encode_state, decode_state
+
+HEADER = struct.Struct('!Q')  # latest version
+SLOT_HEADER = struct.Struct('!QI')  # sequence, length of the data that follows
+READ_RETRIES = 8  # Torn copies (the host lapped the reader) before giving up until the next call
+
+_created = set()  # Blocks this process created (a host and a client can share a process in tests)
+
+
+class SharedStateRing:
+    """Latest game states in a named shared memory block, written by the host and read by local clients"""
+    def __init__(self, name, create=False, slots=SHARED_STATE_SLOTS, slot_size=SHARED_STATE_SLOT_SIZE):
+        """Create the block (host) or attach to an existing one (client)"""
+        self.slots = slots
+        self.slot_size = slot_size
+        self.stride = SLOT_HEADER.size + slot_size
+        self.owner = create
+
+        if create:
+            size = HEADER.size + slots * self.stride
+            try:
+                self.memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # Left behind by a host that crashed
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+                self.memory = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self.memory.buf[:size] = bytes(size)
+            _created.add(self.memory.name)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            # Only the host may remove the block, don't let this process's tracker unlink it at exit
+            if self.memory.name not in _created:
+                resource_tracker.unregister(self.memory._name, 'shared_memory')
+            self.slots = (self.memory.size - HEADER.size) // self.stride
+
+    def publish(self, version, state):
+        """Write a full snapshot for a version (host only)"""
+        data = encode_state(version, 0, state)
+        if len(data) > self.slot_size:
+            raise CodecError(f"State is {len(data)} bytes, shared state slots hold {self.slot_size}")
+
+        buf = self.memory.buf
+        offset = HEADER.size + (version % self.slots) * self.stride
+        SLOT_HEADER.pack_into(buf, offset, 2 * version - 1, len(data))
+        start = offset + SLOT_HEADER.size
+        buf[start:start + len(data)] = data
+        SLOT_HEADER.pack_into(buf, offset, 2 * version, len(data))
+        HEADER.pack_into(buf, 0, version)
+
+    def version(self):
+        """Latest version the host has written (0 = nothing yet)"""
+        return HEADER.unpack_from(self.memory.buf, 0)[0]
+
+    def latest(self, newer_than=0):
+        """Returns (version, state) for the newest snapshot, or None if there is nothing newer than newer_than"""
+        buf = self.memory.buf
+        for _ in range(READ_RETRIES):
+            version = HEADER.unpack_from(buf, 0)[0]
+            if version <= newer_than:
+                return None
+
+            offset = HEADER.size + (version % self.slots) * self.stride
+            sequence, length = SLOT_HEADER.unpack_from(buf, offset)
+            start = offset + SLOT_HEADER.size
+            data = bytes(buf[start:start + length])
+
+            # Still the same complete version after the copy: it is not torn
+            if sequence == 2 * version and SLOT_HEADER.unpack_from(buf, offset)[0] == sequence:
+                _, _, state = decode_state(data, 0)
+                return version, state
+        return None
+
+    def close(self):
+        """Detach, and remove the block if we created it"""
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+            _created.discard(self.memory.name)
@@ -6,36 +6,53 @@ import pygame
 
 class SoundManager:
     """Manages your sounds"""
-    def __init__(self):
+    def __init__(self, asset_loader):
         """initialization"""
         # Initialize pygame mixer
         pygame.mixer.init()
 
-        # Load sounds (make sure to have these sound files in a 'sounds' folder)
-        try:
-            self.game_finished_sound = pygame.mixer.Sound("sounds/game_finished.wav")
-            self.poker_chip_sound = pygame.mixer.Sound("sounds/poker_chip.wav")
+        # Sounds are decoded in the background (make sure to have these sound files in a 'sounds' folder)
+        self.asset_loader = asset_loader
+        self.asset_loader.load_sound('game_finished', "sounds/game_finished.wav")
+        self.asset_loader.load_sound('poker_chip', "sounds/poker_chip.wav", volume=0.1)
 
-            # Background music
-            self.bg_music = pygame.mixer.Sound('sounds/bg_music.wav')
+        # Background music
+        self.asset_loader.load_sound('bg_music', 'sounds/bg_music.wav', volume=0.3)
+        self.bg_music_wanted = False  # Music was asked for (it starts as soon as it loads if it wasn't ready)
 
-        except Exception as e:
-            print(f"Error loading sounds: {e}")
+        # Sounds already reported as skipped because they were still loading
+        self.skipped = set()
 
     def play_game_finished(self):
         """plays woo! sound"""
-        self.game_finished_sound.play()
+        self._play('game_finished')
 
     def play_poker_chip(self):
         """plays chips sound"""
-        self.poker_chip_sound.play()
-        self.poker_chip_sound.set_volume(0.1)
+        self._play('poker_chip')
 
     def play_bg_music(self):
-        """plays video game background music"""
-        self.bg_music.play(loops=-1) #play forever
-        self.bg_music.set_volume(0.3)
+        """plays video game background music (or as soon as it has loaded)"""
+        self.bg_music_wanted = True
+        self._play('bg_music', loops=-1) #play forever
 
     def stop_bg_music(self):
         """stops video game background music"""
-        self.bg_music.stop()
\ No newline at end of file
+        self.bg_music_wanted = False
+        bg_music = self.asset_loader.get_sound('bg_music')
+        if bg_music is not None:
+            bg_music.stop()
+
+    def on_asset_loaded(self, name):
+        """Called for every ASSET_LOADED_EVENT: starts the music if it was asked for while it was loading"""
+        if name == 'bg_music' and self.bg_music_wanted:
+            self._play('bg_music', loops=-1)
+
+    def _play(self, name, loops=0):
+        """plays a sound, skipping it if it hasn't finished loading yet"""
+        sound = self.asset_loader.get_sound(name)
+        if sound is not None:
+            sound.play(loops=loops)
+        elif name not in self.skipped:
+            self.skipped.add(name)
+            print(f"Sound {name} isn't loaded yet, skipped")
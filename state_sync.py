@@ -0,0 +1,140 @@
+"""state_sync.py - Versioned game state sync that only sends what changed"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+from collections import OrderedDict
+
+from config import *
+
+# Every field of the network game state, in the order the codec writes them (card lists last)
+STATE_FIELDS = [
+    'pot',
+    'game_state',
+    'player1_balance',
+    'player2_balance',
+    'player1_bet',
+    'player2_bet',
+    'current_player_id',
+    'raise_count',  # Raises so far this betting round (MAX_RAISES)
+    'action_seq',  # Last of our own actions the server has handled (seated views on a table server)
+    'hole_cards',  # Only in a seated player's own view
+    'community_cards',
+]
+
+
+class StateSyncServer:
+    """Keeps recent state versions and works out what each client is missing"""
+    def __init__(self, history=STATE_HISTORY):
+        """Initialization"""
+        self.version = 0
+        self.history = history
+        self.snapshots = OrderedDict()  # version -> full state
+        self.changed = {}  # version -> fields that changed from the version before
+        self.acked = {}  # client -> last version the client acknowledged (0 = has nothing)
+        self.frames = {}  # base version -> encoded message for the current version, shared by every client on that base
+
+    def publish(self, state):
+        """Record a new state, returns True if anything changed"""
+        previous = self.snapshots[self.version] if self.snapshots else {}
+        if previous == state:
+            return False
+
+        self.version += 1
+        self.snapshots[self.version] = dict(state)
+        self.changed[self.version] = {key for key, value in state.items() if previous.get(key) != value}
+        self.frames.clear()
+
+        # Only keep recent versions, older clients get a full snapshot
+        while len(self.snapshots) > self.history:
+            version, _ = self.snapshots.popitem(last=False)
+            del self.changed[version]
+        return True
+
+    def message_for(self, client):
+        """Build the state message for a client, or None if it is already up to date"""
+        base = self._base_for(client)
+        if base is None:
+            return None
+        return self._message_from(base)
+
+    def frame_for(self, client, encode):
+        """Like message_for, but encoded with encode(message) only once per base version
+
+        Every client on the same base gets the same encoded buffer, so a broadcast
+        costs one encode per distinct base instead of one per client.
+        """
+        base = self._base_for(client)
+        if base is None:
+            return None
+
+        frame = self.frames.get(base)
+        if frame is None:
+            frame = self.frames[base] = encode(self._message_from(base))
+        return frame
+
+    def _base_for(self, client):
+        """Version a client's delta is built on (0 = full snapshot), or None if it is up to date"""
+        if self.version == 0:
+            return None
+
+        base = self.acked.get(client, 0)
+        if base == self.version:
+            return None
+
+        # Client has nothing yet, or its version is too old: send everything
+        return base if base in self.snapshots else 0
+
+    def _message_from(self, base):
+        """State message taking a client from base to the current version"""
+        latest = self.snapshots[self.version]
+        if base:
+            # Every field that changed in any version after base, even if it has changed back since:
+            # the client may already be on a newer version than the one it acknowledged
+            fields = set()
+            for version in range(base + 1, self.version + 1):
+                fields |= self.changed[version]
+            changed = {key: latest[key] for key in fields if key in latest}
+        else:
+            changed = dict(latest)
+
+        return {'type': 'game_state', 'version': self.version, 'base_version': base, 'state': changed}
+
+    def ack(self, client, version):
+        """A client confirmed it has a version (0 means it wants a full snapshot)"""
+        if version == 0 or version > self.version:
+            self.acked[client] = 0
+        else:
+            self.acked[client] = max(self.acked.get(client, 0), version)
+
+    def forget(self, client):
+        """Drop a disconnected client"""
+        self.acked.pop(client, None)
+
+
+class StateSyncClient:
+    """Applies full snapshots and deltas, and notices when one was missed"""
+    def __init__(self):
+        """Initialization"""
+        self.version = 0
+        self.state = {}
+
+    def apply(self, message):
+        """Apply a state message, returns the changed fields or None if a resync is needed"""
+        version = message['version']
+        base = message['base_version']
+
+        if base == 0:
+            # Full snapshot, replaces whatever we had
+            self.state = dict(message['state'])
+        elif base <= self.version < version:
+            # The delta holds every field that changed after base, so it also covers newer versions we have
+            self.state.update(message['state'])
+        elif version <= self.version:
+            # Old news (arrived after a newer message)
+            return {}
+        else:
+            # We missed the version this delta is built on
+            return None
+
+        self.version = version
+        return message['state']
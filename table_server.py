@@ -0,0 +1,444 @@
+"""table_server.py - One server that runs many poker tables over a single listening port
+
+Run with: python table_server.py [port] [tables] [stats port]
+"""
+__version__ = '05/22/2025'
+__author__ = 'Kayla Cao'
+
+import os
+import sys
+import time
+import asyncio
+from collections import deque
+
+from config import *
+from async_network_manager import AsyncNetworkManager
+from message_codec import encode_message, decode_message
+from poker_table import PokerTable
+from state_sync import StateSyncServer
+
+
+class TableRoom:
+    """A table: its own game, its seated players and spectators, and its queue of messages"""
+    def __init__(self, table_id):
+        """Initialization"""
+        self.table_id = table_id
+        self.table = PokerTable()
+        self.table.set_small_blind(TABLE_SMALL_BLIND)
+        self.seats = [None, None]  # Connection in each seat (seat 0 is player 1)
+        self.held = [None, None]  # Session token of a dropped player whose seat is kept for them (see hold)
+        self.action_seqs = [0, 0]  # Last action sequence number handled for each seat, sent back in its view
+        self.spectators = []
+        self.in_match = False  # A match (hands until a player can't pay the blinds) is being played
+        self.wait_for_players()
+
+        # Each seat sees its own hole cards, spectators share the public view
+        self.seat_syncs = [StateSyncServer(), StateSyncServer()]
+        self.public_sync = StateSyncServer()
+
+        # Messages waiting to be handled, and how many have been handled (for throughput)
+        self.inbox = deque()
+        self.processed = 0
+        self.reported = 0
+        self.rejected = 0  # Actions refused by the rules
+        self.errors = 0  # Messages dropped because handling them raised
+
+    def players(self):
+        """Number of seated players (a seat kept for a dropped player counts)"""
+        return sum(1 for connection, token in zip(self.seats, self.held) if connection is not None or token is not None)
+
+    def seat_of(self, connection):
+        """Return the seat of a connection, or None"""
+        if connection in self.seats:
+            return self.seats.index(connection)
+        return None
+
+    def join(self, connection):
+        """Seat a connection, returns the seat or None if the table is full"""
+        free = [seat for seat in range(len(self.seats)) if self.seats[seat] is None and self.held[seat] is None]
+        if not free:
+            return None
+        seat = free[0]
+        self.seats[seat] = connection
+
+        # Start a match once both seats are filled, never over one that is being played
+        if self.players() == 2 and not self.in_match:
+            self.start_match()
+        return seat
+
+    def start_match(self):
+        """Give both players a fresh stack and deal the first hand"""
+        self.table.player1.balance = TABLE_START_BALANCE
+        self.table.player2.balance = TABLE_START_BALANCE
+        self.table.reset_game()
+        self.in_match = True
+
+    def wait_for_players(self):
+        """End any match and wait for both seats to be filled again"""
+        self.in_match = False
+        self.table.game_state = STATE_SETUP
+        self.table.status_message = "Waiting for another player"
+
+    def hold(self, connection, token):
+        """Keep a dropped connection's seat under its session token, the match waits for it"""
+        seat = self.seat_of(connection)
+        self.seats[seat] = None
+        self.held[seat] = token
+        self.seat_syncs[seat].forget(connection)
+
+    def rejoin(self, token, connection):
+        """Give a held seat to the reconnected connection, returns the seat"""
+        seat = self.held.index(token)
+        self.held[seat] = None
+        self.seats[seat] = connection
+        return seat
+
+    def release(self, token):
+        """Free a held seat whose player didn't come back"""
+        seat = self.held.index(token)
+        self.held[seat] = None
+        self.action_seqs[seat] = 0
+        self.wait_for_players()
+
+    def watch(self, connection):
+        """Add a spectator"""
+        self.spectators.append(connection)
+
+    def leave(self, connection):
+        """Free a connection's seat (or stop it watching)"""
+        seat = self.seat_of(connection)
+        if seat is not None:
+            self.seats[seat] = None
+            self.action_seqs[seat] = 0
+            self.seat_syncs[seat].forget(connection)
+            # A match needs both players (this is also how a finished, STATE_LOST table opens up again)
+            self.wait_for_players()
+        elif connection in self.spectators:
+            self.spectators.remove(connection)
+            self.public_sync.forget(connection)
+
+    def sync_for(self, connection):
+        """State sync holding the view a connection gets"""
+        seat = self.seat_of(connection)
+        return self.public_sync if seat is None else self.seat_syncs[seat]
+
+    def current_seat(self):
+        """Seat whose turn it is"""
+        return 0 if self.table.current_player == self.table.player1 else 1
+
+
+class TableServer(AsyncNetworkManager):
+    """Routes lobby messages and hands each table's messages to that table in turn"""
+    def __init__(self, port=5555, table_count=TABLE_COUNT, max_connections=MAX_CONNECTIONS):
+        super().__init__(is_server=True, port=port, max_connections=max_connections)
+
+        # Table registry
+        self.tables = {table_id: TableRoom(table_id) for table_id in range(table_count)}
+        self.table_of = {}  # connection -> TableRoom
+
+        # Sessions: a client's hello gets it a token, a seated client that drops keeps its seat under
+        # that token for RECONNECT_GRACE seconds and gets it back by saying hello with it
+        self.session_of = {}  # connection -> token
+        self.connection_of = {}  # token -> connection
+        self.held = {}  # token -> (TableRoom, timer that frees the seat)
+
+        # Tables with queued messages, served round robin so a busy table can't starve a quiet one
+        self.ready = deque()
+        self.wakeup = None  # Set on the event loop before the server accepts connections
+        self.last_report = time.perf_counter()
+
+    def _encode_message(self, message):
+        """Tables use the binary codec"""
+        return encode_message(message)
+
+    def _decode_message(self, payload):
+        """Tables use the binary codec"""
+        return decode_message(payload)
+
+    def _coalesce_key(self, message):
+        """A queued game state is replaced by a newer one, each delta covers everything since the client's ack"""
+        return 'game_state' if message.get('type') == 'game_state' else None
+
+    async def _start_server_async(self):
+        """Start the table dispatcher and the throughput reports, then listen (a message can arrive as soon as we do)"""
+        self.wakeup = asyncio.Event()
+        self._create_task(self._dispatch())
+        self._create_task(self._report_throughput())
+        await super()._start_server_async()
+
+    def _process_message(self, message, sender=None):
+        """Handle lobby messages right away, queue table messages on their table"""
+        msg_type = message.get('type')
+
+        if msg_type == 'list_tables':
+            self.send_message({'type': 'table_list', 'tables': [
+                {'table_id': room.table_id, 'players': room.players()} for room in self.tables.values()
+            ]}, sender)
+
+        elif msg_type == 'join':
+            self._join(sender, message['table_id'])
+
+        elif msg_type == 'spectate':
+            self._spectate(sender, message['table_id'])
+
+        elif msg_type == 'leave':
+            self._leave(sender)
+
+        elif msg_type == 'hello':
+            self._hello(sender, message['token'])
+
+        else:
+            room = self.table_of.get(sender)
+            if room is None:
+                return
+
+            room.inbox.append((message, sender))
+            if len(room.inbox) == 1:
+                self.ready.append(room)
+                self.wakeup.set()
+
+    def _join(self, connection, table_id):
+        """Seat a connection at a table"""
+        # One table per connection
+        self._leave(connection)
+
+        room = self.tables.get(table_id)
+        seat = room.join(connection) if room else None
+        self.send_message({'type': 'joined', 'table_id': table_id, 'seat': seat}, connection)
+
+        if seat is not None:
+            self.table_of[connection] = room
+            self._broadcast_state(room)
+
+    def _spectate(self, connection, table_id):
+        """Let a connection watch a table"""
+        self._leave(connection)
+
+        room = self.tables.get(table_id)
+        self.send_message({'type': 'joined', 'table_id': table_id, 'seat': None, 'spectator': room is not None},
+                          connection)
+
+        if room:
+            room.watch(connection)
+            self.table_of[connection] = room
+            self._broadcast_state(room)
+
+    def _leave(self, connection):
+        """Take a connection off its table"""
+        room = self.table_of.pop(connection, None)
+        if room:
+            room.leave(connection)
+            self._broadcast_state(room)
+
+    def _hello(self, connection, token):
+        """Give a connection its session token, and its seat back if it held one (with a full state)"""
+        # Its old connection may not have been noticed dropping yet
+        old = self.connection_of.get(token) if token else None
+        if old is not None and old is not connection:
+            self._hold_seat(old)
+            self._drop_peer(old, 'replaced')
+
+        held = self.held.pop(token, None) if token else None
+        if held is None:
+            token = os.urandom(16)
+        self.session_of[connection] = token
+        self.connection_of[token] = connection
+
+        if held is None:
+            self.send_message({'type': 'session', 'token': token, 'version': 0}, connection)
+            return
+
+        room, timer = held
+        timer.cancel()
+        self._leave(connection)
+        seat = room.rejoin(token, connection)
+        self.table_of[connection] = room
+        self.send_message({'type': 'joined', 'table_id': room.table_id, 'seat': seat}, connection)
+        self._send_seat_state(room, seat)  # A snapshot, the new connection has acknowledged nothing
+        self.send_message({'type': 'session', 'token': token, 'version': room.seat_syncs[seat].version}, connection)
+
+    def _hold_seat(self, connection):
+        """Keep a dropped connection's seat for RECONNECT_GRACE seconds, returns True if it had one"""
+        token = self.session_of.pop(connection, None)
+        if token is None:
+            return False
+        self.connection_of.pop(token, None)
+
+        room = self.table_of.get(connection)
+        if room is None or room.seat_of(connection) is None:
+            return False
+        del self.table_of[connection]
+        room.hold(connection, token)
+        self.held[token] = (room, self.loop.call_later(RECONNECT_GRACE, self._release_seat, token))
+        return True
+
+    def _release_seat(self, token):
+        """A dropped player didn't come back in time: free their seat (runs on the event loop)"""
+        held = self.held.pop(token, None)
+        if held:
+            room, _ = held
+            room.release(token)
+            self._broadcast_state(room)
+
+    def _on_disconnect(self, connection):
+        """Hold the seat of a client that dropped, or take a spectator off its table"""
+        if not self._hold_seat(connection):
+            self._leave(connection)
+
+    async def _dispatch(self):
+        """Give each table with queued messages a turn of up to TABLE_BATCH messages"""
+        while self.running:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+
+            while self.ready:
+                room = self.ready.popleft()
+                for _ in range(min(TABLE_BATCH, len(room.inbox))):
+                    message, sender = room.inbox.popleft()
+                    try:
+                        self._handle_table_message(room, message, sender)
+                    except Exception as e:
+                        # A bad message only costs itself, not the table or the other tables
+                        print(f"Table {room.table_id}: dropped {message.get('type')} message: {e!r}")
+                        room.errors += 1
+                    room.processed += 1
+
+                # Still busy: back of the line
+                if room.inbox:
+                    self.ready.append(room)
+
+                # Let the sockets make progress between turns
+                await asyncio.sleep(0)
+
+    def _handle_table_message(self, room, message, sender):
+        """Apply one message to its table"""
+        msg_type = message.get('type')
+
+        if msg_type == 'state_ack':
+            state_sync = room.sync_for(sender)
+            state_sync.ack(sender, message['version'])
+            if message['version'] == 0:
+                self._send_state(state_sync, [sender])
+
+        elif msg_type == 'action':
+            # The server is the authority: only seated players, and only moves the rules allow right now
+            seat = room.seat_of(sender)
+            if seat is None:
+                return
+            room.action_seqs[seat] = message.get('seq', 0)
+
+            if not room.in_match or room.table.validate_action(seat, message['action'], message.get('amount', 0)):
+                # Still answer, so a client that predicted the action rolls it back
+                room.rejected += 1
+                self._send_seat_state(room, seat)
+                return
+
+            room.table.handle_remote_action(message['action'], message.get('amount', 0))
+
+            # Deal the next hand right away once this one is over
+            if room.table.game_state == STATE_GAME_OVER:
+                room.table.reset_game()
+
+            # A player is out of chips: the match is over, the result stays up until a seat changes hands
+            if room.table.game_state == STATE_LOST:
+                room.in_match = False
+
+            self._broadcast_state(room)
+
+    def _broadcast_state(self, room):
+        """Send every seated player and spectator at a table what changed"""
+        for seat in range(len(room.seats)):
+            self._send_seat_state(room, seat)
+
+        if room.spectators:
+            room.public_sync.publish(room.table.get_network_state())
+            self._send_state(room.public_sync, room.spectators)
+
+    def _send_seat_state(self, room, seat):
+        """Send a seated player its own view: its hole cards, and the sequence number of its last action we handled"""
+        connection = room.seats[seat]
+        if connection is not None:
+            state = room.table.get_network_state(seat)
+            state['action_seq'] = room.action_seqs[seat]
+            room.seat_syncs[seat].publish(state)
+            self._send_state(room.seat_syncs[seat], [connection])
+
+    def _send_state(self, state_sync, connections):
+        """Send each connection the delta (or snapshot) it needs
+
+        The message is encoded once per version the connections are on, and that
+        one buffer is queued for all of them, so a big audience costs little more
+        than a small one.
+        """
+        audiences = {}
+        for connection in connections:
+            frame = state_sync.frame_for(connection, self.encode_once)
+            if frame is not None:
+                audiences.setdefault(id(frame), (frame, []))[1].append(connection)
+
+        for frame, targets in audiences.values():
+            self.send_frame(frame, targets, 'game_state')
+
+    def room_stats(self):
+        """Messages handled per table, and messages/sec since the last report"""
+        now = time.perf_counter()
+        elapsed = max(now - self.last_report, 1e-9)
+        stats = {}
+        for room in self.tables.values():
+            stats[room.table_id] = {
+                'players': room.players(),
+                'spectators': len(room.spectators),
+                'messages': room.processed,
+                'messages_per_sec': (room.processed - room.reported) / elapsed,
+                'queued': len(room.inbox),
+                'rejected_actions': room.rejected,
+                'dropped_messages': room.errors,
+                'chip_leaks': room.table.ledger.leaks if room.table.ledger else 0,
+            }
+        return stats
+
+    def network_stats(self):
+        """Connection metrics grouped by table, plus each table's throughput"""
+        stats = super().network_stats()
+        stats['tables'] = self.room_stats()
+        return stats
+
+    def _stats_group(self, connection):
+        """Connections count towards their table, or the lobby before they join one"""
+        room = self.table_of.get(connection)
+        return f"table {room.table_id}" if room else 'lobby'
+
+    async def _report_throughput(self):
+        """Print per-table throughput every TABLE_STATS_INTERVAL seconds"""
+        while self.running:
+            await asyncio.sleep(TABLE_STATS_INTERVAL)
+            for table_id, stats in self.room_stats().items():
+                if stats['messages_per_sec'] > 0:
+                    print(f"Table {table_id}: {stats['messages_per_sec']:.1f} msg/s, "
+                          f"{stats['queued']} queued, {stats['players']} players")
+
+            self.last_report = time.perf_counter()
+            for room in self.tables.values():
+                room.reported = room.processed
+
+
+def main():
+    """Run the table server until Ctrl+C"""
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 5555
+    table_count = int(sys.argv[2]) if len(sys.argv) > 2 else TABLE_COUNT
+
+    server = TableServer(port, table_count)
+    if len(sys.argv) > 3:
+        server.stats_port = int(sys.argv[3])
+    server.start()
+    print(f"{table_count} tables open")
+    try:
+        while server.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()